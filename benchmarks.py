@@ -0,0 +1,658 @@
+# benchmarks.py
+
+# Benchmark indeks pencarian (tanpa database) dan benchmark HTTP atas database
+# MySQL berisi data sintetis. Dijalankan lewat perintah `flask bench-*`.
+
+import csv
+import io
+import json
+import os
+import random
+import importlib.util
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+from openpyxl import Workbook
+
+import buyer_directory
+import cash_ledger
+import metrics
+import rollups
+import spreadsheet
+from catalog import bump_catalog_version
+from search import BookSearchIndex
+
+# Potongan judul kitab untuk membangun katalog sintetis
+TITLE_HEADS = ['Amtsilati', 'Amtsilaty', 'Jurumiyah', 'Jurumiyyah', 'Imrithi', 'Alfiyah', 'Fathul Qorib',
+               'Fatchul Qarib', 'Safinatun Najah', 'Sullam Taufiq', 'Tashrifiyah', 'Nadzom Maqshud',
+               'Nazhom Imrity', 'Taqrib', 'Bulughul Maram', 'Riyadhus Sholihin', 'Ta\'lim Muta\'allim',
+               'Aqidatul Awam', 'Khulashoh', 'Syarh Jurumiyah', 'Qowaidul I\'lal', 'Tuhfatul Athfal']
+TITLE_TAILS = ['Jilid', 'Juz', 'Syarah', 'Terjemah', 'Makna Pesantren', 'Edisi', 'Lengkap', 'Saku', 'Pegon']
+
+SEARCH_QUERIES = ['amtsilati', 'amsilaty jilid 3', 'jurumiyah', 'fatkhul qorib', 'imriti', 'alfiyyah syarah',
+                  'tasrif', 'nadhom maksud', 'safinah', 'taklim mutaalim', 'riyadus solihin 2', 'kh']
+
+
+def synthetic_titles(size, seed=42):
+    """Judul kitab unik sebanyak `size`, dengan variasi ejaan seperti katalog nyata."""
+    rng = random.Random(seed)
+    titles = set()
+    while len(titles) < size:
+        titles.add(f"{rng.choice(TITLE_HEADS)} {rng.choice(TITLE_TAILS)} {rng.randint(1, 5000)}")
+    return sorted(titles)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_search(size=50000, rounds=200, seed=42):
+    """Waktu build indeks dan latensi pencarian (mikrodetik) atas katalog sintetis."""
+    books = [{'id': i, 'name': name} for i, name in enumerate(synthetic_titles(size, seed), start=1)]
+
+    started = time.perf_counter()
+    index = BookSearchIndex(books)
+    build_seconds = time.perf_counter() - started
+
+    per_query = {}
+    for query in SEARCH_QUERIES:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            index.search(query, limit=10)
+            timings.append((time.perf_counter() - started) * 1e6)
+        per_query[query] = {
+            'p50_us': round(statistics.median(timings), 1),
+            'p95_us': round(percentile(timings, 0.95), 1),
+            'top': [book['name'] for book, _ in index.search(query, limit=3)],
+        }
+
+    all_p50 = [stats['p50_us'] for stats in per_query.values()]
+    return {
+        'catalog_size': size,
+        'build_seconds': round(build_seconds, 3),
+        'median_p50_us': round(statistics.median(all_p50), 1),
+        'max_p50_us': max(all_p50),
+        'queries': per_query,
+    }
+
+
+# --- Benchmark memori import Excel/CSV (peak RSS) ---
+
+# baseline: hanya interpreter + modul; read_excel: jalur lama pd.read_excel(io.BytesIO(...));
+# streaming: SheetReader per potongan baris
+INGEST_MODES = ('baseline', 'read_excel', 'streaming')
+
+
+def write_ingest_file(path, rows, fmt='xlsx', seed=42):
+    """File import transaksi offline sintetis dengan `rows` baris data."""
+    rng = random.Random(seed)
+    titles = synthetic_titles(500, seed)
+    header = ['Nama Pembeli', 'Alamat', 'Nama Kitab', 'Jumlah', 'Status Pembayaran']
+
+    def generate():
+        for i in range(rows):
+            yield [offline_buyer_name(rng.randrange(rows)), f"{rng.choice(DORMITORIES)} kamar {rng.randint(1, 40)}",
+                   rng.choice(titles), rng.randint(1, 5), rng.choice(['Lunas', 'Belum Lunas'])]
+
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(header)
+            writer.writerows(generate())
+    else:
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Transaksi')
+        worksheet.append(header)
+        for row in generate():
+            worksheet.append(row)
+        workbook.save(path)
+
+
+def measure_ingest(path, fmt, mode, chunk_rows=spreadsheet.READ_CHUNK_ROWS):
+    """Baca file dengan satu mode di proses ini; dipanggil di proses anak agar peak RSS terpisah."""
+    started = time.perf_counter()
+    rows = 0
+    if mode == 'read_excel':
+        with open(path, 'rb') as source:
+            data = io.BytesIO(source.read())
+        df = pd.read_csv(data) if fmt == 'csv' else pd.read_excel(data)
+        rows = len(df)
+    elif mode == 'streaming':
+        for df in spreadsheet.SheetReader(path, fmt, chunk_rows):
+            rows += len(df)
+    return {
+        'rows': rows,
+        'seconds': round(time.perf_counter() - started, 3),
+        'peak_rss_mb': round(peak_rss_kb() / 1024, 1),
+    }
+
+
+def peak_rss_kb():
+    """Peak RSS proses ini (KB).
+
+    Di Linux dibaca dari VmHWM, karena ru_maxrss ikut terbawa dari proses
+    induk melewati fork+exec (proses anak `flask` akan tampak sebesar induknya).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_ingest(rows=100000, fmt='xlsx', chunk_rows=spreadsheet.READ_CHUNK_ROWS, seed=42, progress=print):
+    """Bandingkan peak RSS dan waktu baca file import antara jalur lama dan streaming.
+
+    Setiap mode dijalankan di proses Python baru, sehingga angka peak RSS
+    tidak saling memengaruhi. `extra_mb` adalah selisih terhadap baseline.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, f'ingest.{fmt}')
+        write_ingest_file(path, rows, fmt, seed)
+        file_mb = round(os.path.getsize(path) / 1024 / 1024, 2)
+        progress(f"File {fmt} {rows} baris: {file_mb} MB")
+
+        results = {}
+        for mode in INGEST_MODES:
+            code = ('import json, benchmarks; '
+                    f'print(json.dumps(benchmarks.measure_ingest({path!r}, {fmt!r}, {mode!r}, {chunk_rows})))')
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results['baseline']['peak_rss_mb']
+    for result in results.values():
+        result['extra_mb'] = round(result['peak_rss_mb'] - baseline, 1)
+    return {'rows': rows, 'format': fmt, 'file_mb': file_mb, 'chunk_rows': chunk_rows, 'modes': results}
+
+
+# --- Benchmark mode serving (sync / threaded / async) dengan stub Biteship ---
+
+# Modul tambahan yang dibutuhkan tiap mode serving (None: cukup gunicorn)
+SERVING_MODE_MODULES = {'sync': None, 'threaded': None, 'async': 'gevent'}
+
+
+class _BiteshipStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, payload):
+        time.sleep(self.server.delay)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply({'success': True, 'areas': [{'id': 'IDNP6IDNC148', 'name': 'Jepara, Jawa Tengah'}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._reply({'success': True, 'pricing': [
+            {'courier_code': 'jne', 'courier_service_code': 'reg', 'price': 18000, 'duration': '2 - 3 days'}]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BiteshipStub:
+    """Server HTTP lokal pengganti Biteship dengan latensi tetap `delay` detik."""
+
+    def __init__(self, delay=0.1):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _BiteshipStubHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serving_mode_available(mode):
+    module = SERVING_MODE_MODULES[mode]
+    return importlib.util.find_spec('gunicorn') is not None and (
+        module is None or importlib.util.find_spec(module) is not None)
+
+
+def start_gunicorn(mode, env, workers=2, timeout=60):
+    """Jalankan `gunicorn app:app` pada port bebas dengan SERVING_MODE `mode`; kembalikan (proses, url)."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=dict(os.environ, SERVING_MODE=mode, **env),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn ({mode}) berhenti: {process.stderr.read()[-2000:]}")
+        # Socket sudah dibuka master sebelum worker selesai memuat app, jadi timeout juga berarti belum siap
+        try:
+            requests.get(f'{url}/api/cari-area', timeout=2)
+            return process, url
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({mode}) tidak merespons dalam {timeout} detik")
+
+
+def default_serving_cases(with_shop=False):
+    """Kasus (nama, fungsi(session, base_url, i)); setiap request memakai kunci unik agar cache ongkir tidak kena."""
+    cases = [
+        # Nomor di depan: tidak ada query yang menjadi prefix query lain (cache prefix area)
+        ('GET /api/cari-area', lambda session, url, i: session.get(
+            f'{url}/api/cari-area', params={'q': f'{i} kecamatan'}, timeout=30)),
+        ('POST /api/cek-ongkir', lambda session, url, i: session.post(
+            f'{url}/api/cek-ongkir', json={'destination_area_id': f'IDNP{i}', 'weight': 1000}, timeout=30)),
+    ]
+    if with_shop:
+        cases.append(('GET /toko', lambda session, url, i: session.get(f'{url}/toko', timeout=30)))
+    return cases
+
+
+def load_test(base_url, send, total, concurrency, offset=0):
+    """Kirim `total` request (nomor offset..offset+total) dengan `concurrency` klien serentak."""
+    local = threading.local()
+
+    def one(i):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            status = str(send(local.session, base_url, i).status_code)
+        except requests.exceptions.RequestException:
+            status = 'error'
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(offset, offset + total)))
+    wall_seconds = time.perf_counter() - started
+    summary = _summarize([t for t, _ in outcomes], [s for _, s in outcomes], wall_seconds, 0)
+    del summary['db_queries_per_request']
+    return summary
+
+
+def bench_serving(modes=('sync', 'threaded', 'async'), total=400, concurrency=50, delay=0.1, workers=2,
+                  with_shop=False, progress=print):
+    """Throughput request serentak per mode serving, dengan Biteship diganti stub berlatensi `delay`."""
+    results = {}
+    with BiteshipStub(delay) as stub:
+        for mode in modes:
+            if not serving_mode_available(mode):
+                progress(f"{mode:<9} dilewati: {SERVING_MODE_MODULES[mode] or 'gunicorn'} tidak terpasang")
+                continue
+            process, url = start_gunicorn(mode, {'BITESHIP_BASE_URL': stub.url}, workers)
+            try:
+                for name, send in default_serving_cases(with_shop):
+                    load_test(url, send, concurrency, concurrency, offset=total)  # pemanasan
+                    summary = load_test(url, send, total, concurrency)
+                    results[f'{mode} {name}'] = summary
+                    progress(f"{mode:<9} {name:<22} {summary['throughput_rps']:>8} req/s  "
+                             f"p50={summary['p50_ms']:>8} ms  p95={summary['p95_ms']:>8} ms  {summary['statuses']}")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    return results
+
+
+# --- Benchmark waktu start (import app dan request pertama) ---
+
+# Path yang tidak butuh database: render template dan API yang langsung menjawab
+STARTUP_PATHS = ('/cek-ongkir', '/api/cari-area?q=')
+
+# Modul yang dicatat apakah sudah dimuat setelah start (pandas/openpyxl seharusnya belum)
+STARTUP_WATCHED_MODULES = ('pandas', 'openpyxl', 'numpy', 'requests', 'sqlalchemy', 'alembic')
+
+# Dijalankan di proses Python baru: ukur `import app`, lalu dua request per path lewat test client
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+paths, watched = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+timings = {}
+for path in paths:
+    for label in ('first', 'warm'):
+        begin = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        timings[f'{label} GET {path}'] = ((time.perf_counter() - begin) * 1000, response.status_code)
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'requests': timings,
+    'modules': {name: name in sys.modules for name in watched},
+}))
+"""
+
+
+def _startup_summary(values):
+    return {
+        'runs': len(values),
+        'p50_ms': round(statistics.median(values), 2),
+        'min_ms': round(min(values), 2),
+        'max_ms': round(max(values), 2),
+    }
+
+
+def bench_startup(rounds=5, paths=STARTUP_PATHS, progress=print):
+    """Waktu start aplikasi di `rounds` proses baru: proses total, `import app`, dan request pertama/berikutnya.
+
+    `modules` mencatat modul berat mana yang sudah dimuat setelah request
+    pertama; pandas/openpyxl seharusnya baru dimuat oleh jalur import/export.
+    """
+    samples = {}
+    modules = {}
+    for _ in range(rounds):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_PROBE, json.dumps(list(paths)), json.dumps(STARTUP_WATCHED_MODULES)],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        process_ms = (time.perf_counter() - started) * 1000
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.setdefault('process', []).append(process_ms)
+        samples.setdefault('import app', []).append(probe['import_ms'])
+        for name, (elapsed_ms, status) in probe['requests'].items():
+            samples.setdefault(name, []).append(elapsed_ms)
+            samples.setdefault(f'{name} status', []).append(status)
+        modules = probe['modules']
+
+    cases = {}
+    for name, values in samples.items():
+        if name.endswith(' status'):
+            continue
+        cases[name] = _startup_summary(values)
+        statuses = samples.get(f'{name} status')
+        if statuses:
+            cases[name]['statuses'] = {str(status): statuses.count(status) for status in sorted(set(statuses))}
+        progress(f"{name:<36} p50={cases[name]['p50_ms']:>9} ms  min={cases[name]['min_ms']:>9} ms  "
+                 f"max={cases[name]['max_ms']:>9} ms")
+    return {'cases': cases, 'modules': modules}
+
+
+# --- Benchmark HTTP atas database berisi data sintetis ---
+
+# Volume data default (bisa diperkecil dengan --scale)
+BENCH_VOLUMES = {
+    'books': 1000,
+    'offline_buyers': 20000,
+    'offline_sales': 1000000,
+    'online_sales': 1000000,
+    'cash_records': 100000,
+}
+
+SEED_CHUNK_SIZE = 5000
+
+DORMITORIES = ['Al-Amin', 'Al-Falah', 'Al-Hikmah', 'An-Nur', 'Ar-Rahman', 'Asy-Syifa', 'Baitul Izzah', 'Darussalam']
+BUYER_NAMES = ['Ahmad', 'Muhammad', 'Abdullah', 'Fatimah', 'Aisyah', 'Zainab', 'Umar', 'Ali', 'Hasan', 'Husain',
+               'Khadijah', 'Maryam', 'Yusuf', 'Ibrahim', 'Ismail', 'Salsabila', 'Nur', 'Rizki', 'Fadhil', 'Hafidz']
+CASH_CATEGORIES = ['Penjualan', 'Cetak Kitab', 'Ongkir', 'Operasional', 'Gaji', 'Lain-lain']
+
+# Tabel yang dikosongkan sebelum seeding (urutan aman terhadap foreign key)
+SEEDED_TABLES = ['cash_daily_balances', 'cash_records', 'sales_daily_rollups', 'buyer_balances', 'online_buyers',
+                 'online_sales', 'offline_sales', 'offline_buyers', 'books']
+
+
+def scaled_volumes(scale=1.0):
+    return {table: max(1, int(count * scale)) for table, count in BENCH_VOLUMES.items()}
+
+
+def offline_buyer_name(index):
+    return f"{BUYER_NAMES[index % len(BUYER_NAMES)]} {BUYER_NAMES[index // len(BUYER_NAMES) % len(BUYER_NAMES)]} {index:05d}"
+
+
+def _insert_generated(cursor, sql, total, make_row):
+    for start in range(0, total, SEED_CHUNK_SIZE):
+        cursor.executemany(sql, [make_row(i) for i in range(start, min(start + SEED_CHUNK_SIZE, total))])
+
+
+def seed_database(conn, volumes, seed=42, progress=print):
+    """Isi database benchmark dengan data sintetis yang realistis.
+
+    Semua tabel di SEEDED_TABLES dikosongkan lebih dulu, lalu tabel rekap
+    (rollups, saldo kas, direktori pembeli online) dibangun ulang.
+    """
+    rng = random.Random(seed)
+    start_day = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+    span_seconds = 2 * 365 * 24 * 3600
+
+    def random_datetime():
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_day + rng.randrange(span_seconds)))
+
+    titles = synthetic_titles(volumes['books'], seed)
+    prices = [rng.randrange(10, 150) * 1000 for _ in titles]
+    buyer_names = [offline_buyer_name(i) for i in range(volumes['offline_buyers'])]
+
+    with conn.cursor() as cursor:
+        cursor.execute('SET FOREIGN_KEY_CHECKS = 0')
+        for table in SEEDED_TABLES:
+            cursor.execute(f'TRUNCATE TABLE {table}')
+        cursor.execute('SET FOREIGN_KEY_CHECKS = 1')
+
+        progress(f"Kitab: {len(titles)}")
+        _insert_generated(cursor, 'INSERT INTO books (id, name, price, availability) VALUES (%s, %s, %s, %s)',
+                          len(titles), lambda i: (i + 1, titles[i], prices[i], 'Tersedia' if i % 10 else 'Habis'))
+
+        progress(f"Pembeli offline: {len(buyer_names)}")
+        _insert_generated(cursor, 'INSERT INTO offline_buyers (id, name, address, dormitory) VALUES (%s, %s, %s, %s)',
+                          len(buyer_names), lambda i: (i + 1, buyer_names[i], f"Kamar {rng.randint(1, 40)}",
+                                                       rng.choice(DORMITORIES)))
+
+        def offline_row(i):
+            book = rng.randrange(len(titles))
+            quantity = rng.randint(1, 5)
+            return (rng.randint(1, len(buyer_names)), book + 1, quantity, prices[book] * quantity,
+                    'Belum Lunas' if rng.random() < 0.15 else 'Lunas', random_datetime())
+
+        progress(f"Penjualan offline: {volumes['offline_sales']}")
+        _insert_generated(cursor, 'INSERT INTO offline_sales (buyer_id, book_id, quantity, total_price, payment_status, sale_date) '
+                                  'VALUES (%s, %s, %s, %s, %s, %s)', volumes['offline_sales'], offline_row)
+
+        def online_row(i):
+            book = rng.randrange(len(titles))
+            quantity = rng.randint(1, 3)
+            shipping = rng.randrange(10, 60) * 1000
+            sale_date = random_datetime()
+            return (f"Pelanggan Online {rng.randrange(volumes['online_sales'] // 5 + 1):06d}", f"Jl. Contoh No. {i % 200}",
+                    book + 1, quantity, shipping, prices[book] * quantity + shipping, sale_date[:10], sale_date)
+
+        progress(f"Penjualan online: {volumes['online_sales']}")
+        _insert_generated(cursor, 'INSERT INTO online_sales (buyer_name, buyer_address, book_id, quantity, shipping_cost, '
+                                  'total_price, transfer_date, sale_date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                          volumes['online_sales'], online_row)
+
+        def cash_row(i):
+            record_type = 'debit' if rng.random() < 0.6 else 'kredit'
+            created_at = random_datetime()
+            return (record_type, f"Catatan kas {i}", rng.randrange(5, 500) * 1000, rng.choice(CASH_CATEGORIES),
+                    created_at[:10], created_at)
+
+        progress(f"Catatan kas: {volumes['cash_records']}")
+        _insert_generated(cursor, 'INSERT INTO cash_records (type, description, amount, category, record_date, created_at) '
+                                  'VALUES (%s, %s, %s, %s, %s, %s)', volumes['cash_records'], cash_row)
+
+        progress("Membangun ulang tabel rekap")
+        rollups.rebuild(cursor)
+        cash_ledger.rebuild(cursor)
+        buyer_directory.rebuild_online(cursor)
+        bump_catalog_version(cursor)
+    conn.commit()
+
+
+def _excel_upload(df, filename):
+    def make_request():
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False)
+        output.seek(0)
+        return {'data': {'file': (output, filename)}, 'content_type': 'multipart/form-data'}
+    return make_request
+
+
+def default_http_cases(volumes, import_rows=500, seed=42):
+    """Skenario benchmark: (nama, method, url, pembuat kwargs request atau None, jumlah iterasi relatif)."""
+    rng = random.Random(seed)
+    titles = synthetic_titles(volumes['books'], seed)
+    run_id = int(time.time())
+
+    def pick_title():
+        return rng.choice(titles)
+
+    def pick_buyer():
+        return offline_buyer_name(rng.randrange(volumes['offline_buyers']))
+
+    book_rows = pd.DataFrame({'Nama': [f"Kitab Import {run_id} {i}" for i in range(import_rows)],
+                              'Harga': [rng.randrange(10, 150) * 1000 for _ in range(import_rows)]})
+    buyer_rows = pd.DataFrame({'Nama': [f"Santri Import {run_id} {i}" for i in range(import_rows)],
+                               'Alamat': [f"Kamar {i % 40}" for i in range(import_rows)]})
+    offline_rows = pd.DataFrame({'Nama Pembeli': [pick_buyer() for _ in range(import_rows)],
+                                 'Nama Kitab': [pick_title() for _ in range(import_rows)],
+                                 'Jumlah': [rng.randint(1, 5) for _ in range(import_rows)]})
+    online_rows = pd.DataFrame({'Nama Pembeli': [f"Pelanggan Import {i}" for i in range(import_rows)],
+                                'Nama Kitab': [pick_title() for _ in range(import_rows)],
+                                'Jumlah': [rng.randint(1, 3) for _ in range(import_rows)],
+                                'Alamat Kirim': ['Jl. Benchmark'] * import_rows,
+                                'Ongkir': [15000] * import_rows,
+                                'Tanggal Transfer': ['2025-06-01'] * import_rows})
+
+    def book_detail_url():
+        return f"/toko/kitab/{rng.randint(1, volumes['books'])}"
+
+    return [
+        ('toko', 'GET', '/toko', None, 1.0),
+        ('kitab_detail', 'GET', book_detail_url, None, 1.0),
+        ('recent_offline_sales', 'GET', '/api/recent-offline-sales?limit=50', None, 1.0),
+        ('recent_offline_sales_filtered', 'GET',
+         '/api/recent-offline-sales?limit=50&start_date=2025-03-01&end_date=2025-03-31', None, 1.0),
+        ('cash_records', 'GET', '/api/cash-records?limit=50', None, 1.0),
+        ('export_offline', 'GET', '/api/export-offline-sales?mode=stream', None, 0.05),
+        ('export_online', 'GET', '/api/export-online-sales?mode=stream', None, 0.05),
+        ('export_cash', 'GET', '/api/export-cash-records?mode=stream', None, 0.05),
+        ('import_books', 'POST', '/api/import-books', _excel_upload(book_rows, 'kitab.xlsx'), 0.05),
+        ('import_buyers', 'POST', '/api/import-buyers', _excel_upload(buyer_rows, 'pembeli.xlsx'), 0.05),
+        ('import_offline_sales', 'POST', '/api/import-offline-sales', _excel_upload(offline_rows, 'offline.xlsx'), 0.05),
+        ('import_online_sales', 'POST', '/api/import-online-sales', _excel_upload(online_rows, 'online.xlsx'), 0.05),
+    ]
+
+
+def _summarize(timings, statuses, wall_seconds, queries):
+    timings_ms = [t * 1000 for t in timings]
+    return {
+        'requests': len(timings_ms),
+        'p50_ms': round(statistics.median(timings_ms), 2),
+        'p95_ms': round(percentile(timings_ms, 0.95), 2),
+        'p99_ms': round(percentile(timings_ms, 0.99), 2),
+        'mean_ms': round(statistics.fmean(timings_ms), 2),
+        'max_ms': round(max(timings_ms), 2),
+        'throughput_rps': round(len(timings_ms) / wall_seconds, 2) if wall_seconds else None,
+        'db_queries_per_request': round(queries / len(timings_ms), 2),
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+    }
+
+
+def run_http_benchmarks(app, cases, iterations=50, concurrency=1, warmup=2, progress=print):
+    """Jalankan skenario lewat Flask test client (tanpa jaringan) dan ringkas latensinya."""
+    def make_client():
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 0
+        return client
+
+    def call(client, method, url, make_kwargs):
+        kwargs = make_kwargs() if make_kwargs else {}
+        started = time.perf_counter()
+        response = client.open(url() if callable(url) else url, method=method, **kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        return elapsed, response.status_code
+
+    def total_queries():
+        return sum(metrics.registry.db_queries.values())
+
+    results = {}
+    for name, method, url, make_kwargs, weight in cases:
+        count = max(1, int(iterations * weight))
+        warm_client = make_client()
+        for _ in range(min(warmup, count)):
+            call(warm_client, method, url, make_kwargs)
+
+        queries_before = total_queries()
+        started = time.perf_counter()
+        if concurrency > 1:
+            clients = [make_client() for _ in range(concurrency)]
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = list(executor.map(lambda i: call(clients[i % concurrency], method, url, make_kwargs),
+                                             range(count)))
+        else:
+            outcomes = [call(warm_client, method, url, make_kwargs) for _ in range(count)]
+        wall_seconds = time.perf_counter() - started
+
+        results[name] = _summarize([t for t, _ in outcomes], [s for _, s in outcomes], wall_seconds,
+                                   total_queries() - queries_before)
+        progress(f"{name:<32} p50={results[name]['p50_ms']:>9} ms  p95={results[name]['p95_ms']:>9} ms  "
+                 f"{results[name]['throughput_rps']} req/s  {results[name]['statuses']}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results, volumes, iterations, concurrency, extra=None):
+    report = {
+        'schema': 1,
+        'git_commit': git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'volumes': volumes,
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'cases': results,
+    }
+    report.update(extra or {})
+    return report
+
+
+def compare_reports(base, head, metric='p50_ms'):
+    """Bandingkan dua laporan: list (nama, nilai lama, nilai baru, perubahan %)."""
+    rows = []
+    for name in sorted(set(base['cases']) | set(head['cases'])):
+        old = base['cases'].get(name, {}).get(metric)
+        new = head['cases'].get(name, {}).get(metric)
+        change = round((new - old) / old * 100, 1) if old and new is not None else None
+        rows.append((name, old, new, change))
+    return rows
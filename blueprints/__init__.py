@@ -0,0 +1,17 @@
+# blueprints/__init__.py
+
+# Rute aplikasi dibagi per area. Setiap modul berisi satu Blueprint; semuanya
+# didaftarkan ke aplikasi oleh create_app() lewat register_blueprints().
+
+
+def register_blueprints(app):
+    from blueprints import admin, books_api, buyers_api, cash_api, jobs_api, sales_api, shipping_api, shop
+
+    app.register_blueprint(shop.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(books_api.bp)
+    app.register_blueprint(buyers_api.bp)
+    app.register_blueprint(sales_api.bp)
+    app.register_blueprint(cash_api.bp)
+    app.register_blueprint(jobs_api.bp)
+    app.register_blueprint(shipping_api.bp)
@@ -0,0 +1,172 @@
+# blueprints/admin.py
+
+# Login/logout admin, halaman-halaman admin, serta rute debug dan /metrics.
+
+import os
+
+from flask import Blueprint, Response, current_app, flash, jsonify, redirect, render_template, request, session, url_for
+from werkzeug.security import check_password_hash
+
+import metrics
+import services
+from db_pool import pool_stats
+from models import db
+from services import get_db_connection, login_required
+
+bp = Blueprint('admin', __name__)
+
+# --- Rute Halaman Login & Logout Admin ---
+@bp.route('/admin/login', methods=('GET', 'POST'))
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+
+        conn = get_db_connection()
+        try:
+            # Gunakan 'with conn.cursor() as cursor:'
+            with conn.cursor() as cursor:
+                # Ganti placeholder '?' menjadi '%s'
+                sql = "SELECT * FROM users WHERE username = %s"
+                cursor.execute(sql, (username,))
+                user = cursor.fetchone()
+        finally:
+            # Pastikan koneksi selalu ditutup
+            conn.close()
+
+        if user and check_password_hash(user['password_hash'], password):
+            session.clear()
+            session['user_id'] = user['id']
+            return redirect(url_for('admin.dashboard'))
+        else:
+            flash('Username atau password salah!')
+
+    return render_template('login.html')
+
+@bp.route('/admin/logout')
+@login_required
+def logout():
+    session.clear()
+    return redirect(url_for('admin.login'))
+
+# --- Rute Halaman Admin ---
+@bp.route('/admin')
+@bp.route('/admin/dashboard')
+@login_required
+def dashboard():
+    """Menampilkan halaman dashboard utama."""
+    return render_template('admin/dashboard.html')
+
+@bp.route('/admin/kitab')
+@login_required
+def kitab():
+    """Menampilkan halaman manajemen kitab."""
+    return render_template('admin/kitab.html')
+
+@bp.route('/admin/kas')
+@login_required
+def kas():
+    """Menampilkan halaman rekap kas."""
+    return render_template('admin/kas.html')
+
+@bp.route('/admin/pembeli')
+@login_required
+def pembeli():
+    """Menampilkan halaman data pembeli offline."""
+    return render_template('admin/pembeli.html')
+
+@bp.route('/admin/penjualan/offline')
+@login_required
+def penjualan_offline():
+    """Menampilkan halaman input penjualan offline."""
+    return render_template('admin/penjualan_offline.html')
+
+@bp.route('/admin/penjualan/online')
+@login_required
+def penjualan_online():
+    """Menampilkan halaman input penjualan online."""
+    return render_template('admin/penjualan_online.html')
+
+@bp.route('/admin/transaksi')
+@login_required
+def transaksi():
+    """Menampilkan halaman riwayat semua transaksi."""
+    return render_template('admin/riwayat_transaksi.html')
+
+# --- Debug route untuk cek upload folder ---
+@bp.route('/debug/check-uploads')
+@login_required
+def check_uploads():
+    """Route untuk debugging - cek isi folder uploads"""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    try:
+        files = os.listdir(upload_folder)
+        return jsonify({
+            'upload_folder': upload_folder,
+            'exists': os.path.exists(upload_folder),
+            'files': files,
+            'count': len(files)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/debug/pool-stats')
+@login_required
+def check_pool_stats():
+    """Route untuk monitoring - statistik pool koneksi database"""
+    return jsonify(pool_stats.snapshot(db.engine.pool))
+
+def worker_gauges(app):
+    """Gauge milik worker ini: statistik pool koneksi dan cache ongkir, sebagai (nama, help, nilai)."""
+    with app.app_context():
+        pool = pool_stats.snapshot(db.engine.pool)
+    shipping_stats = services.biteship.stats.snapshot()
+    gauges = [(f'db_pool_{name}', f'Statistik pool koneksi: {name}.', value) for name, value in pool.items()]
+    gauges += [(f'shipping_{name}', f'Statistik cache ongkir: {name}.', value) for name, value in shipping_stats.items()]
+    return gauges
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Metrik format Prometheus (latensi, query DB, panggilan Biteship, pool).
+
+    Dengan METRICS_FOLDER, counter dan histogram adalah jumlah semua worker
+    dan gauge per worker diberi label pid; tanpa itu hanya worker ini.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    authorized = (token and request.headers.get('Authorization') == f'Bearer {token}') or 'user_id' in session
+    if not authorized:
+        return 'Unauthorized', 401
+
+    if metrics.shared is not None:
+        registry, gauges = metrics.shared.collect()
+    else:
+        registry = metrics.registry
+        gauges = [(name, help_text, value, {}) for name, help_text, value in worker_gauges(current_app._get_current_object())]
+    return Response(registry.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/debug/shipping-stats')
+@login_required
+def check_shipping_stats():
+    """Route untuk monitoring - hit/miss cache area dan tarif ongkir"""
+    stats = services.biteship.stats.snapshot()
+    stats['area_cache_size'] = len(services.biteship.area_cache)
+    stats['rate_cache_size'] = len(services.biteship.rate_cache)
+    return jsonify(stats)
+
+@bp.route('/debug/check-config')
+@login_required
+def check_config():
+    """Route untuk debugging - cek konfigurasi yang digunakan"""
+    config = current_app.config
+    return jsonify({
+        'environment': os.environ.get('FLASK_ENV', 'development'),
+        'upload_folder': config.get('UPLOAD_FOLDER'),
+        'debug': config.get('DEBUG'),
+        'testing': config.get('TESTING'),
+        'mysql_config': {
+            'host': config.get('MYSQL_HOST'),
+            'user': config.get('MYSQL_USER'),
+            'database': config.get('MYSQL_DB'),
+            'port': config.get('MYSQL_PORT')
+        }
+    })
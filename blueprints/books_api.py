@@ -0,0 +1,296 @@
+# blueprints/books_api.py
+
+# API manajemen kitab (admin): tambah/ubah/hapus, daftar, dan import Excel/CSV.
+
+import pymysql
+from flask import Blueprint, current_app, jsonify, request
+
+import images
+import services
+import spreadsheet
+from catalog import bump_catalog_version
+from services import get_db_connection, login_required
+from transfer import count_existing_names, iter_chunks, no_progress, run_upload_import
+
+bp = Blueprint('books', __name__)
+
+# Ekstensi file yang diperbolehkan
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+# Kolom Excel import kitab, urutannya sama dengan kolom INSERT
+BOOK_IMPORT_COLUMNS = ['Nama', 'Harga', 'Ketersediaan', 'Link Instagram', 'Link WhatsApp', 'Link Shopee', 'Link TikTok']
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+# --- Gambar Sampul Kitab ---
+def store_cover_image(image_file):
+    """Simpan gambar sampul dengan nama berbasis hash dan jadwalkan pembuatan variannya."""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    extension = image_file.filename.rsplit('.', 1)[1].lower()
+    image_filename = images.save_upload(image_file, upload_folder, extension)
+    images.schedule_variants(upload_folder, image_filename)
+    print(f"Image saved as: {image_filename}")
+    return image_filename
+
+def remove_unused_image(image_filename):
+    """Hapus gambar dan variannya bila tidak dipakai kitab lain (nama file berbasis isi bisa sama)."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) as total FROM books WHERE image_filename = %s', (image_filename,))
+            in_use = cursor.fetchone()['total']
+    finally:
+        conn.close()
+    if not in_use:
+        images.delete_image(current_app.config['UPLOAD_FOLDER'], image_filename)
+
+# --- API UNTUK MANAJEMEN KITAB (Dilindungi) ---
+@bp.route('/api/add-book', methods=['POST'])
+@login_required
+def add_book():
+    # Mengambil data dari form
+    try:
+        name = request.form['name']
+        price = request.form['price']
+        availability = request.form['availability']
+        link_ig = request.form.get('link_ig', '')
+        link_wa = request.form.get('link_wa', '')
+        link_shopee = request.form.get('link_shopee', '')
+        link_tiktok = request.form.get('link_tiktok', '')
+    except KeyError as e:
+        return jsonify({'error': f'Form field {e} tidak ditemukan.'}), 400
+
+    image_filename = None
+
+    # Cek apakah ada file gambar yang diunggah
+    if 'image' in request.files:
+        image_file = request.files['image']
+        if image_file and image_file.filename != '' and allowed_file(image_file.filename):
+            image_filename = store_cover_image(image_file)
+
+    conn = get_db_connection()
+    try:
+        # Menggunakan 'with' untuk memastikan cursor tertutup otomatis
+        with conn.cursor() as cursor:
+            # Gunakan %s sebagai placeholder untuk PyMySQL
+            sql = """
+                INSERT INTO books
+                (name, price, availability, link_ig, link_wa, link_shopee, link_tiktok, image_filename)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(sql, (name, price, availability, link_ig, link_wa, link_shopee, link_tiktok, image_filename))
+            bump_catalog_version(cursor)
+
+        # Commit perubahan ke database
+        conn.commit()
+        services.catalog_cache.invalidate()
+        services.shop_snapshot.schedule()
+        return jsonify({'message': 'Kitab baru berhasil ditambahkan!'})
+
+    except pymysql.IntegrityError:
+        # Tangani error jika nama kitab sudah ada (UNIQUE constraint)
+        return jsonify({'error': 'Nama kitab sudah ada.'}), 409
+    except Exception as e:
+        # Tangani error umum lainnya
+        conn.rollback() # Batalkan perubahan jika ada error lain
+        print(f"Error adding book: {str(e)}")
+        return jsonify({'error': f'Terjadi kesalahan pada server: {str(e)}'}), 500
+    finally:
+        # Pastikan koneksi selalu ditutup
+        conn.close()
+
+@bp.route('/api/update-book', methods=['POST'])
+@login_required
+def update_book():
+    conn = get_db_connection()
+    try:
+        book_id = request.form['id']
+        name = request.form['name']
+        price = request.form['price']
+        availability = request.form['availability']
+        link_ig = request.form.get('link_ig', '')
+        link_wa = request.form.get('link_wa', '')
+        link_shopee = request.form.get('link_shopee', '')
+        link_tiktok = request.form.get('link_tiktok', '')
+
+        # Gunakan nama file yang ada
+        image_filename = request.form.get('existing_image_filename', '')
+
+        # Cek apakah ada file baru yang diupload
+        old_image_filename = None
+        if 'image' in request.files:
+            image_file = request.files['image']
+            if image_file and image_file.filename != '' and allowed_file(image_file.filename):
+                old_image_filename = image_filename
+                image_filename = store_cover_image(image_file)
+
+        # Update database
+        with conn.cursor() as cursor:
+            sql = """UPDATE books SET
+                       name = %s, price = %s, availability = %s, link_ig = %s, link_wa = %s,
+                       link_shopee = %s, link_tiktok = %s, image_filename = %s
+                       WHERE id = %s"""
+            cursor.execute(sql, (name, price, availability, link_ig, link_wa, link_shopee, link_tiktok, image_filename, book_id))
+            bump_catalog_version(cursor)
+        conn.commit()
+        services.catalog_cache.invalidate()
+        services.shop_snapshot.schedule()
+
+        # Hapus gambar lama (beserta variannya) setelah data tersimpan
+        if old_image_filename and old_image_filename != image_filename:
+            remove_unused_image(old_image_filename)
+        return jsonify({'message': 'Data kitab berhasil diupdate!'})
+    except Exception as e:
+        conn.rollback()
+        print(f"Error updating book: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/delete-book/<int:book_id>', methods=['POST'])
+@login_required
+def delete_book(book_id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Ambil nama file gambar sebelum dihapus
+            cursor.execute('SELECT image_filename FROM books WHERE id = %s', (book_id,))
+            book = cursor.fetchone()
+
+            # Hapus data dari database
+            cursor.execute('DELETE FROM books WHERE id = %s', (book_id,))
+            bump_catalog_version(cursor)
+
+        conn.commit()
+        services.catalog_cache.invalidate()
+        services.shop_snapshot.schedule()
+
+        # Hapus file gambar beserta variannya jika ada
+        if book and book['image_filename']:
+            remove_unused_image(book['image_filename'])
+
+        return jsonify({'message': 'Kitab berhasil dihapus.'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
+@bp.route('/api/books/all', methods=['GET'])
+@login_required
+def get_all_books():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT * FROM books ORDER BY name')
+            books = cursor.fetchall()
+        return jsonify(books) # Tidak perlu [dict(row)...] lagi
+    finally:
+        conn.close()
+
+@bp.route('/api/books', methods=['GET'])
+@login_required
+def get_available_books():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM books WHERE availability = 'Tersedia' ORDER BY name")
+            books = cursor.fetchall()
+        return jsonify(books)
+    finally:
+        conn.close()
+
+@bp.route('/api/book/<int:book_id>', methods=['GET'])
+@login_required
+def get_book_details(book_id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT * FROM books WHERE id = %s', (book_id,))
+            book = cursor.fetchone()
+        if book is None:
+            return jsonify({'error': 'Kitab tidak ditemukan'}), 404
+        return jsonify(book)
+    finally:
+        conn.close()
+
+# --- API UNTUK IMPORT KITAB (Dilindungi) ---
+@bp.route('/api/import-books', methods=['POST'])
+@login_required
+def import_books():
+    if 'file' not in request.files:
+        return jsonify({'error': 'File tidak ditemukan'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'Tidak ada file yang dipilih'}), 400
+
+    return run_upload_import('import-books', run_import_books, file)
+
+def book_import_rows(df, has_availability):
+    """Normalisasi satu potongan DataFrame import kitab (per kolom) menjadi tuple INSERT."""
+    import pandas as pd
+
+    df = df.fillna('').reindex(columns=BOOK_IMPORT_COLUMNS, fill_value='')
+    if not has_availability:
+        df['Ketersediaan'] = 'Tersedia'
+    for column in BOOK_IMPORT_COLUMNS:
+        df[column] = df[column].str.strip()
+    df = df[df['Nama'] != ''].drop_duplicates('Nama', keep='last')
+    # Harga kosong menjadi NaN dan dilewati, bukan diimport sebagai 0
+    df['Harga'] = pd.to_numeric(df['Harga'], errors='coerce')
+    for index in df.index[df['Harga'].isna()]:
+        print(f"Error processing row {index}: harga tidak valid")
+    df = df[df['Harga'].notna()]
+    return list(zip(*(df[column].tolist() for column in BOOK_IMPORT_COLUMNS)))
+
+def run_import_books(source, fmt='xlsx', progress=no_progress):
+    """Import kitab dari file Excel/CSV (path atau file-like); mengembalikan (payload, status HTTP).
+
+    File dibaca dan ditulis ke database per potongan baris (SheetReader),
+    jadi memori tidak bergantung pada ukuran file. Seluruh import berjalan
+    dalam satu transaksi bersama kenaikan versi katalog: bila gagal di
+    tengah, tidak ada kitab yang berubah sehingga cache tidak menjadi basi.
+    """
+    try:
+        reader = spreadsheet.SheetReader(source, fmt, as_text=True)
+        has_availability = 'Ketersediaan' in reader.columns
+
+        conn = get_db_connection()
+        imported = 0
+        updated = 0
+        processed = 0
+
+        with conn.cursor() as cursor:
+            sql_upsert = """
+                INSERT INTO books (name, price, availability, link_ig, link_wa, link_shopee, link_tiktok)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE price = VALUES(price), availability = VALUES(availability),
+                    link_ig = VALUES(link_ig), link_wa = VALUES(link_wa),
+                    link_shopee = VALUES(link_shopee), link_tiktok = VALUES(link_tiktok)
+            """
+            conn.begin()
+            for df in reader:
+                for chunk in iter_chunks(book_import_rows(df, has_availability)):
+                    existing = count_existing_names(cursor, 'books', [row[0] for row in chunk])
+                    cursor.executemany(sql_upsert, chunk)
+                    imported += len(chunk) - existing
+                    updated += existing
+                processed += len(df)
+                progress(processed, reader.total_rows)
+            bump_catalog_version(cursor)
+
+        conn.commit()
+        services.catalog_cache.invalidate()
+        services.shop_snapshot.schedule()
+        return {'message': f'Import berhasil! Ditambah: {imported}, Diupdate: {updated}'}, 200
+
+    except Exception as e:
+        if 'conn' in locals() and conn.open:
+            conn.rollback()
+        return {'error': f"Error memproses file: {str(e)}"}, 500
+    finally:
+        if 'conn' in locals() and conn.open:
+            conn.close()
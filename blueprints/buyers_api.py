@@ -0,0 +1,211 @@
+# blueprints/buyers_api.py
+
+# API data pembeli (admin): daftar & autocomplete pembeli offline/online,
+# ubah/hapus pembeli offline, dan import pembeli dari Excel/CSV.
+
+from flask import Blueprint, jsonify, request
+
+import buyer_directory
+import rollups
+import spreadsheet
+from services import get_db_connection, login_required
+from transfer import count_existing_names, iter_chunks, no_progress, run_upload_import
+
+bp = Blueprint('buyers', __name__)
+
+# Jumlah transaksi offline milik satu pembeli (cek sebelum pembeli dihapus)
+BUYER_SALES_COUNT_QUERY = 'SELECT COUNT(*) as count FROM offline_sales WHERE buyer_id = %s'
+
+# --- API UNTUK PEMBELI & IMPORT (Dilindungi) ---
+@bp.route('/api/offline-buyers', methods=['GET'])
+@login_required
+def get_offline_buyers():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                SELECT ob.*, COALESCE(bb.outstanding, 0) as outstanding
+                FROM offline_buyers ob
+                LEFT JOIN buyer_balances bb ON bb.buyer_id = ob.id
+                ORDER BY ob.name
+            ''')
+            buyers = cursor.fetchall()
+        return jsonify(buyers)
+    finally:
+        conn.close()
+
+@bp.route('/api/online-buyers', methods=['GET'])
+@login_required
+def get_online_buyers():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Nama unik diambil dari direktori online_buyers, bukan DISTINCT atas online_sales
+            cursor.execute('SELECT name FROM online_buyers ORDER BY name')
+            online_buyers = cursor.fetchall()
+        return jsonify(online_buyers)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+def get_autocomplete_args():
+    """Argumen autocomplete dari query string: (teks awalan, limit)."""
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 20, type=int)
+    return query, max(1, min(limit, buyer_directory.MAX_SUGGESTIONS))
+
+@bp.route('/api/offline-buyers/search', methods=['GET'])
+@login_required
+def search_offline_buyers():
+    """Autocomplete pembeli offline berdasarkan awalan nama (opsional filter asrama)."""
+    query, limit = get_autocomplete_args()
+    dormitory = request.args.get('dormitory', '').strip()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            results = buyer_directory.search_offline(cursor, query, limit, dormitory or None)
+        return jsonify(results)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/online-buyers/search', methods=['GET'])
+@login_required
+def search_online_buyers():
+    """Autocomplete pembeli online berdasarkan awalan nama, beserta alamat terakhirnya."""
+    query, limit = get_autocomplete_args()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            results = buyer_directory.search_online(cursor, query, limit)
+        return jsonify(results)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/import-buyers', methods=['POST'])
+@login_required
+def import_buyers():
+    if 'file' not in request.files:
+        return jsonify({'error': 'File tidak ditemukan'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'Tidak ada file yang dipilih'}), 400
+
+    return run_upload_import('import-buyers', run_import_buyers, file)
+
+def run_import_buyers(source, fmt='xlsx', progress=no_progress):
+    """Import pembeli offline dari file Excel/CSV per potongan baris; mengembalikan (payload, status HTTP)."""
+    try:
+        reader = spreadsheet.SheetReader(source, fmt, as_text=True)
+        if 'Nama' not in reader.columns:
+            return {'error': "Kolom 'Nama' tidak ditemukan di file Excel."}, 400
+
+        conn = get_db_connection()
+        imported = 0
+        updated = 0
+        processed = 0
+
+        with conn.cursor() as cursor:
+            sql_upsert = """
+                INSERT INTO offline_buyers (name, address) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE address = VALUES(address)
+            """
+            for df in reader:
+                processed += len(df)
+                # Normalisasi per kolom (bukan per baris)
+                df = df.fillna('').reindex(columns=['Nama', 'Alamat'], fill_value='')
+                df['Nama'] = df['Nama'].str.strip()
+                df['Alamat'] = df['Alamat'].str.strip()
+                df = df[df['Nama'] != ''].drop_duplicates('Nama', keep='last')
+                rows = list(zip(df['Nama'].tolist(), df['Alamat'].tolist()))
+                for chunk in iter_chunks(rows):
+                    existing = count_existing_names(cursor, 'offline_buyers', [row[0] for row in chunk])
+                    cursor.executemany(sql_upsert, chunk)
+                    imported += len(chunk) - existing
+                    updated += existing
+                progress(processed, reader.total_rows)
+
+        conn.commit()
+        return {'message': f'Data berhasil diimpor! Ditambahkan: {imported}, Diupdate: {updated}'}, 200
+
+    except Exception as e:
+        return {'error': f"Error memproses file: {str(e)}"}, 500
+    finally:
+        if 'conn' in locals() and conn.open:
+            conn.close()
+
+@bp.route('/api/update-buyer', methods=['POST'])
+@login_required
+def update_buyer():
+    data = request.json
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Gunakan cursor dan placeholder %s
+            sql = "UPDATE offline_buyers SET name = %s, address = %s WHERE id = %s"
+            cursor.execute(sql, (data['name'], data['address'], data['id']))
+        conn.commit()
+        return jsonify({'message': 'Data pembeli berhasil diupdate!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+@bp.route('/api/delete-buyer/<int:buyer_id>', methods=['POST'])
+@login_required
+def delete_buyer(buyer_id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Cek transaksi terlebih dahulu
+            cursor.execute(BUYER_SALES_COUNT_QUERY, (buyer_id,))
+            sales_count = cursor.fetchone()['count']
+
+            if sales_count > 0:
+                return jsonify({'error': f'Tidak bisa hapus. Pembeli punya {sales_count} transaksi.'}), 400
+
+            # Jika tidak ada transaksi, hapus pembeli
+            cursor.execute('DELETE FROM buyer_balances WHERE buyer_id = %s', (buyer_id,))
+            cursor.execute('DELETE FROM offline_buyers WHERE id = %s', (buyer_id,))
+        conn.commit()
+        return jsonify({'message': 'Pembeli berhasil dihapus.'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+@bp.route('/api/delete-all-buyers', methods=['POST'])
+@login_required
+def delete_all_buyers():
+    confirm = request.json.get('confirm')
+    if confirm != 'DELETE_ALL_BUYERS':
+        return jsonify({'error': 'Konfirmasi tidak valid'}), 400
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Hapus semua transaksi dulu (mematikan foreign key check sementara)
+            cursor.execute('SET FOREIGN_KEY_CHECKS=0;')
+            cursor.execute('DELETE FROM offline_sales')
+            # Lalu hapus semua pembeli
+            cursor.execute('DELETE FROM offline_buyers')
+            cursor.execute('SET FOREIGN_KEY_CHECKS=1;')
+            rollups.clear_channel(cursor, 'offline')
+        conn.commit()
+        return jsonify({'message': 'Semua data pembeli dan transaksi offline berhasil dihapus!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
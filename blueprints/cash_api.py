@@ -0,0 +1,231 @@
+# blueprints/cash_api.py
+
+# API catatan kas (admin): daftar dengan ringkasan saldo, tambah/ubah/hapus,
+# dan export rekap kas.
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+import cash_ledger
+from models import db
+from services import get_db_connection, get_page_args, login_required, paginate_rows
+from transfer import dataframe_export, enqueue_export_job, iter_export_rows, stream_export
+
+bp = Blueprint('cash', __name__)
+
+# Lebar kolom file export rekap kas
+CASH_EXPORT_WIDTHS = {'A': 15, 'B': 20, 'C': 40, 'D': 15, 'E': 15}
+
+# --- API UNTUK CASH RECORDS (Dilindungi) ---
+def cash_records_list_query(args):
+    """Query daftar catatan kas (tanpa ORDER/LIMIT) beserta parameternya dari filter `args`."""
+    query = "SELECT *, DATE_FORMAT(record_date, '%%d-%%m-%%Y') as record_date_formatted FROM cash_records WHERE 1=1"
+    params = []
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    record_type = args.get('type')
+
+    if start_date:
+        query += " AND record_date >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND record_date <= %s"
+        params.append(end_date)
+    if record_type:
+        query += " AND type = %s"
+        params.append(record_type)
+    return query, params
+
+@bp.route('/api/cash-records', methods=['GET'])
+@login_required
+def get_cash_records():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            query, params = cash_records_list_query(request.args)
+
+            limit, after_id, _ = get_page_args()
+            next_after_id = None
+            if limit is None:
+                query += " ORDER BY record_date DESC, id DESC"
+                cursor.execute(query, params)
+                records = cursor.fetchall()
+            else:
+                if after_id:
+                    # Keyset pada (record_date, id) sesuai urutan daftar
+                    query += " AND (record_date < (SELECT record_date FROM cash_records WHERE id = %s)"
+                    query += " OR (record_date = (SELECT record_date FROM cash_records WHERE id = %s) AND id < %s))"
+                    params.extend([after_id, after_id, after_id])
+                query += " ORDER BY record_date DESC, id DESC LIMIT %s"
+                params.append(limit + 1)
+                cursor.execute(query, params)
+                records, next_after_id = paginate_rows(cursor.fetchall(), limit)
+            
+            # Ringkasan dihitung dari snapshot saldo harian, bukan SUM ulang atas rentang
+            total_debit, total_kredit = cash_ledger.range_totals(cursor, start_date, end_date)
+            total_kas = total_debit - total_kredit
+
+            return jsonify({
+                'records': records,
+                'next_after_id': next_after_id,
+                'summary': {
+                    'total_debit': float(total_debit),
+                    'total_kredit': float(total_kredit),
+                    'total_kas': float(total_kas)
+                }
+            })
+    except Exception as e:
+        print(f"Error getting cash records: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+@bp.route('/api/add-cash-record', methods=['POST'])
+@login_required
+def add_cash_record():
+    data = request.json
+    if data.get('type') not in cash_ledger.RECORD_TYPES:
+        return jsonify({'error': "Jenis catatan harus 'debit' atau 'kredit'"}), 400
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: catatan dan snapshot saldo berubah bersama
+        conn.begin()
+        with conn.cursor() as cursor:
+            cash_ledger.lock_ledger(cursor)
+            sql = "INSERT INTO cash_records (type, amount, description, category, record_date) VALUES (%s, %s, %s, %s, %s)"
+            cursor.execute(sql, (data['type'], data['amount'], data['description'], data.get('category', ''), data['record_date']))
+            cash_ledger.apply_record(cursor, data['record_date'], data['type'], data['amount'])
+        conn.commit()
+        return jsonify({'message': 'Catatan kas berhasil ditambahkan!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+@bp.route('/api/update-cash-record', methods=['POST'])
+@login_required
+def update_cash_record():
+    data = request.json
+    if data.get('type') not in cash_ledger.RECORD_TYPES:
+        return jsonify({'error': "Jenis catatan harus 'debit' atau 'kredit'"}), 400
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: catatan dan snapshot saldo berubah bersama
+        conn.begin()
+        with conn.cursor() as cursor:
+            cash_ledger.lock_ledger(cursor)
+            existed = cash_ledger.remove_record(cursor, data['id'])
+            sql = "UPDATE cash_records SET type = %s, amount = %s, description = %s, category = %s, record_date = %s WHERE id = %s"
+            cursor.execute(sql, (data['type'], data['amount'], data['description'], data.get('category', ''), data['record_date'], data['id']))
+            if existed:
+                cash_ledger.apply_record(cursor, data['record_date'], data['type'], data['amount'])
+        conn.commit()
+        return jsonify({'message': 'Catatan kas berhasil diupdate!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+@bp.route('/api/delete-cash-record/<int:record_id>', methods=['POST'])
+@login_required
+def delete_cash_record(record_id):
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: catatan dan snapshot saldo berubah bersama
+        conn.begin()
+        with conn.cursor() as cursor:
+            cash_ledger.lock_ledger(cursor)
+            cash_ledger.remove_record(cursor, record_id)
+            cursor.execute('DELETE FROM cash_records WHERE id = %s', (record_id,))
+        conn.commit()
+        return jsonify({'message': 'Catatan kas berhasil dihapus!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+def with_cash_summary(rows):
+    """Meneruskan baris export kas dan menambahkan ringkasan total di akhir."""
+    yield next(rows)
+    total_debit = 0.0
+    total_kredit = 0.0
+    for row in rows:
+        if row[1].startswith('Debit'):
+            total_debit += float(row[4] or 0)
+        else:
+            total_kredit += float(row[4] or 0)
+        yield row
+    yield ['', '', '', '', '']
+    yield ['RINGKASAN', '', '', '', '']
+    yield ['Total Debit', '', '', '', total_debit]
+    yield ['Total Kredit', '', '', '', total_kredit]
+    yield ['Saldo Akhir', '', '', '', total_debit - total_kredit]
+
+CASH_EXPORT_QUERY = """
+        SELECT 
+            DATE_FORMAT(record_date, '%%d-%%m-%%Y') as 'Tanggal',
+            CASE 
+                WHEN type = 'debit' THEN 'Debit (Kas Masuk)'
+                ELSE 'Kredit (Kas Keluar)'
+            END as 'Jenis Transaksi',
+            description as 'Keterangan',
+            category as 'Kategori',
+            amount as 'Jumlah'
+        FROM cash_records
+        ORDER BY record_date DESC, id DESC
+        """
+
+@bp.route('/api/export-cash-records')
+@login_required
+def export_cash_records():
+    if request.args.get('mode') == 'job':
+        return enqueue_export_job('export-cash-records')
+    try:
+        # Pakai engine SQLAlchemy bersama (pool yang sama dengan get_db_connection)
+        engine = db.engine
+        query = CASH_EXPORT_QUERY
+
+        if request.args.get('mode') == 'stream':
+            filename = f'rekap_kas_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+            rows = with_cash_summary(iter_export_rows(query, {}))
+            return stream_export(rows, 'Rekap Kas', CASH_EXPORT_WIDTHS, filename)
+
+        import pandas as pd
+
+        df = pd.read_sql_query(query, engine)
+        
+        # Total keseluruhan diambil dari snapshot saldo harian terakhir
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                total_debit, total_kredit = cash_ledger.range_totals(cursor)
+        finally:
+            conn.close()
+        saldo_akhir = total_debit - total_kredit
+        
+        summary_df = pd.DataFrame([
+            {'Tanggal': '', 'Jenis Transaksi': '', 'Keterangan': '', 'Kategori': '', 'Jumlah': ''},
+            {'Tanggal': 'RINGKASAN', 'Jenis Transaksi': '', 'Keterangan': '', 'Kategori': '', 'Jumlah': ''},
+            {'Tanggal': 'Total Debit', 'Jenis Transaksi': '', 'Keterangan': '', 'Kategori': '', 'Jumlah': total_debit},
+            {'Tanggal': 'Total Kredit', 'Jenis Transaksi': '', 'Keterangan': '', 'Kategori': '', 'Jumlah': total_kredit},
+            {'Tanggal': 'Saldo Akhir', 'Jenis Transaksi': '', 'Keterangan': '', 'Kategori': '', 'Jumlah': saldo_akhir}
+        ])
+        
+        final_df = pd.concat([df, summary_df], ignore_index=True)
+        
+        filename = f'rekap_kas_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+        return dataframe_export(final_df, 'Rekap Kas', CASH_EXPORT_WIDTHS, filename)
+
+    except Exception as e:
+        print(f"Error exporting cash records: {str(e)}")
+        return "Terjadi kesalahan saat membuat file export.", 500
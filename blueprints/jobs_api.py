@@ -0,0 +1,49 @@
+# blueprints/jobs_api.py
+
+# API status dan unduhan hasil job import/export latar belakang (admin).
+
+import os
+
+from flask import Blueprint, jsonify, send_file, url_for
+
+import services
+from services import login_required
+
+bp = Blueprint('jobs', __name__)
+
+# --- API UNTUK JOB IMPORT/EXPORT (Dilindungi) ---
+@bp.route('/api/jobs/<job_id>')
+@login_required
+def get_job(job_id):
+    """Status dan progres job; job export yang selesai menyertakan download_url."""
+    try:
+        job = services.job_queue.get(job_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if not job:
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+
+    payload = {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'message': job['message'],
+        'error': job['error'],
+        'result': job['result'],
+        'created_at': job['created_at'].isoformat() if job['created_at'] else None,
+        'started_at': job['started_at'].isoformat() if job['started_at'] else None,
+        'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None,
+    }
+    if job['status'] == 'finished' and job['result_path']:
+        payload['download_url'] = url_for('jobs.download_job', job_id=job_id)
+    return jsonify(payload)
+
+@bp.route('/api/jobs/<job_id>/download')
+@login_required
+def download_job(job_id):
+    """Unduh file hasil job export yang sudah selesai."""
+    job = services.job_queue.get(job_id)
+    if not job or job['status'] != 'finished' or not job['result_path'] or not os.path.exists(job['result_path']):
+        return jsonify({'error': 'File hasil job tidak ditemukan'}), 404
+    return send_file(job['result_path'], download_name=job['result']['filename'], as_attachment=True)
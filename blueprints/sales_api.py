@@ -0,0 +1,739 @@
+# blueprints/sales_api.py
+
+# API penjualan (admin): input transaksi offline/online, riwayat dan ringkasan
+# dashboard, edit/hapus transaksi, serta import/export rekap penjualan.
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+import buyer_directory
+import rollups
+import spreadsheet
+from models import db
+from services import date_range_filter, get_db_connection, get_page_args, login_required, paginate_rows
+from transfer import (dataframe_export, enqueue_export_job, excel_text_column, fetch_rows_by_name, iter_chunks,
+                      iter_export_rows, no_progress, run_upload_import, stream_export)
+
+bp = Blueprint('sales', __name__)
+
+# Lebar kolom file export (sama untuk mode biasa, mode stream, dan job)
+OFFLINE_EXPORT_WIDTHS = {'A': 18, 'B': 25, 'C': 30, 'D': 25, 'E': 10, 'F': 15, 'G': 15, 'H': 18}
+ONLINE_EXPORT_WIDTHS = {'A': 18, 'B': 18, 'C': 25, 'D': 35, 'E': 25, 'F': 10, 'G': 15, 'H': 15, 'I': 15}
+
+# --- API UNTUK TRANSAKSI PENJUALAN (Dilindungi) ---
+def fetch_book_prices(cursor, book_ids):
+    """Harga semua kitab di keranjang dalam satu query: dict id -> price.
+
+    Melempar ValueError bila ada id kitab yang tidak ditemukan.
+    """
+    unique_ids = tuple(dict.fromkeys(int(book_id) for book_id in book_ids))
+    if not unique_ids:
+        return {}
+    cursor.execute('SELECT id, price FROM books WHERE id IN %s', (unique_ids,))
+    prices = {row['id']: row['price'] for row in cursor.fetchall()}
+    missing = next((book_id for book_id in unique_ids if book_id not in prices), None)
+    if missing is not None:
+        raise ValueError(f"Kitab dengan ID {missing} tidak ditemukan")
+    return prices
+
+def offline_sale_deltas(rows, sale_date):
+    """Selisih rekap dari baris INSERT offline_sales (buyer_id, book_id, quantity, total_price, payment_status, ...)."""
+    return [{'day': sale_date.date(), 'book_id': book_id, 'buyer_id': buyer_id, 'payment_status': payment_status,
+             'quantity': quantity, 'total_price': total_price, 'shipping': 0}
+            for buyer_id, book_id, quantity, total_price, payment_status, *_ in rows]
+
+def online_sale_deltas(rows, sale_date):
+    """Selisih rekap dari baris INSERT online_sales (nama, alamat, book_id, quantity, ongkir, total, tanggal transfer, ...)."""
+    return [{'day': transfer_date or sale_date.date(), 'book_id': book_id, 'quantity': quantity,
+             'total_price': total_price, 'shipping': shipping_cost}
+            for _, _, book_id, quantity, shipping_cost, total_price, transfer_date, *_ in rows]
+
+@bp.route('/api/add-offline-sale', methods=['POST'])
+@login_required
+def add_offline_sale():
+    data = request.json
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: keranjang tersimpan semua atau tidak sama sekali
+        conn.begin()
+        with conn.cursor() as cursor:
+            items = data.get('items', [])
+            prices = fetch_book_prices(cursor, [item['book_id'] for item in items])
+            
+            sale_date = rollups.database_now(cursor)
+            rows = [(data.get('buyer_id'), item['book_id'], item['quantity'],
+                     prices[int(item['book_id'])] * int(item['quantity']), data.get('payment_status', 'Lunas'), sale_date)
+                    for item in items]
+            if rows:
+                sql = 'INSERT INTO offline_sales (buyer_id, book_id, quantity, total_price, payment_status, sale_date) VALUES (%s, %s, %s, %s, %s, %s)'
+                cursor.executemany(sql, rows)
+                rollups.add_new_sales(cursor, 'offline', offline_sale_deltas(rows, sale_date))
+        conn.commit()
+        return jsonify({'message': 'Transaksi offline berhasil disimpan!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/add-online-sale', methods=['POST'])
+@login_required
+def add_online_sale():
+    data = request.json
+    conn = get_db_connection()
+    try:
+        # Logika ini untuk form penjualan online multi-item
+        if 'items' in data and data['items']:
+            items = data['items']
+            # Total ongkir dari form dibagi rata ke setiap item
+            item_shipping_cost = float(data.get('shipping_cost', 0)) / len(items)
+        else:
+            # Fallback jika ada yang mengirim data dengan format lama (single item)
+            items = [{'book_id': data['book_id'], 'quantity': data.get('quantity', 1)}]
+            item_shipping_cost = float(data.get('shipping_cost', 0))
+
+        # Satu transaksi eksplisit: keranjang tersimpan semua atau tidak sama sekali
+        conn.begin()
+        with conn.cursor() as cursor:
+            try:
+                prices = fetch_book_prices(cursor, [item['book_id'] for item in items])
+            except ValueError:
+                if 'items' in data and data['items']:
+                    raise
+                conn.rollback()
+                return jsonify({'error': 'Kitab tidak ditemukan'}), 404
+
+            sale_date = rollups.database_now(cursor)
+            rows = []
+            for item in items:
+                quantity = int(item.get('quantity', 1))
+                total_price = (float(prices[int(item['book_id'])]) * quantity) + item_shipping_cost
+                rows.append((data['buyer_name'], data['buyer_address'], item['book_id'], quantity, item_shipping_cost,
+                             total_price, data['transfer_date'], sale_date))
+
+            sql = """INSERT INTO online_sales 
+                     (buyer_name, buyer_address, book_id, quantity, shipping_cost, total_price, transfer_date, sale_date) 
+                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+            cursor.executemany(sql, rows)
+            rollups.add_new_sales(cursor, 'online', online_sale_deltas(rows, sale_date))
+            buyer_directory.remember_online_buyers(cursor, [(data['buyer_name'], data['buyer_address'])])
+
+        conn.commit()
+        return jsonify({'message': 'Rekap online berhasil ditambahkan!'})
+    except Exception as e:
+        conn.rollback()
+        # Mengembalikan pesan error yang lebih spesifik ke frontend
+        return jsonify({'error': f"Error memproses: {str(e)}"}), 500
+    finally:
+        if conn and conn.open:
+            conn.close()
+
+# --- API UNTUK REKAP PENJUALAN (Dilindungi) ---
+def offline_sales_filter(args):
+    """Filter WHERE transaksi offline (status bayar, rentang sale_date) dari `args`; dipakai daftar dan export."""
+    clause = ""
+    params = []
+    payment_status = args.get('payment_status')
+    if payment_status and payment_status != 'all':
+        clause += " AND os.payment_status = %s"
+        params.append(payment_status)
+    date_clause, date_params = date_range_filter('os.sale_date', args.get('start_date'), args.get('end_date'))
+    return clause + date_clause, params + date_params
+
+def offline_sales_list_query(args):
+    """Query daftar transaksi offline (tanpa ORDER/LIMIT) beserta parameternya dari filter `args`."""
+    # Ganti strftime menjadi DATE_FORMAT
+    query = """
+            SELECT os.id, ob.name as buyer_name, ob.address, b.name as book_name, 
+                   os.quantity, os.total_price, os.payment_status,
+                   DATE_FORMAT(os.sale_date, '%%d-%%m-%%Y %%H:%%i') as sale_date_formatted
+            FROM offline_sales os
+            JOIN offline_buyers ob ON os.buyer_id = ob.id
+            JOIN books b ON os.book_id = b.id
+            WHERE 1=1
+            """
+    clause, params = offline_sales_filter(args)
+    return query + clause, params
+
+@bp.route('/api/recent-offline-sales')
+@login_required
+def get_all_offline_sales():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            query, params = offline_sales_list_query(request.args)
+
+            limit, after_id, with_total = get_page_args()
+            if limit is None:
+                query += " ORDER BY os.id DESC"
+                cursor.execute(query, params)
+                return jsonify(cursor.fetchall())
+
+            total = None
+            if with_total:
+                # Hitung dari tabel utama saja (tanpa JOIN) dengan filter yang sama
+                clause, count_params = offline_sales_filter(request.args)
+                cursor.execute("SELECT COUNT(*) as total FROM offline_sales os WHERE 1=1" + clause, count_params)
+                total = cursor.fetchone()['total']
+
+            if after_id:
+                query += " AND os.id < %s"
+                params.append(after_id)
+            query += " ORDER BY os.id DESC LIMIT %s"
+            params.append(limit + 1)
+
+            cursor.execute(query, params)
+            sales, next_after_id = paginate_rows(cursor.fetchall(), limit)
+            return jsonify({'sales': sales, 'next_after_id': next_after_id, 'total': total})
+    finally:
+        conn.close()
+
+def online_sales_filter(args):
+    """Filter WHERE transaksi online (rentang transfer_date) dari `args`; dipakai daftar dan export."""
+    return date_range_filter('os.transfer_date', args.get('start_date'), args.get('end_date'))
+
+def online_sales_list_query(args):
+    """Query daftar transaksi online (tanpa ORDER/LIMIT) beserta parameternya dari filter `args`."""
+    # Ganti strftime menjadi DATE_FORMAT
+    query = """
+            SELECT 
+                os.id, os.buyer_name, os.buyer_address, b.name as book_name, os.shipping_cost, 
+                os.total_price, os.quantity,
+                DATE_FORMAT(os.sale_date, '%%d-%%m-%%Y %%H:%%i') as sale_date_formatted,
+                DATE_FORMAT(os.transfer_date, '%%d-%%m-%%Y') as transfer_date_formatted
+            FROM online_sales os
+            JOIN books b ON os.book_id = b.id
+            WHERE 1=1
+            """
+    clause, params = online_sales_filter(args)
+    return query + clause, params
+
+@bp.route('/api/recent-online-sales')
+@login_required
+def get_all_online_sales():
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            query, params = online_sales_list_query(request.args)
+
+            limit, after_id, with_total = get_page_args()
+            if limit is None:
+                query += " ORDER BY os.id DESC"
+                cursor.execute(query, params)
+                return jsonify(cursor.fetchall())
+
+            total = None
+            if with_total:
+                # Hitung dari tabel utama saja (tanpa JOIN) dengan filter yang sama
+                clause, count_params = online_sales_filter(request.args)
+                cursor.execute("SELECT COUNT(*) as total FROM online_sales os WHERE 1=1" + clause, count_params)
+                total = cursor.fetchone()['total']
+
+            if after_id:
+                query += " AND os.id < %s"
+                params.append(after_id)
+            query += " ORDER BY os.id DESC LIMIT %s"
+            params.append(limit + 1)
+
+            cursor.execute(query, params)
+            sales, next_after_id = paginate_rows(cursor.fetchall(), limit)
+            return jsonify({'sales': sales, 'next_after_id': next_after_id, 'total': total})
+    finally:
+        conn.close()
+
+# --- API RINGKASAN DASHBOARD (Dilindungi) ---
+@bp.route('/api/dashboard/summary')
+@login_required
+def get_dashboard_summary():
+    """Total kitab, omzet offline/online, ongkir, dan seri harian untuk grafik dashboard."""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+
+    # Dibaca dari rekap harian (sales_daily_rollups), bukan dari tabel penjualan
+    date_filter, date_params = date_range_filter('sale_day', start_date, end_date)
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) as total FROM books')
+            total_books = cursor.fetchone()['total']
+
+            cursor.execute(
+                "SELECT DATE_FORMAT(sale_day, '%%d-%%m-%%Y') as date, channel, "
+                "SUM(revenue) as revenue, SUM(shipping) as shipping "
+                "FROM sales_daily_rollups WHERE 1=1" + date_filter + " GROUP BY sale_day, channel",
+                date_params)
+            daily_rows = cursor.fetchall()
+
+        series = {}
+        totals = {'offline': 0.0, 'online': 0.0, 'shipping': 0.0}
+        for row in daily_rows:
+            day = series.setdefault(row['date'], {'offline': 0.0, 'online': 0.0, 'shipping': 0.0})
+            day[row['channel']] += float(row['revenue'])
+            day['shipping'] += float(row['shipping'])
+            totals[row['channel']] += float(row['revenue'])
+            totals['shipping'] += float(row['shipping'])
+
+        return jsonify({
+            'total_books': total_books,
+            'total_offline': totals['offline'],
+            'total_online': totals['online'],
+            'total_shipping': totals['shipping'],
+            'daily': series
+        })
+    except Exception as e:
+        print(f"Error getting dashboard summary: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+# --- API UNTUK EDIT/HAPUS TRANSAKSI OFFLINE ---
+@bp.route('/api/update-offline-sale', methods=['POST'])
+@login_required
+def update_offline_sale():
+    data = request.json
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: rekap dikurangi, baris diubah, rekap ditambah, atau tidak sama sekali
+        conn.begin()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT price FROM books WHERE id = %s', (data['book_id'],))
+            book = cursor.fetchone()
+            if not book:
+                conn.rollback()
+                return jsonify({'error': 'Kitab tidak ditemukan'}), 404
+            
+            total_price = float(book['price']) * int(data['quantity'])
+            
+            rollups.remove_sales(cursor, 'offline', [data['id']])
+            sql = '''
+                UPDATE offline_sales 
+                SET buyer_id = %s, book_id = %s, quantity = %s, total_price = %s, payment_status = %s
+                WHERE id = %s
+            '''
+            cursor.execute(sql, (data['buyer_id'], data['book_id'], data['quantity'], total_price, data['payment_status'], data['id']))
+            rollups.add_sales(cursor, 'offline', [data['id']])
+        conn.commit()
+        return jsonify({'message': 'Transaksi offline berhasil diupdate!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/delete-offline-sale/<int:sale_id>', methods=['POST'])
+@login_required
+def delete_offline_sale(sale_id):
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: rekap dan baris penjualan berubah bersama
+        conn.begin()
+        with conn.cursor() as cursor:
+            rollups.remove_sales(cursor, 'offline', [sale_id])
+            cursor.execute('DELETE FROM offline_sales WHERE id = %s', (sale_id,))
+        conn.commit()
+        return jsonify({'message': 'Transaksi offline berhasil dihapus!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/get-offline-sale/<int:sale_id>', methods=['GET'])
+@login_required
+def get_offline_sale(sale_id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                SELECT os.*, ob.name as buyer_name, b.name as book_name
+                FROM offline_sales os
+                JOIN offline_buyers ob ON os.buyer_id = ob.id
+                JOIN books b ON os.book_id = b.id
+                WHERE os.id = %s
+            ''', (sale_id,))
+            sale = cursor.fetchone()
+            if not sale:
+                return jsonify({'error': 'Transaksi tidak ditemukan'}), 404
+            return jsonify(sale)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+# --- API UNTUK EDIT/HAPUS TRANSAKSI ONLINE ---
+@bp.route('/api/update-online-sale', methods=['POST'])
+@login_required
+def update_online_sale():
+    data = request.json
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: rekap dikurangi, baris diubah, rekap ditambah, atau tidak sama sekali
+        conn.begin()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT price FROM books WHERE id = %s', (data['book_id'],))
+            book = cursor.fetchone()
+            if not book:
+                conn.rollback()
+                return jsonify({'error': 'Kitab tidak ditemukan'}), 404
+
+            total_price = (float(book['price']) * int(data['quantity'])) + float(data['shipping_cost'])
+            
+            rollups.remove_sales(cursor, 'online', [data['id']])
+            sql = '''
+                UPDATE online_sales 
+                SET buyer_name = %s, buyer_address = %s, book_id = %s, 
+                    quantity = %s, shipping_cost = %s, total_price = %s, transfer_date = %s
+                WHERE id = %s
+            '''
+            cursor.execute(sql, (data['buyer_name'], data['buyer_address'], data['book_id'], data['quantity'], 
+                                 data['shipping_cost'], total_price, data['transfer_date'], data['id']))
+            rollups.add_sales(cursor, 'online', [data['id']])
+            buyer_directory.remember_online_buyers(cursor, [(data['buyer_name'], data['buyer_address'])])
+        conn.commit()
+        return jsonify({'message': 'Transaksi online berhasil diupdate!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/delete-online-sale/<int:sale_id>', methods=['POST'])
+@login_required
+def delete_online_sale(sale_id):
+    conn = get_db_connection()
+    try:
+        # Satu transaksi eksplisit: rekap dan baris penjualan berubah bersama
+        conn.begin()
+        with conn.cursor() as cursor:
+            rollups.remove_sales(cursor, 'online', [sale_id])
+            cursor.execute('DELETE FROM online_sales WHERE id = %s', (sale_id,))
+        conn.commit()
+        return jsonify({'message': 'Transaksi online berhasil dihapus!'})
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/api/get-online-sale/<int:sale_id>', methods=['GET'])
+@login_required
+def get_online_sale(sale_id):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            # Ganti strftime menjadi DATE_FORMAT
+            cursor.execute('''
+                SELECT os.*, b.name as book_name,
+                       DATE_FORMAT(os.transfer_date, '%%Y-%%m-%%d') as transfer_date_formatted
+                FROM online_sales os
+                JOIN books b ON os.book_id = b.id
+                WHERE os.id = %s
+            ''', (sale_id,))
+            sale = cursor.fetchone()
+            if not sale:
+                return jsonify({'error': 'Transaksi tidak ditemukan'}), 404
+            return jsonify(sale)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+# --- API UNTUK EXPORT & IMPORT EXCEL (Dilindungi) ---
+def offline_export_query(args):
+    """Query export transaksi offline beserta parameternya dari filter `args`."""
+    query = """
+        SELECT DATE_FORMAT(os.sale_date, '%%d-%%m-%%Y %%H:%%i') as 'Tanggal Transaksi', 
+               ob.name as 'Nama Pembeli', 
+               ob.address as 'Alamat', 
+               b.name as 'Nama Kitab', 
+               os.quantity as 'Jumlah', 
+               b.price as 'Harga Satuan', 
+               os.total_price as 'Total Harga',
+               IFNULL(os.payment_status, 'Lunas') as 'Status Pembayaran'
+        FROM offline_sales os
+        JOIN offline_buyers ob ON os.buyer_id = ob.id
+        JOIN books b ON os.book_id = b.id
+        WHERE 1=1
+        """
+        
+    clause, params = offline_sales_filter(args)
+    return query + clause + " ORDER BY os.id DESC", tuple(params)
+
+@bp.route('/api/export-offline-sales')
+@login_required
+def export_offline():
+    if request.args.get('mode') == 'job':
+        return enqueue_export_job('export-offline-sales')
+    try:
+        # Pakai engine SQLAlchemy bersama (pool yang sama dengan get_db_connection)
+        engine = db.engine
+        query, final_params = offline_export_query(request.args)
+
+        if request.args.get('mode') == 'stream':
+            filename = f"rekap_offline_{datetime.now().strftime('%Y%m%d')}"
+            return stream_export(iter_export_rows(query, final_params), 'Rekap Offline', OFFLINE_EXPORT_WIDTHS, filename)
+
+        import pandas as pd
+
+        df = pd.read_sql_query(query, engine, params=final_params if final_params else None)
+        filename = f"rekap_offline_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        return dataframe_export(df, 'Rekap Offline', OFFLINE_EXPORT_WIDTHS, filename)
+
+    except Exception as e:
+        print(f"Error exporting offline sales: {e}")
+        return "Gagal mengekspor data", 500
+
+@bp.route('/api/import-offline-sales', methods=['POST'])
+@login_required
+def import_offline_sales():
+    if 'file' not in request.files:
+        return jsonify({'error': 'Tidak ada file yang di-upload'}), 400
+    file = request.files['file']
+    return run_upload_import('import-offline-sales', run_import_offline_sales, file)
+
+def run_import_offline_sales(source, fmt='xlsx', progress=no_progress):
+    """Import transaksi offline dari file Excel/CSV per potongan baris; mengembalikan (payload, status HTTP)."""
+    import pandas as pd
+
+    try:
+        reader = spreadsheet.SheetReader(source, fmt)
+        imported = 0
+        skipped = 0
+        warnings = []
+
+        missing_column = next((c for c in ('Nama Pembeli', 'Nama Kitab', 'Jumlah') if c not in reader.columns), None)
+        if missing_column:
+            warnings = [f"Baris {index+2}: '{missing_column}'" for df in reader for index in df.index]
+            message = f'Import selesai! Berhasil: {imported}, Dilewati: {len(warnings)}'
+            return {'message': message, 'warnings': warnings}, 200
+
+        conn = get_db_connection()
+        processed = 0
+        with conn.cursor() as cursor:
+            sql = 'INSERT INTO offline_sales (buyer_id, book_id, quantity, total_price, payment_status, sale_date) VALUES (%s, %s, %s, %s, %s, %s)'
+            for df in reader:
+                # Normalisasi per kolom
+                buyer_names = df['Nama Pembeli'].astype(str).str.strip().tolist()
+                book_names = df['Nama Kitab'].astype(str).str.strip().tolist()
+                quantities = pd.to_numeric(df['Jumlah'], errors='coerce').tolist()
+                addresses = excel_text_column(df, 'Alamat', '')
+                statuses = excel_text_column(df, 'Status Pembayaran', 'Lunas')
+
+                # Resolusi nama -> id dengan query berbasis himpunan, bukan per baris
+                books = fetch_rows_by_name(cursor, 'books', 'id, name, price', book_names)
+                buyers = fetch_rows_by_name(cursor, 'offline_buyers', 'id, name', buyer_names)
+
+                pending = []
+                new_buyers = {}
+                for index, buyer_name, book_name, jumlah, alamat, payment_status in zip(
+                        df.index, buyer_names, book_names, quantities, addresses, statuses):
+                    if pd.isna(jumlah):
+                        warnings.append(f"Baris {index+2}: Jumlah tidak valid")
+                        skipped += 1
+                        continue
+                    book = books.get(book_name.casefold())
+                    if not book:
+                        warnings.append(f"Baris {index+2}: Kitab '{book_name}' tidak ditemukan")
+                        skipped += 1
+                        continue
+                    if buyer_name.casefold() not in buyers:
+                        new_buyers.setdefault(buyer_name.casefold(), (buyer_name, alamat))
+                    pending.append((index, buyer_name, book, int(jumlah), payment_status))
+
+                # Buat semua pembeli baru di potongan ini sekaligus. Nama yang
+                # menurut collation MySQL sudah ada (beda aksen/huruf besar)
+                # dilewati INSERT IGNORE lalu dicari dengan `name = %s`, yang
+                # memakai collation yang sama.
+                if new_buyers:
+                    cursor.executemany('INSERT IGNORE INTO offline_buyers (name, address) VALUES (%s, %s)', list(new_buyers.values()))
+                    buyers.update(fetch_rows_by_name(cursor, 'offline_buyers', 'id, name', [name for name, _ in new_buyers.values()]))
+                    for key, (name, _) in new_buyers.items():
+                        if key not in buyers:
+                            cursor.execute('SELECT id, name FROM offline_buyers WHERE name = %s', (name,))
+                            row = cursor.fetchone()
+                            if row:
+                                buyers[key] = row
+
+                resolved = []
+                for item in pending:
+                    index, buyer_name = item[0], item[1]
+                    if buyer_name.casefold() not in buyers:
+                        warnings.append(f"Baris {index+2}: Pembeli '{buyer_name}' tidak bisa dibuat")
+                        skipped += 1
+                        continue
+                    resolved.append(item)
+
+                for chunk in iter_chunks(resolved):
+                    sale_date = rollups.database_now(cursor)
+                    rows = [(buyers[buyer_name.casefold()]['id'], book['id'], jumlah, book['price'] * jumlah, payment_status, sale_date)
+                            for _, buyer_name, book, jumlah, payment_status in chunk]
+                    try:
+                        # Penjualan dan rekapnya masuk bersama, atau tidak sama sekali
+                        conn.begin()
+                        cursor.executemany(sql, rows)
+                        rollups.add_new_sales(cursor, 'offline', offline_sale_deltas(rows, sale_date))
+                        conn.commit()
+                        imported += len(rows)
+                    except Exception as e:
+                        conn.rollback()
+                        warnings.extend(f"Baris {index+2}: {str(e)}" for index, *_ in chunk)
+                        skipped += len(rows)
+                processed += len(df)
+                progress(processed, reader.total_rows)
+
+        message = f'Import selesai! Berhasil: {imported}, Dilewati: {skipped}'
+        return {'message': message, 'warnings': warnings}, 200
+
+    except Exception as e:
+        return {'error': f'Error memproses file: {str(e)}'}, 500
+    finally:
+        if 'conn' in locals() and conn.open:
+            conn.close()
+
+@bp.route('/api/import-online-sales', methods=['POST'])
+@login_required
+def import_online_sales():
+    if 'file' not in request.files:
+        return jsonify({'error': 'Tidak ada file yang di-upload'}), 400
+    file = request.files['file']
+    return run_upload_import('import-online-sales', run_import_online_sales, file)
+
+def run_import_online_sales(source, fmt='xlsx', progress=no_progress):
+    """Import transaksi online dari file Excel/CSV per potongan baris; mengembalikan (payload, status HTTP)."""
+    import pandas as pd
+
+    try:
+        reader = spreadsheet.SheetReader(source, fmt)
+        imported = 0
+        skipped = 0
+        warnings = []
+
+        missing_column = next((c for c in ('Nama Pembeli', 'Nama Kitab', 'Jumlah') if c not in reader.columns), None)
+        if missing_column:
+            warnings = [f"Baris {index+2}: '{missing_column}'" for df in reader for index in df.index]
+            message = f'Import selesai! Berhasil: {imported}, Dilewati: {len(warnings)}'
+            return {'message': message, 'warnings': warnings}, 200
+
+        conn = get_db_connection()
+        processed = 0
+        with conn.cursor() as cursor:
+            sql = 'INSERT INTO online_sales (buyer_name, buyer_address, book_id, quantity, shipping_cost, total_price, transfer_date, sale_date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'
+            for df in reader:
+                # Normalisasi per kolom
+                buyer_names = df['Nama Pembeli'].astype(str).str.strip().tolist()
+                book_names = df['Nama Kitab'].astype(str).str.strip().tolist()
+                quantities = pd.to_numeric(df['Jumlah'], errors='coerce').tolist()
+                addresses = excel_text_column(df, 'Alamat Kirim', '')
+                if 'Ongkir' in df:
+                    shipping_costs = pd.to_numeric(df['Ongkir'], errors='coerce').tolist()
+                else:
+                    shipping_costs = [15000.0] * len(df)
+
+                # Parsing tanggal transfer untuk seluruh kolom sekaligus
+                if 'Tanggal Transfer' in df:
+                    raw_dates = df['Tanggal Transfer']
+                    parsed_dates = pd.to_datetime(raw_dates, errors='coerce', format='mixed')
+                    invalid_dates = (raw_dates.notna() & parsed_dates.isna()).tolist()
+                    transfer_dates = [d.strftime('%Y-%m-%d') if pd.notna(d) else None for d in parsed_dates]
+                else:
+                    invalid_dates = [False] * len(df)
+                    transfer_dates = [pd.Timestamp.now().strftime('%Y-%m-%d')] * len(df)
+
+                books = fetch_rows_by_name(cursor, 'books', 'id, name, price', book_names)
+
+                pending = []
+                for index, nama_pembeli, nama_kitab, jumlah, alamat_kirim, ongkir, tanggal_transfer, invalid_date in zip(
+                        df.index, buyer_names, book_names, quantities, addresses, shipping_costs, transfer_dates, invalid_dates):
+                    if pd.isna(jumlah):
+                        warnings.append(f"Baris {index+2}: Jumlah tidak valid")
+                        skipped += 1
+                        continue
+                    if pd.isna(ongkir):
+                        warnings.append(f"Baris {index+2}: Ongkir tidak valid")
+                        skipped += 1
+                        continue
+                    if invalid_date:
+                        warnings.append(f"Baris {index+2}: Tanggal Transfer tidak valid")
+                        skipped += 1
+                        continue
+                    book = books.get(nama_kitab.casefold())
+                    if not book:
+                        warnings.append(f"Baris {index+2}: Kitab '{nama_kitab}' tidak ditemukan")
+                        skipped += 1
+                        continue
+                    jumlah = int(jumlah)
+                    total_price = (float(book['price']) * jumlah) + ongkir
+                    pending.append((index, (nama_pembeli, alamat_kirim, book['id'], jumlah, ongkir, total_price, tanggal_transfer)))
+
+                for chunk in iter_chunks(pending):
+                    sale_date = rollups.database_now(cursor)
+                    rows = [row + (sale_date,) for _, row in chunk]
+                    try:
+                        # Penjualan, rekap, dan direktori pembeli masuk bersama, atau tidak sama sekali
+                        conn.begin()
+                        cursor.executemany(sql, rows)
+                        rollups.add_new_sales(cursor, 'online', online_sale_deltas(rows, sale_date))
+                        buyer_directory.remember_online_buyers(cursor, [(row[0], row[1]) for _, row in chunk])
+                        conn.commit()
+                        imported += len(chunk)
+                    except Exception as e:
+                        conn.rollback()
+                        warnings.extend(f"Baris {index+2}: {str(e)}" for index, _ in chunk)
+                        skipped += len(chunk)
+                processed += len(df)
+                progress(processed, reader.total_rows)
+
+        message = f'Import selesai! Berhasil: {imported}, Dilewati: {skipped}'
+        return {'message': message, 'warnings': warnings}, 200
+
+    except Exception as e:
+        return {'error': f'Error memproses file: {str(e)}'}, 500
+    finally:
+        if 'conn' in locals() and conn.open:
+            conn.close()
+
+def online_export_query(args):
+    """Query export transaksi online beserta parameternya dari filter `args`."""
+    query = """
+        SELECT 
+            DATE_FORMAT(os.sale_date, '%%d-%%m-%%Y %%H:%%i') as 'Tanggal Transaksi', 
+            DATE_FORMAT(os.transfer_date, '%%d-%%m-%%Y') as 'Tanggal Transfer',
+            os.buyer_name as 'Nama Pembeli', 
+            os.buyer_address as 'Alamat Pengiriman', 
+            b.name as 'Nama Kitab', 
+            os.quantity as 'Jumlah',
+            b.price as 'Harga Kitab', 
+            os.shipping_cost as 'Ongkir', 
+            os.total_price as 'Total Harga'
+        FROM online_sales os
+        JOIN books b ON os.book_id = b.id
+        WHERE 1=1
+        """
+    clause, params = online_sales_filter(args)
+    return query + clause + " ORDER BY os.id DESC", tuple(params)
+
+@bp.route('/api/export-online-sales')
+@login_required
+def export_online():
+    if request.args.get('mode') == 'job':
+        return enqueue_export_job('export-online-sales')
+    try:
+        # Pakai engine SQLAlchemy bersama (pool yang sama dengan get_db_connection)
+        engine = db.engine
+        query, final_params = online_export_query(request.args)
+
+        if request.args.get('mode') == 'stream':
+            filename = f"rekap_online_{datetime.now().strftime('%Y%m%d')}"
+            return stream_export(iter_export_rows(query, final_params), 'Rekap Online', ONLINE_EXPORT_WIDTHS, filename)
+
+        import pandas as pd
+
+        df = pd.read_sql_query(query, engine, params=final_params if final_params else None)
+        filename = f"rekap_online_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        return dataframe_export(df, 'Rekap Online', ONLINE_EXPORT_WIDTHS, filename)
+
+    except Exception as e:
+        print(f"Error exporting online sales: {e}")
+        return "Gagal mengekspor data", 500
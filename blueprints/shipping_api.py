@@ -0,0 +1,40 @@
+# blueprints/shipping_api.py
+
+# API publik ongkir: pencarian area tujuan dan cek tarif lewat Biteship.
+
+import requests
+from flask import Blueprint, jsonify, request
+
+import services
+
+bp = Blueprint('shipping', __name__)
+
+# --- API Publik untuk Ongkir ---
+@bp.route('/api/cari-area', methods=['GET'])
+def search_areas():
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify([])
+
+    try:
+        # Hasil diambil dari cache bila ada; hanya cache miss yang ke Biteship
+        success, areas = services.biteship.search_areas(query)
+        response = jsonify(areas)
+        # Balasan gagal dari Biteship tidak boleh disimpan browser/CDN selama sejam
+        response.headers['Cache-Control'] = 'public, max-age=3600' if success else 'no-store'
+        return response
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/cek-ongkir', methods=['POST'])
+def post_cek_ongkir_biteship():
+    data = request.json
+
+    try:
+        success, result = services.biteship.get_rates(data['destination_area_id'], int(data['weight']))
+        if success:
+            return jsonify(result)
+        return jsonify({'error': result}), 400
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,167 @@
+# blueprints/shop.py
+
+# Halaman toko publik (/toko, detail kitab, cek ongkir), file upload, dan
+# API pencarian kitab publik. /toko dan detail kitab dikirim dari snapshot
+# statis (snapshot.py) bila sudah diterbitkan untuk versi katalog terkini.
+
+import os
+from datetime import timezone
+
+from flask import (Blueprint, Response, current_app, jsonify, make_response, redirect, render_template, request, send_file,
+                   send_from_directory, url_for)
+from werkzeug.utils import secure_filename
+
+import images
+import services
+import snapshot
+
+bp = Blueprint('shop', __name__)
+
+# Batas jumlah hasil /api/search/books
+MAX_SEARCH_LIMIT = 50
+
+# --- Custom Filter Rupiah ---
+@bp.app_template_filter('rupiah')
+def format_rupiah(value):
+    """Format angka menjadi string dengan pemisah ribuan (titik)."""
+    if value is None: return ""
+    return f"{int(value):,}".replace(",", ".")
+
+@bp.app_template_global('variant_url')
+def variant_url(variant, filename, fmt):
+    """URL varian gambar `variant` dalam format `fmt` (webp/jpg), untuk <picture> di template."""
+    return url_for('shop.uploaded_variant', variant=variant, filename=images.variant_url_name(filename, fmt))
+
+# --- Cache HTTP ---
+def upload_max_age(filename):
+    """Nama berbasis hash tidak pernah berganti isi sehingga boleh di-cache setahun."""
+    if images.is_hashed_filename(filename):
+        return current_app.config['IMMUTABLE_UPLOAD_MAX_AGE']
+    return current_app.config['UPLOAD_MAX_AGE']
+
+def snapshot_response(version, name):
+    """Kirim file snapshot `name` (versi .br/.gz bila diterima klien), atau None bila belum ada."""
+    path = services.shop_snapshot.find(version, name)
+    if path is None:
+        return None
+    encoding = None
+    for candidate, suffix in snapshot.encodings():
+        if candidate in request.accept_encodings and os.path.exists(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+    response = send_file(path, mimetype='text/html', conditional=False, etag=False)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def cached_public_page(render, snapshot_name, *etag_parts):
+    """Respons halaman publik dengan ETag/Last-Modified dari versi katalog.
+
+    Bila klien (atau CDN) mengirim If-None-Match / If-Modified-Since yang
+    masih cocok, dikembalikan 304 tanpa merender template sama sekali.
+    Selain itu halaman dikirim dari snapshot `snapshot_name`; bila snapshot
+    versi ini belum ada, template dirender dan publikasi dijadwalkan.
+    """
+    version, updated_at = services.catalog_cache.version_info()
+    etag = '-'.join(str(part) for part in ('catalog', version, services.release_version) + etag_parts)
+    last_modified = services.release_time
+    if updated_at is not None:
+        last_modified = max(last_modified, updated_at.replace(tzinfo=timezone.utc))
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = request.if_modified_since is not None and request.if_modified_since >= last_modified.replace(microsecond=0)
+
+    if not_modified:
+        response = Response(status=304)
+    else:
+        response = snapshot_response(version, snapshot_name)
+        if response is None:
+            response = make_response(render())
+            services.shop_snapshot.schedule(version)
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['PUBLIC_PAGE_MAX_AGE']
+    return response
+
+# --- Rute untuk melayani file upload ---
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    """Menyediakan akses ke file yang diunggah."""
+    try:
+        response = send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, max_age=upload_max_age(filename))
+    except FileNotFoundError:
+        return redirect('https://placehold.co/400x600/e2e8f0/4a5568?text=Gambar+Tidak+Ditemukan'), 404
+    response.cache_control.immutable = images.is_hashed_filename(filename)
+    return response
+
+@bp.route('/uploads/<variant>/<filename>')
+def uploaded_variant(variant, filename):
+    """Menyediakan varian ukuran gambar (thumb, card, detail).
+
+    Format ditentukan oleh akhiran URL (`<nama asli>.webp` / `.jpg`), bukan
+    header Accept, sehingga isi satu URL tidak pernah berubah dan aman
+    di-cache immutable oleh CDN tanpa Vary; browser memilih WebP atau JPEG
+    lewat <picture>. Bila varian belum selesai dibuat, file asli yang dikirim.
+    """
+    if variant not in images.VARIANTS:
+        return "Varian gambar tidak dikenal.", 404
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    filename, fmt = images.parse_variant_url_name(secure_filename(filename))
+    path = images.variant_path(upload_folder, variant, filename, fmt)
+    if not os.path.exists(path):
+        # Sementara varian belum jadi, jangan biarkan file asli di-cache lama di URL varian
+        response = uploaded_file(filename)
+        if isinstance(response, Response):
+            response.cache_control.max_age = 0
+            response.cache_control.immutable = False
+        return response
+    response = send_from_directory(os.path.dirname(path), os.path.basename(path), max_age=upload_max_age(filename))
+    response.cache_control.immutable = images.is_hashed_filename(filename)
+    return response
+
+# --- Rute Halaman Publik ---
+@bp.route('/')
+def home():
+    return redirect(url_for('shop.shop_page'))
+
+@bp.route('/toko')
+def shop_page():
+    return cached_public_page(lambda: snapshot.render_shop(services.catalog_cache.get_books()), snapshot.SHOP_PAGE)
+
+@bp.route('/toko/kitab/<int:book_id>')
+def book_detail(book_id):
+    # Kitab dan daftar katalog diambil dari cache, bukan query per request
+    book = services.catalog_cache.get_book(book_id)
+    if book is None:
+        return "Kitab tidak ditemukan.", 404
+    return cached_public_page(
+        lambda: snapshot.render_book_detail(book, services.catalog_cache.get_books()), snapshot.book_page(book_id), book_id)
+
+@bp.route('/cek-ongkir')
+def cek_ongkir_page():
+    return render_template('cek_ongkir.html')
+
+# --- API Pencarian Kitab (Publik) ---
+@bp.route('/api/search/books', methods=['GET'])
+def search_books():
+    """Pencarian kitab yang toleran salah eja/transliterasi, diurutkan berdasarkan relevansi."""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), MAX_SEARCH_LIMIT))
+    available_only = request.args.get('available') == '1'
+    if not query:
+        return jsonify([])
+
+    index = services.catalog_search.index_for(services.catalog_cache.get_books())
+    results = index.search(query, limit=limit, available_only=available_only)
+    return jsonify([{
+        'id': book['id'],
+        'name': book['name'],
+        'price': book['price'],
+        'availability': book['availability'],
+        'image_filename': book['image_filename'],
+        'score': score,
+    } for book, score in results])
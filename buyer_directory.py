@@ -0,0 +1,61 @@
+# buyer_directory.py
+
+# Pencarian pembeli untuk autocomplete dan direktori pembeli online
+# (online_buyers), supaya picker tidak perlu mengunduh seluruh daftar
+# pembeli atau menjalankan SELECT DISTINCT atas semua penjualan online.
+
+# Batas jumlah saran per permintaan autocomplete
+MAX_SUGGESTIONS = 50
+
+
+def like_prefix(text):
+    """Pola LIKE 'text%' dengan karakter wildcard di input di-escape."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def search_offline(cursor, prefix, limit, dormitory=None):
+    """Pembeli offline yang namanya diawali `prefix` (memakai index nama)."""
+    sql = 'SELECT id, name, address, dormitory FROM offline_buyers WHERE name LIKE %s'
+    params = [like_prefix(prefix)]
+    if dormitory:
+        sql += ' AND dormitory = %s'
+        params.append(dormitory)
+    sql += ' ORDER BY name LIMIT %s'
+    params.append(limit)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def search_online(cursor, prefix, limit):
+    """Pembeli online yang namanya diawali `prefix`, beserta alamat kirim terakhirnya."""
+    cursor.execute(
+        'SELECT name, address FROM online_buyers WHERE name LIKE %s ORDER BY name LIMIT %s',
+        (like_prefix(prefix), limit))
+    return cursor.fetchall()
+
+
+def remember_online_buyers(cursor, buyers):
+    """Catat (nama, alamat) pembeli online; alamat terbaru menggantikan yang lama."""
+    latest = {}
+    for name, address in buyers:
+        if name:
+            latest[name.strip().casefold()] = (name.strip(), address)
+    if latest:
+        cursor.executemany(
+            "INSERT INTO online_buyers (name, address, last_sale_at) VALUES (%s, %s, NOW()) "
+            "ON DUPLICATE KEY UPDATE address = VALUES(address), last_sale_at = VALUES(last_sale_at)",
+            list(latest.values()))
+
+
+def rebuild_online(cursor):
+    """Isi ulang direktori pembeli online dari tabel online_sales (untuk backfill)."""
+    cursor.execute('DELETE FROM online_buyers')
+    # Diurutkan per tanggal agar alamat dari transaksi terakhir yang tersimpan
+    cursor.execute("""
+        INSERT INTO online_buyers (name, address, last_sale_at)
+        SELECT TRIM(buyer_name), buyer_address, sale_date FROM online_sales
+        WHERE TRIM(buyer_name) != ''
+        ORDER BY sale_date, id
+        ON DUPLICATE KEY UPDATE address = VALUES(address), last_sale_at = VALUES(last_sale_at)
+    """)
@@ -0,0 +1,108 @@
+# cash_ledger.py
+
+# Snapshot saldo kas harian (cash_daily_balances). Tiap baris menyimpan total
+# debit/kredit hari itu dan akumulasinya sampai akhir hari tersebut, sehingga
+# total rentang tanggal mana pun cukup dihitung dari dua baris snapshot.
+#
+# Semua perubahan dijalankan di dalam transaksi pemanggil (conn.begin() ...
+# conn.commit()) setelah lock_ledger(), sehingga dua penulis tidak menyalin
+# akumulasi yang sudah basi dan kegagalan di tengah jalan bisa di-rollback.
+
+# Jenis catatan kas yang dikenal; jenis lain ditolak
+RECORD_TYPES = ('debit', 'kredit')
+
+# Nama baris di cache_versions yang dikunci (FOR UPDATE) oleh setiap penulis snapshot
+LEDGER_LOCK_KEY = 'cash_ledger'
+
+
+def _amount_column(record_type):
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"Jenis catatan kas tidak dikenal: {record_type}")
+    return record_type
+
+
+def lock_ledger(cursor):
+    """Kunci snapshot kas sampai transaksi selesai; panggil sebagai statement pertama transaksi."""
+    cursor.execute(
+        "INSERT INTO cache_versions (name, version, updated_at) VALUES (%s, 1, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP()",
+        (LEDGER_LOCK_KEY,))
+
+
+def apply_record(cursor, record_date, record_type, amount, sign=1):
+    """Terapkan satu catatan kas (sign=-1 untuk membatalkannya) ke snapshot harian."""
+    column = _amount_column(record_type)
+    cursor.execute(
+        "SELECT cum_debit, cum_kredit FROM cash_daily_balances "
+        "WHERE record_date < %s ORDER BY record_date DESC LIMIT 1 FOR UPDATE",
+        (record_date,))
+    previous = cursor.fetchone() or {'cum_debit': 0, 'cum_kredit': 0}
+    cursor.execute(
+        "INSERT IGNORE INTO cash_daily_balances (record_date, debit, kredit, cum_debit, cum_kredit) "
+        "VALUES (%s, 0, 0, %s, %s)",
+        (record_date, previous['cum_debit'], previous['cum_kredit']))
+
+    delta = sign * float(amount)
+    cursor.execute(
+        f"UPDATE cash_daily_balances SET {column} = {column} + IF(record_date = %s, %s, 0), "
+        f"cum_{column} = cum_{column} + %s WHERE record_date >= %s",
+        (record_date, delta, delta, record_date))
+
+
+def remove_record(cursor, record_id):
+    """Batalkan catatan kas yang tersimpan dari snapshot; panggil SEBELUM diubah/dihapus.
+
+    Mengembalikan False bila catatan tidak ditemukan. Catatan lama dengan
+    jenis di luar RECORD_TYPES tidak pernah masuk snapshot (lihat rebuild),
+    jadi tidak ada yang dibatalkan.
+    """
+    cursor.execute('SELECT record_date, type, amount FROM cash_records WHERE id = %s FOR UPDATE', (record_id,))
+    record = cursor.fetchone()
+    if not record:
+        return False
+    if record['type'] not in RECORD_TYPES:
+        return True
+    apply_record(cursor, record['record_date'], record['type'], record['amount'], sign=-1)
+    return True
+
+
+def range_totals(cursor, start_date=None, end_date=None):
+    """Total debit dan kredit untuk rentang tanggal (inklusif) dari dua baris snapshot."""
+    if start_date and end_date and start_date > end_date:
+        return 0.0, 0.0
+
+    if end_date:
+        cursor.execute(
+            "SELECT cum_debit, cum_kredit FROM cash_daily_balances "
+            "WHERE record_date <= %s ORDER BY record_date DESC LIMIT 1", (end_date,))
+    else:
+        cursor.execute(
+            "SELECT cum_debit, cum_kredit FROM cash_daily_balances ORDER BY record_date DESC LIMIT 1")
+    end = cursor.fetchone() or {'cum_debit': 0, 'cum_kredit': 0}
+
+    start = {'cum_debit': 0, 'cum_kredit': 0}
+    if start_date:
+        cursor.execute(
+            "SELECT cum_debit, cum_kredit FROM cash_daily_balances "
+            "WHERE record_date < %s ORDER BY record_date DESC LIMIT 1", (start_date,))
+        start = cursor.fetchone() or start
+
+    return (float(end['cum_debit']) - float(start['cum_debit']),
+            float(end['cum_kredit']) - float(start['cum_kredit']))
+
+
+def rebuild(cursor):
+    """Hitung ulang seluruh snapshot dari tabel cash_records (untuk backfill)."""
+    cursor.execute('DELETE FROM cash_daily_balances')
+    cursor.execute("""
+        INSERT INTO cash_daily_balances (record_date, debit, kredit, cum_debit, cum_kredit)
+        SELECT record_date, debit, kredit,
+               SUM(debit) OVER (ORDER BY record_date),
+               SUM(kredit) OVER (ORDER BY record_date)
+        FROM (
+            SELECT record_date,
+                   SUM(CASE WHEN type = 'debit' THEN amount ELSE 0 END) as debit,
+                   SUM(CASE WHEN type = 'kredit' THEN amount ELSE 0 END) as kredit
+            FROM cash_records GROUP BY record_date
+        ) daily
+    """)
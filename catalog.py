@@ -0,0 +1,94 @@
+# catalog.py
+
+import threading
+import time
+
+# Nama baris versi katalog di tabel cache_versions
+CATALOG_VERSION_KEY = 'catalog'
+
+
+def bump_catalog_version(cursor):
+    """Naikkan versi katalog agar semua worker memuat ulang cache-nya."""
+    cursor.execute(
+        "INSERT INTO cache_versions (name, version, updated_at) VALUES (%s, 1, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP()",
+        (CATALOG_VERSION_KEY,))
+
+
+class CatalogCache:
+    """Cache katalog kitab di memori proses (per worker gunicorn).
+
+    Isi cache dimuat ulang bila versi di tabel cache_versions berubah. Versi
+    hanya dicek paling sering sekali tiap `check_interval` detik, sehingga
+    pada kondisi stabil halaman publik tidak menjalankan query katalog.
+    """
+
+    def __init__(self, connection_factory, check_interval=5):
+        self._connection_factory = connection_factory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._books = None
+        self._by_id = {}
+        self._version = None
+        self._updated_at = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Buang cache lokal; dipanggil setelah endpoint admin mengubah katalog."""
+        with self._lock:
+            self._books = None
+            self._by_id = {}
+            self._version = None
+            self._updated_at = None
+            self._checked_at = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._books is not None and now - self._checked_at < self.check_interval:
+            return
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT version, updated_at FROM cache_versions WHERE name = %s', (CATALOG_VERSION_KEY,))
+                row = cursor.fetchone()
+                version = row['version'] if row else 0
+                self._updated_at = row['updated_at'] if row else None
+                if self._books is None or version != self._version:
+                    cursor.execute('SELECT * FROM books ORDER BY name')
+                    books = cursor.fetchall()
+                    self._books = books
+                    self._by_id = {book['id']: book for book in books}
+                    self._version = version
+        finally:
+            conn.close()
+        self._checked_at = now
+
+    def get_books(self):
+        """Semua kitab, diurutkan berdasarkan nama."""
+        with self._lock:
+            self._refresh()
+            return self._books
+
+    def get_book(self, book_id):
+        """Satu kitab berdasarkan id, atau None bila tidak ada."""
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(book_id)
+
+    def versioned_books(self):
+        """(versi, semua kitab) dari satu pemuatan cache yang sama, untuk snapshot halaman toko."""
+        with self._lock:
+            self._refresh()
+            return self._version, self._books
+
+    @property
+    def version(self):
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def version_info(self):
+        """(versi, waktu perubahan terakhir dalam UTC atau None) untuk ETag/Last-Modified."""
+        with self._lock:
+            self._refresh()
+            return self._version, self._updated_at
@@ -0,0 +1,360 @@
+# commands.py
+
+# Perintah CLI (`flask <perintah>`): backfill tabel rekap, publikasi snapshot
+# toko, worker job, dan benchmark. Modul benchmarks (yang memuat
+# pandas/openpyxl) hanya diimpor di dalam perintah benchmark, sehingga
+# perintah lain tetap cepat.
+
+import json
+import os
+import shutil
+import time
+
+import click
+from flask import Blueprint, current_app
+
+import buyer_directory
+import cash_ledger
+import images
+import rollups
+import services
+import spreadsheet
+from blueprints import buyers_api, cash_api, sales_api
+from catalog import bump_catalog_version
+from models import db
+from services import get_db_connection
+
+# cli_group=None: perintah didaftarkan langsung di `flask`, bukan `flask commands ...`
+bp = Blueprint('commands', __name__, cli_group=None)
+
+# Contoh filter untuk EXPLAIN: satu bulan penuh seperti filter rekap di admin
+SAMPLE_FILTER_ARGS = {'start_date': '2025-01-01', 'end_date': '2025-01-31', 'payment_status': 'Belum Lunas'}
+
+def indexed_filter_queries():
+    """Query filter endpoint yang wajib memakai index: (tabel/alias di EXPLAIN, nama index, query, parameter).
+
+    Query diambil dari fungsi yang sama dengan yang dipakai endpoint, sehingga
+    perubahan filter di endpoint ikut diperiksa oleh `flask check-indexes`.
+    """
+    queries = []
+    for query, params in (sales_api.offline_sales_list_query(SAMPLE_FILTER_ARGS),
+                          sales_api.offline_export_query(SAMPLE_FILTER_ARGS)):
+        queries.append(('os', 'ix_offline_sales_sale_date_payment_status', query, params))
+    queries.append(('offline_sales', 'ix_offline_sales_buyer_id', buyers_api.BUYER_SALES_COUNT_QUERY, [1]))
+    for query, params in (sales_api.online_sales_list_query(SAMPLE_FILTER_ARGS),
+                          sales_api.online_export_query(SAMPLE_FILTER_ARGS)):
+        queries.append(('os', 'ix_online_sales_transfer_date', query, params))
+    query, params = cash_api.cash_records_list_query({**SAMPLE_FILTER_ARGS, 'type': 'debit'})
+    queries.append(('cash_records', 'ix_cash_records_record_date_type', query, params))
+    return queries
+
+def explain_filter_queries(cursor):
+    """Menjalankan EXPLAIN untuk setiap query filter; menghasilkan (tabel, index, dipakai, baris plan).
+
+    Index dianggap dipakai hanya bila optimizer benar-benar memilihnya (`key`)
+    dan tidak melakukan full scan (`type` ALL); cukup ada di possible_keys
+    belum berarti dipakai.
+    """
+    for table, index_name, query, params in indexed_filter_queries():
+        cursor.execute("EXPLAIN " + query, params)
+        plan = next((row for row in cursor.fetchall() if row['table'] == table), None) or {}
+        chosen_keys = (plan.get('key') or '').split(',')
+        yield table, index_name, index_name in chosen_keys and plan.get('type') != 'ALL', plan
+
+@bp.cli.command('rebuild-rollups')
+def rebuild_rollups():
+    """Menghitung ulang tabel rekap penjualan dan saldo pembeli dari awal (backfill)."""
+    conn = get_db_connection()
+    try:
+        conn.autocommit(False)
+        with conn.cursor() as cursor:
+            rollups.rebuild(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    click.echo('Rekap penjualan berhasil dihitung ulang.')
+
+@bp.cli.command('rebuild-online-buyers')
+def rebuild_online_buyers():
+    """Mengisi ulang direktori pembeli online dari tabel online_sales (backfill)."""
+    conn = get_db_connection()
+    try:
+        conn.autocommit(False)
+        with conn.cursor() as cursor:
+            buyer_directory.rebuild_online(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    click.echo('Direktori pembeli online berhasil diisi ulang.')
+
+@bp.cli.command('rebuild-cash-ledger')
+def rebuild_cash_ledger():
+    """Menghitung ulang snapshot saldo kas harian dari tabel cash_records (backfill)."""
+    conn = get_db_connection()
+    try:
+        conn.autocommit(False)
+        with conn.cursor() as cursor:
+            cash_ledger.lock_ledger(cursor)
+            cash_ledger.rebuild(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    click.echo('Snapshot saldo kas berhasil dihitung ulang.')
+
+@bp.cli.command('backfill-image-variants')
+def backfill_image_variants():
+    """Mengganti nama gambar lama ke nama berbasis hash dan membuat varian ukurannya."""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    conn = get_db_connection()
+    processed = 0
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT id, image_filename FROM books WHERE image_filename IS NOT NULL AND image_filename != %s', ('',))
+            books = cursor.fetchall()
+            renamed = False
+            for book in books:
+                image_filename = book['image_filename']
+                source = os.path.join(upload_folder, image_filename)
+                if not os.path.exists(source):
+                    click.echo(f"Lewati kitab {book['id']}: file {image_filename} tidak ditemukan")
+                    continue
+                if not images.is_hashed_filename(image_filename):
+                    with open(source, 'rb') as f:
+                        new_filename = images.hashed_filename(f.read(), image_filename.rsplit('.', 1)[-1].lower())
+                    # Salin dulu, update baris, baru hapus file lama: bila proses
+                    # terhenti di tengah, baris tidak pernah menunjuk file yang hilang
+                    target = os.path.join(upload_folder, new_filename)
+                    if not os.path.exists(target):
+                        tmp = f"{target}.tmp-{os.getpid()}"
+                        shutil.copy2(source, tmp)
+                        os.replace(tmp, target)
+                    cursor.execute('UPDATE books SET image_filename = %s WHERE id = %s', (new_filename, book['id']))
+                    cursor.execute('SELECT COUNT(*) as total FROM books WHERE image_filename = %s', (image_filename,))
+                    if not cursor.fetchone()['total']:
+                        try:
+                            os.remove(source)
+                        except FileNotFoundError:
+                            pass
+                    renamed = True
+                    image_filename = new_filename
+                if not images.has_variants(upload_folder, image_filename):
+                    images.generate_variants(upload_folder, image_filename)
+                    processed += 1
+            if renamed:
+                bump_catalog_version(cursor)
+    finally:
+        conn.close()
+    click.echo(f'{processed} gambar selesai dibuatkan variannya.')
+
+@bp.cli.command('publish-shop')
+def publish_shop():
+    """Menerbitkan snapshot statis /toko dan semua halaman detail kitab untuk versi katalog terkini."""
+    if not services.shop_snapshot.enabled:
+        click.echo('Snapshot toko dimatikan (SHOP_SNAPSHOT_ENABLED=0).')
+        return
+    started = time.perf_counter()
+    published = services.shop_snapshot.publish()
+    if published is None:
+        click.echo('Snapshot versi katalog terkini sudah ada.')
+        return
+    version, pages = published
+    click.echo(f'{pages} halaman versi katalog {version} diterbitkan dalam {time.perf_counter() - started:.1f} s '
+               f'ke {services.shop_snapshot.folder}.')
+
+@bp.cli.command('jobs-worker')
+@click.option('--once', is_flag=True, help='Jalankan job yang sedang antri lalu keluar.')
+@click.option('--interval', default=2.0, show_default=True, help='Jeda polling (detik) antrian job.')
+def jobs_worker(once, interval):
+    """Menjalankan job import/export yang antri di proses terpisah dari web server."""
+    while True:
+        for job_id in services.job_queue.pending_ids():
+            click.echo(f"Menjalankan job {job_id}...")
+            services.job_queue.run(job_id)
+        if once:
+            break
+        time.sleep(interval)
+
+@bp.cli.command('jobs-purge')
+@click.option('--hours', type=int, default=None, help='Umur hasil job (jam); default JOBS_RETENTION_HOURS.')
+def jobs_purge(hours):
+    """Menghapus job lama beserta file hasilnya, dan menandai job yang macet sebagai gagal."""
+    hours = hours if hours is not None else current_app.config['JOBS_RETENTION_HOURS']
+    stale = services.job_queue.fail_stale(hours)
+    purged = services.job_queue.purge(hours)
+    click.echo(f"{purged} job dihapus, {stale} job macet ditandai gagal.")
+
+@bp.cli.command('bench-search')
+@click.option('--size', default=50000, help='Jumlah judul kitab sintetis.')
+@click.option('--rounds', default=200, help='Jumlah pengulangan per query.')
+def bench_search_command(size, rounds):
+    """Mengukur waktu build dan latensi /api/search/books atas katalog sintetis."""
+    import benchmarks
+
+    result = benchmarks.bench_search(size, rounds)
+    click.echo(f"Katalog {result['catalog_size']} judul, build indeks {result['build_seconds']} s")
+    for query, stats in result['queries'].items():
+        click.echo(f"{query:<20} p50={stats['p50_us']:>8} us  p95={stats['p95_us']:>8} us  -> {', '.join(stats['top'])}")
+    click.echo(f"Median p50: {result['median_p50_us']} us, p50 terburuk: {result['max_p50_us']} us")
+
+@bp.cli.command('bench-ingest')
+@click.option('--rows', default=100000, show_default=True, help='Jumlah baris file import sintetis.')
+@click.option('--format', 'file_format', type=click.Choice(['xlsx', 'csv']), default='xlsx', show_default=True)
+@click.option('--chunk-rows', default=spreadsheet.READ_CHUNK_ROWS, show_default=True,
+              help='Jumlah baris per potongan untuk jalur streaming.')
+def bench_ingest_command(rows, file_format, chunk_rows):
+    """Membandingkan peak RSS pembacaan file import: pd.read_excel utuh vs SheetReader per potongan."""
+    import benchmarks
+
+    result = benchmarks.bench_ingest(rows, file_format, chunk_rows, progress=click.echo)
+    for mode, stats in result['modes'].items():
+        click.echo(f"{mode:<12} peak RSS {stats['peak_rss_mb']:>8} MB  (+{stats['extra_mb']} MB)  "
+                   f"{stats['seconds']:>7} s  {stats['rows']} baris")
+
+@bp.cli.command('bench-serving')
+@click.option('--modes', default='sync,threaded,async', show_default=True, help='Mode serving yang dibandingkan.')
+@click.option('--requests', 'total', default=400, show_default=True, help='Jumlah request per kasus.')
+@click.option('--concurrency', default=50, show_default=True, help='Jumlah klien serentak.')
+@click.option('--delay-ms', default=100, show_default=True, help='Latensi stub Biteship (ms).')
+@click.option('--workers', default=2, show_default=True, help='Jumlah worker gunicorn per mode.')
+@click.option('--with-shop', is_flag=True, help='Ikut ukur /toko (butuh database).')
+@click.option('--output', type=click.Path(dir_okay=False), help='Simpan hasil sebagai JSON.')
+def bench_serving_command(modes, total, concurrency, delay_ms, workers, with_shop, output):
+    """Membandingkan throughput endpoint publik antar SERVING_MODE memakai stub Biteship lokal."""
+    import benchmarks
+
+    modes = [mode.strip() for mode in modes.split(',') if mode.strip()]
+    unknown = [mode for mode in modes if mode not in benchmarks.SERVING_MODE_MODULES]
+    if unknown:
+        raise click.BadParameter(f"Mode tidak dikenal: {', '.join(unknown)}", param_hint='--modes')
+    results = benchmarks.bench_serving(modes, total, concurrency, delay_ms / 1000, workers, with_shop,
+                                       progress=click.echo)
+    if output:
+        report = benchmarks.build_report(results, None, total, concurrency,
+                                         {'workers': workers, 'biteship_delay_ms': delay_ms})
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Laporan disimpan ke {output}")
+
+@bp.cli.command('bench-startup')
+@click.option('--rounds', default=5, show_default=True, help='Jumlah proses Python baru yang diukur.')
+@click.option('--path', 'paths', multiple=True, help='Path request pertama (boleh berulang); default /cek-ongkir dan /api/cari-area.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Simpan hasil sebagai JSON (bisa dibandingkan dengan bench-compare).')
+def bench_startup_command(rounds, paths, output):
+    """Mengukur waktu `import app` dan latensi request pertama di proses baru, serta modul berat yang ikut dimuat."""
+    import benchmarks
+
+    result = benchmarks.bench_startup(rounds, paths or benchmarks.STARTUP_PATHS, progress=click.echo)
+    loaded = [name for name, is_loaded in result['modules'].items() if is_loaded]
+    click.echo(f"Modul berat yang dimuat saat start: {', '.join(loaded) or '-'}")
+    if output:
+        report = benchmarks.build_report(result['cases'], None, rounds, 1, {'modules': result['modules']})
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Laporan disimpan ke {output}")
+
+def ensure_bench_database(force):
+    """Seeding mengosongkan tabel; tolak bila database bukan database benchmark."""
+    database = db.engine.url.database or ''
+    if 'bench' not in database and not force:
+        raise click.ClickException(f"Database '{database}' bukan database benchmark (nama harus mengandung 'bench'). "
+                                   "Gunakan --force bila memang disengaja.")
+
+@bp.cli.command('bench-seed')
+@click.option('--scale', default=1.0, help='Pengali volume data (1.0 = 1k kitab, 20k pembeli, 1jt penjualan, 100k kas).')
+@click.option('--seed', default=42, help='Seed generator data acak.')
+@click.option('--force', is_flag=True, help='Izinkan seeding ke database yang namanya tidak mengandung "bench".')
+def bench_seed(scale, seed, force):
+    """Mengosongkan dan mengisi database benchmark dengan data sintetis."""
+    import benchmarks
+
+    ensure_bench_database(force)
+    volumes = benchmarks.scaled_volumes(scale)
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        conn.autocommit(False)
+        benchmarks.seed_database(conn, volumes, seed, progress=click.echo)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    services.catalog_cache.invalidate()
+    click.echo(f'Seeding selesai dalam {time.perf_counter() - started:.1f} s.')
+
+@bp.cli.command('bench-run')
+@click.option('--scale', default=1.0, help='Harus sama dengan --scale saat bench-seed.')
+@click.option('--iterations', default=50, help='Jumlah request per skenario (ekspor/impor memakai 5%).')
+@click.option('--concurrency', default=1, help='Jumlah thread klien serentak.')
+@click.option('--import-rows', default=500, help='Jumlah baris per file impor.')
+@click.option('--with-search', is_flag=True, help='Sertakan benchmark indeks pencarian kitab (50k judul).')
+@click.option('--output', default='bench-report.json', help='Lokasi laporan JSON.')
+def bench_run(scale, iterations, concurrency, import_rows, with_search, output):
+    """Mengukur latensi dan throughput halaman, API, ekspor, dan impor; hasil ditulis ke JSON."""
+    import benchmarks
+
+    volumes = benchmarks.scaled_volumes(scale)
+    cases = benchmarks.default_http_cases(volumes, import_rows)
+    # Halaman toko diukur dari snapshot (bila aktif), bukan dari render pertama sebelum publikasi
+    if services.shop_snapshot.enabled:
+        services.shop_snapshot.publish()
+    results = benchmarks.run_http_benchmarks(current_app._get_current_object(), cases, iterations, concurrency,
+                                             progress=click.echo)
+    extra = {'search': benchmarks.bench_search()} if with_search else None
+    report = benchmarks.build_report(results, volumes, iterations, concurrency, extra)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    click.echo(f'Laporan ditulis ke {output}')
+
+@bp.cli.command('bench-compare')
+@click.argument('base', type=click.Path(exists=True))
+@click.argument('head', type=click.Path(exists=True))
+@click.option('--metric', default='p50_ms', help='Metrik yang dibandingkan (p50_ms, p95_ms, throughput_rps, ...).')
+@click.option('--threshold', default=10.0, help='Gagal bila ada skenario yang memburuk lebih dari persen ini.')
+def bench_compare(base, head, metric, threshold):
+    """Membandingkan dua laporan bench-run (mis. sebelum dan sesudah sebuah commit)."""
+    import benchmarks
+
+    with open(base) as f:
+        base_report = json.load(f)
+    with open(head) as f:
+        head_report = json.load(f)
+    click.echo(f"{base_report.get('git_commit')} -> {head_report.get('git_commit')} ({metric})")
+    # Untuk throughput, nilai lebih besar berarti lebih baik
+    higher_is_better = metric.startswith('throughput')
+    regressions = 0
+    for name, old, new, change in benchmarks.compare_reports(base_report, head_report, metric):
+        worse = change is not None and (-change if higher_is_better else change) > threshold
+        regressions += worse
+        click.echo(f"{'MEMBURUK' if worse else '':<9}{name:<32} {old!s:>10} -> {new!s:>10}  "
+                   f"{'' if change is None else f'{change:+.1f}%'}")
+    if regressions:
+        raise SystemExit(1)
+
+@bp.cli.command('check-indexes')
+def check_indexes():
+    """Menjalankan EXPLAIN pada query filter dan gagal bila index yang diharapkan tidak dipakai."""
+    conn = get_db_connection()
+    failed = 0
+    try:
+        with conn.cursor() as cursor:
+            for table, index_name, used, plan in explain_filter_queries(cursor):
+                if used:
+                    click.echo(f"OK    {table}: {index_name} (type={plan['type']}, key={plan['key']})")
+                else:
+                    failed += 1
+                    click.echo(f"GAGAL {table}: {index_name} tidak dipakai (type={plan.get('type') or '-'}, "
+                               f"key={plan.get('key') or '-'}, possible_keys={plan.get('possible_keys') or '-'})")
+    finally:
+        conn.close()
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,141 @@
+# db_pool.py
+
+import threading
+import time
+
+import pymysql.cursors
+from sqlalchemy import event
+
+from metrics import InstrumentedCursor
+
+
+class PoolStats:
+    """Menghitung statistik pemakaian pool koneksi untuk monitoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.connects = 0
+        self.closed = 0
+        self.recycled = 0
+        self.invalidated = 0
+
+    def record_checkout(self, waited, elapsed):
+        with self._lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_time += elapsed
+
+    def incr(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self, pool):
+        with self._lock:
+            return {
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time_ms': round(self.wait_time * 1000, 2),
+                'connects': self.connects,
+                'closed': self.closed,
+                'recycled': self.recycled,
+                'invalidated': self.invalidated,
+            }
+
+
+pool_stats = PoolStats()
+
+
+def init_pool_events(engine):
+    """Pasang listener pool SQLAlchemy untuk mengisi pool_stats."""
+    if getattr(engine.pool, '_amtsilati_stats', False):
+        return
+    engine.pool._amtsilati_stats = True
+
+    @event.listens_for(engine.pool, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        pool_stats.incr('connects')
+
+    recycle = engine.pool._recycle
+
+    @event.listens_for(engine.pool, 'close')
+    def _on_close(dbapi_connection, connection_record):
+        # Semua penutupan oleh pool: overflow yang dibuang saat checkin,
+        # koneksi yang di-invalidate, dan koneksi yang melewati pool_recycle
+        pool_stats.incr('closed')
+        invalidated = connection_record.info.pop('pool_stats_invalidated', False)
+        if not invalidated and recycle > -1 and time.time() - connection_record.starttime > recycle:
+            pool_stats.incr('recycled')
+
+    @event.listens_for(engine.pool, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        connection_record.info['pool_stats_invalidated'] = True
+        pool_stats.incr('invalidated')
+
+
+class PooledConnection:
+    """Pembungkus koneksi dari pool agar antarmukanya sama dengan pymysql.connect.
+
+    cursor() secara default memakai DictCursor (dibungkus InstrumentedCursor
+    untuk metrik) dan koneksi berjalan dengan autocommit seperti sebelumnya.
+    close() mengembalikan koneksi ke pool,
+    bukan menutup socket ke MySQL.
+    """
+
+    def __init__(self, fairy):
+        self._fairy = fairy
+        self._raw = fairy.dbapi_connection
+        self._raw.autocommit(True)
+        self.open = True
+
+    def cursor(self, cursor=None):
+        return InstrumentedCursor(self._raw.cursor(cursor or pymysql.cursors.DictCursor))
+
+    def begin(self):
+        self._raw.begin()
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def autocommit(self, value):
+        self._raw.autocommit(value)
+
+    def close(self):
+        if not self.open:
+            return
+        self.open = False
+        try:
+            # Kembalikan ke mode transaksi default SQLAlchemy sebelum masuk pool
+            self._raw.autocommit(False)
+        except Exception:
+            self._fairy.invalidate()
+        self._fairy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def checkout(engine):
+    """Pinjam satu koneksi dari pool engine dan catat waktu tunggunya."""
+    pool = engine.pool
+    # Dianggap "menunggu" bila tidak ada koneksi idle dan overflow sudah penuh
+    saturated = pool.checkedin() == 0 and pool.overflow() >= getattr(pool, '_max_overflow', 0)
+    started = time.perf_counter()
+    try:
+        fairy = engine.raw_connection()
+    finally:
+        pool_stats.record_checkout(saturated, time.perf_counter() - started)
+    return PooledConnection(fairy)
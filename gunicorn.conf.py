@@ -0,0 +1,81 @@
+# gunicorn.conf.py
+
+# Dibaca otomatis oleh gunicorn dari direktori kerja (`gunicorn app:app`).
+# Jenis worker dipilih lewat SERVING_MODE (lihat config.py):
+#   sync     - satu request per worker (perilaku lama)
+#   threaded - worker gthread, WORKER_THREADS request serentak per worker
+#   async    - worker gevent, WORKER_CONNECTIONS request serentak per worker.
+#              Socket di-patch oleh gevent, sehingga request yang menunggu
+#              Biteship (requests) atau MySQL (PyMySQL) tidak menahan worker.
+#              Job import/export dijalankan oleh `flask jobs-worker` terpisah.
+#              Query MySQL serentak per worker tetap dibatasi pool koneksi
+#              (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW, lihat config.py); request
+#              lain yang butuh database menunggu di pool, bukan membuka koneksi baru.
+# Opsi di command line (mis. --workers, --bind) tetap didahulukan.
+#
+# Metrik /metrics dari semua worker digabung lewat file di METRICS_FOLDER
+# (lihat metrics.py); worker menulis metriknya terakhir kali sebelum keluar.
+# File worker-*.json dibersihkan saat master start dan berhenti. Folder
+# sementara bawaan ikut dihapus; METRICS_FOLDER yang diisi operator tidak
+# pernah dihapus, hanya file metriknya.
+
+import os
+import shutil
+import tempfile
+
+# Harus diisi sebelum config diimpor: kelas Config membaca environment saat diimpor,
+# dan worker hasil fork mewarisi modul config milik master.
+_OWN_METRICS_FOLDER = not os.environ.get('METRICS_FOLDER')
+if _OWN_METRICS_FOLDER:
+    os.environ['METRICS_FOLDER'] = os.path.join(tempfile.gettempdir(), f'amtsilati-metrics-{os.getpid()}')
+
+import metrics  # noqa: E402
+from config import get_config  # noqa: E402
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'threaded': 'gthread',
+    'async': 'gevent',
+}
+
+_config = get_config()
+if _config.SERVING_MODE not in WORKER_CLASSES:
+    raise ValueError(f"SERVING_MODE tidak dikenal: {_config.SERVING_MODE} (pilih {', '.join(WORKER_CLASSES)})")
+
+worker_class = WORKER_CLASSES[_config.SERVING_MODE]
+threads = _config.WORKER_THREADS if _config.SERVING_MODE == 'threaded' else 1
+worker_connections = _config.WORKER_CONNECTIONS
+
+
+def _clear_metrics_folder():
+    if _OWN_METRICS_FOLDER:
+        shutil.rmtree(os.environ['METRICS_FOLDER'], ignore_errors=True)
+    else:
+        metrics.clear_folder(os.environ['METRICS_FOLDER'])
+
+
+def on_starting(server):
+    _clear_metrics_folder()
+    os.makedirs(os.environ['METRICS_FOLDER'], exist_ok=True)
+
+
+def when_ready(server):
+    options = _config.SQLALCHEMY_ENGINE_OPTIONS
+    per_worker = options['pool_size'] + options['max_overflow']
+    concurrency = {'sync': 1, 'gthread': threads, 'gevent': worker_connections}[worker_class]
+    server.log.info(f"Pool MySQL: {per_worker} koneksi x {server.num_workers} worker = maks "
+                    f"{per_worker * server.num_workers} koneksi; request lain menunggu s.d. {options['pool_timeout']} s "
+                    f"({_config.SERVING_MODE}, {concurrency} request serentak per worker)")
+
+
+def worker_exit(server, worker):
+    if metrics.shared is not None:
+        metrics.shared.flush()
+
+
+def child_exit(server, worker):
+    metrics.mark_process_dead(os.environ['METRICS_FOLDER'], worker.pid)
+
+
+def on_exit(server):
+    _clear_metrics_folder()
@@ -0,0 +1,112 @@
+# images.py
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Ukuran maksimum (lebar, tinggi) tiap varian gambar sampul kitab
+VARIANTS = {
+    'thumb': (120, 160),
+    'card': (400, 533),
+    'detail': (900, 1200),
+}
+
+# Format keluaran tiap varian: WebP untuk browser yang mendukung, JPEG sebagai cadangan
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Pemrosesan gambar dijalankan di luar thread request
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+# Nama file berbasis hash: 20 karakter hex + ekstensi
+HASHED_NAME_LENGTH = 20
+
+
+def hashed_filename(data, extension):
+    return f"{hashlib.sha256(data).hexdigest()[:HASHED_NAME_LENGTH]}.{extension}"
+
+
+def is_hashed_filename(filename):
+    stem, _, extension = filename.rpartition('.')
+    return len(stem) == HASHED_NAME_LENGTH and all(c in '0123456789abcdef' for c in stem) and bool(extension)
+
+
+def save_upload(file_storage, upload_folder, extension):
+    """Simpan file upload dengan nama berbasis hash isinya dan kembalikan nama file tersebut."""
+    data = file_storage.read()
+    filename = hashed_filename(data, extension)
+    path = os.path.join(upload_folder, filename)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return filename
+
+
+def variant_path(upload_folder, variant, filename, fmt):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(upload_folder, variant, f"{stem}.{fmt}")
+
+
+def variant_url_name(filename, fmt):
+    """Nama file di URL varian: nama asli + akhiran format (mis. abc.png.webp), jadi satu URL selalu satu format."""
+    return f"{filename}.{fmt}"
+
+
+def parse_variant_url_name(name):
+    """(nama file asli, format) dari nama file di URL varian; URL lama tanpa akhiran format dianggap JPEG."""
+    original, _, fmt = name.rpartition('.')
+    if fmt in VARIANT_FORMATS and '.' in original:
+        return original, fmt
+    return name, 'jpg'
+
+
+def generate_variants(upload_folder, filename):
+    """Buat semua varian (thumb, card, detail) dalam WebP dan JPEG untuk satu gambar."""
+    source = os.path.join(upload_folder, filename)
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        os.makedirs(os.path.join(upload_folder, variant), exist_ok=True)
+        for fmt, (pil_format, options) in VARIANT_FORMATS.items():
+            target = variant_path(upload_folder, variant, filename, fmt)
+            # Tulis ke file sementara dulu agar request tidak membaca file setengah jadi
+            tmp_target = f"{target}.tmp"
+            resized.save(tmp_target, pil_format, **options)
+            os.replace(tmp_target, target)
+
+
+def _generate_logged(upload_folder, filename):
+    try:
+        generate_variants(upload_folder, filename)
+    except Exception as e:
+        print(f"Error generating image variants for {filename}: {e}")
+
+
+def schedule_variants(upload_folder, filename):
+    """Jadwalkan pembuatan varian di thread latar belakang."""
+    return _executor.submit(_generate_logged, upload_folder, filename)
+
+
+def has_variants(upload_folder, filename):
+    return all(os.path.exists(variant_path(upload_folder, variant, filename, fmt))
+               for variant in VARIANTS for fmt in VARIANT_FORMATS)
+
+
+def delete_image(upload_folder, filename):
+    """Hapus gambar asli beserta semua variannya."""
+    paths = [os.path.join(upload_folder, filename)]
+    paths += [variant_path(upload_folder, variant, filename, fmt)
+              for variant in VARIANTS for fmt in VARIANT_FORMATS]
+    for path in paths:
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Error deleting image file: {e}")
@@ -0,0 +1,204 @@
+# jobs.py
+
+# Antrian job latar belakang untuk import dan export. Status, progres, dan
+# hasil job disimpan di tabel `jobs` (MySQL yang sama), sehingga worker
+# gunicorn mana pun bisa menjawab polling /api/jobs/<id>. Job dijalankan
+# oleh thread pool di proses web, atau oleh `flask jobs-worker` bila ada
+# job yang tertinggal di status queued (mis. setelah restart).
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Jeda minimum (detik) antar penulisan progres ke database
+PROGRESS_INTERVAL = 0.5
+
+
+def _utc_now():
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+class JobContext:
+    """Diberikan ke handler job: parameter, file input, dan pelapor progres."""
+
+    def __init__(self, queue, job):
+        self._queue = queue
+        self.id = job['id']
+        self.kind = job['kind']
+        self.params = json.loads(job['params'] or '{}')
+        self.input_path = job['input_path']
+        self.result_path = None
+        self._reported_at = 0.0
+
+    def output_path(self, extension):
+        """Lokasi file hasil job (mis. file export) di folder job."""
+        os.makedirs(self._queue.folder, exist_ok=True)
+        self.result_path = os.path.join(self._queue.folder, f"{self.id}.{extension}")
+        return self.result_path
+
+    def progress(self, done, total=None, message=None):
+        """Catat progres; `total` None berarti jumlah total belum diketahui."""
+        now = time.monotonic()
+        if now - self._reported_at < PROGRESS_INTERVAL and (total is None or done < total):
+            return
+        self._reported_at = now
+        percent = min(99, int(done * 100 / total)) if total else None
+        self._queue.update(self.id, progress=percent, message=message)
+
+
+class JobQueue:
+    """Antrian job berbasis tabel `jobs` dengan thread pool lokal (max_workers=0: tanpa thread lokal)."""
+
+    def __init__(self, app, connection_factory, folder, max_workers=2):
+        self.app = app
+        self._connection_factory = connection_factory
+        self.folder = folder
+        self.max_workers = max_workers
+        self._handlers = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, kind, handler):
+        """Daftarkan handler(ctx) -> dict hasil untuk jenis job `kind`."""
+        self._handlers[kind] = handler
+
+    def _submit(self, job_id):
+        # max_workers=0: job hanya diantrikan dan dijalankan oleh `flask jobs-worker`
+        if not self.max_workers:
+            return
+        # Executor dibuat saat pertama dipakai, setelah worker gunicorn di-fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='jobs')
+        self._executor.submit(self.run, job_id)
+
+    def enqueue(self, kind, params=None, upload=None, extension='bin', user_id=None):
+        """Simpan job baru (beserta file upload bila ada) lalu jadwalkan; kembalikan id job."""
+        if kind not in self._handlers:
+            raise ValueError(f"Jenis job tidak dikenal: {kind}")
+        job_id = uuid.uuid4().hex
+        input_path = None
+        if upload is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            input_path = os.path.join(self.folder, f"{job_id}.input.{extension}")
+            upload.save(input_path)
+
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO jobs (id, kind, status, params, input_path, created_by, created_at) "
+                    "VALUES (%s, %s, 'queued', %s, %s, %s, UTC_TIMESTAMP())",
+                    (job_id, kind, json.dumps(params or {}), input_path, user_id))
+            conn.commit()
+        finally:
+            conn.close()
+        self._submit(job_id)
+        return job_id
+
+    def update(self, job_id, **fields):
+        assignments = ', '.join(f"{name} = %s" for name in fields)
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"UPDATE jobs SET {assignments} WHERE id = %s", list(fields.values()) + [job_id])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _claim(self, job_id):
+        """Ambil job queued secara atomik; None bila sudah diambil worker lain."""
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                claimed = cursor.execute(
+                    "UPDATE jobs SET status = 'running', progress = 0, started_at = UTC_TIMESTAMP() "
+                    "WHERE id = %s AND status = 'queued'", (job_id,))
+                job = None
+                if claimed:
+                    cursor.execute('SELECT * FROM jobs WHERE id = %s', (job_id,))
+                    job = cursor.fetchone()
+            conn.commit()
+            return job
+        finally:
+            conn.close()
+
+    def run(self, job_id):
+        """Jalankan satu job (dipanggil dari thread pool atau jobs-worker)."""
+        with self.app.app_context():
+            job = self._claim(job_id)
+            if job is None:
+                return
+            ctx = JobContext(self, job)
+            try:
+                result = self._handlers[job['kind']](ctx)
+                self.update(job_id, status='finished', progress=100, result=json.dumps(result, default=str),
+                            result_path=ctx.result_path, finished_at=_utc_now())
+            except Exception as e:
+                print(f"Error running job {job_id} ({job['kind']}): {e}")
+                if ctx.result_path and os.path.exists(ctx.result_path):
+                    os.remove(ctx.result_path)
+                self.update(job_id, status='failed', error=str(e), result_path=None, finished_at=_utc_now())
+            finally:
+                if ctx.input_path and os.path.exists(ctx.input_path):
+                    os.remove(ctx.input_path)
+
+    def get(self, job_id):
+        """Status job sebagai dict, atau None bila tidak ada."""
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    'SELECT id, kind, status, progress, message, result, result_path, error, created_by, '
+                    'created_at, started_at, finished_at FROM jobs WHERE id = %s', (job_id,))
+                job = cursor.fetchone()
+        finally:
+            conn.close()
+        if job and job['result']:
+            job['result'] = json.loads(job['result'])
+        return job
+
+    def pending_ids(self):
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at")
+                return [row['id'] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def fail_stale(self, max_age_hours):
+        """Tandai gagal job running yang macet (worker mati sebelum job selesai)."""
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                stale = cursor.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Worker berhenti sebelum job selesai', "
+                    "finished_at = UTC_TIMESTAMP() "
+                    "WHERE status = 'running' AND started_at < UTC_TIMESTAMP() - INTERVAL %s HOUR", (max_age_hours,))
+            conn.commit()
+        finally:
+            conn.close()
+        return stale
+
+    def purge(self, max_age_hours):
+        """Hapus job selesai/gagal yang lebih tua dari `max_age_hours` beserta filenya."""
+        conn = self._connection_factory()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, result_path FROM jobs WHERE status IN ('finished', 'failed') "
+                    "AND finished_at < UTC_TIMESTAMP() - INTERVAL %s HOUR", (max_age_hours,))
+                expired = cursor.fetchall()
+                for job in expired:
+                    if job['result_path'] and os.path.exists(job['result_path']):
+                        os.remove(job['result_path'])
+                if expired:
+                    cursor.execute('DELETE FROM jobs WHERE id IN %s', (tuple(job['id'] for job in expired),))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(expired)
@@ -0,0 +1,390 @@
+# metrics.py
+
+# Instrumentasi per request: histogram latensi per route, jumlah dan durasi
+# query database, serta durasi panggilan ke layanan luar (Biteship).
+# Angka dicatat per proses (per worker gunicorn). Bila METRICS_FOLDER diisi
+# (otomatis oleh gunicorn.conf.py), tiap worker menulis salinan metriknya ke
+# file di folder itu dan /metrics menjumlahkan semua file, sehingga scrape
+# yang jatuh ke worker mana pun melihat total yang sama.
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# Batas bucket histogram latensi request (detik)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Batas bucket histogram jumlah query per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Panjang maksimum SQL yang disimpan untuk log request lambat
+MAX_SQL_LENGTH = 500
+
+# Jeda (detik) penulisan metrik worker ke METRICS_FOLDER
+FLUSH_INTERVAL = 1.0
+
+
+class RequestMetrics:
+    """Catatan satu request: query yang dijalankan dan waktu panggilan luar."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_time = 0.0
+        self.external_time = 0.0
+
+    def record_query(self, sql, duration):
+        self.queries.append((duration, ' '.join(str(sql).split())[:MAX_SQL_LENGTH]))
+        self.db_time += duration
+
+    def slowest_queries(self, count=5):
+        return sorted(self.queries, reverse=True)[:count]
+
+
+_current_request = contextvars.ContextVar('request_metrics', default=None)
+
+
+def start_request():
+    """Mulai mencatat request baru di thread/konteks ini."""
+    request_metrics = RequestMetrics()
+    _current_request.set(request_metrics)
+    return request_metrics
+
+
+def finish_request():
+    _current_request.set(None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Nama atribut MetricsRegistry beserta jenisnya, untuk ekspor/gabung antar-worker
+_HISTOGRAMS = {'latency': LATENCY_BUCKETS, 'query_counts': QUERY_COUNT_BUCKETS}
+_COUNTERS = ('requests', 'db_queries', 'db_seconds', 'external_calls', 'external_errors', 'external_seconds')
+
+
+def _key_list(key):
+    return list(key) if isinstance(key, tuple) else [key]
+
+
+def _key_tuple(key):
+    return tuple(key) if len(key) > 1 else key[0]
+
+
+class MetricsRegistry:
+    """Kumpulan metrik proses ini, aman dipakai antar-thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.query_counts = {}
+        self.requests = {}
+        self.db_queries = {}
+        self.db_seconds = {}
+        self.external_calls = {}
+        self.external_errors = {}
+        self.external_seconds = {}
+
+    def observe_request(self, route, method, status, duration, request_metrics):
+        with self._lock:
+            key = (route, method)
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            self.query_counts.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(len(request_metrics.queries))
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self.db_queries[key] = self.db_queries.get(key, 0) + len(request_metrics.queries)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + request_metrics.db_time
+
+    def observe_external(self, service, duration, failed):
+        with self._lock:
+            self.external_calls[service] = self.external_calls.get(service, 0) + 1
+            self.external_seconds[service] = self.external_seconds.get(service, 0.0) + duration
+            if failed:
+                self.external_errors[service] = self.external_errors.get(service, 0) + 1
+
+    def export_state(self):
+        """Salinan semua metrik dalam bentuk yang bisa di-JSON-kan (untuk METRICS_FOLDER)."""
+        with self._lock:
+            state = {name: [[_key_list(key), hist.counts, hist.total, hist.count]
+                            for key, hist in getattr(self, name).items()] for name in _HISTOGRAMS}
+            state.update({name: [[_key_list(key), value] for key, value in getattr(self, name).items()]
+                          for name in _COUNTERS})
+            return state
+
+    def merge_state(self, state):
+        """Tambahkan metrik hasil export_state() (dari worker lain) ke registry ini."""
+        with self._lock:
+            for name, buckets in _HISTOGRAMS.items():
+                data = getattr(self, name)
+                for key, counts, total, count in state.get(name, []):
+                    data.setdefault(_key_tuple(key), Histogram(buckets)).merge(counts, total, count)
+            for name in _COUNTERS:
+                data = getattr(self, name)
+                for key, value in state.get(name, []):
+                    key = _key_tuple(key)
+                    data[key] = data.get(key, 0) + value
+
+    def render(self, gauges=()):
+        """Teks format Prometheus. `gauges` berisi (nama, help, nilai, label) tambahan."""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, help_text, data):
+            header(name, 'histogram', help_text)
+            for (route, method), hist in sorted(data.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'{name}_bucket{{{_labels(route=route, method=method, le=bound)}}} {count}')
+                lines.append(f'{name}_bucket{{{_labels(route=route, method=method, le="+Inf")}}} {hist.count}')
+                lines.append(f'{name}_sum{{{_labels(route=route, method=method)}}} {_number(hist.total)}')
+                lines.append(f'{name}_count{{{_labels(route=route, method=method)}}} {hist.count}')
+
+        def counter(name, help_text, data, label_names):
+            header(name, 'counter', help_text)
+            for key, value in sorted(data.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f'{name}{{{_labels(**dict(zip(label_names, key)))}}} {_number(value)}')
+
+        with self._lock:
+            histogram('http_request_duration_seconds', 'Latensi request per route.', self.latency)
+            histogram('http_request_db_queries', 'Jumlah query database per request.', self.query_counts)
+            counter('http_requests_total', 'Jumlah request per route dan status.',
+                    self.requests, ('route', 'method', 'status'))
+            counter('db_queries_total', 'Jumlah query database per route.', self.db_queries, ('route', 'method'))
+            counter('db_query_seconds_total', 'Total waktu query database per route.',
+                    self.db_seconds, ('route', 'method'))
+            counter('external_calls_total', 'Jumlah panggilan ke layanan luar.', self.external_calls, ('service',))
+            counter('external_call_errors_total', 'Panggilan ke layanan luar yang gagal.',
+                    self.external_errors, ('service',))
+            counter('external_call_seconds_total', 'Total waktu panggilan ke layanan luar.',
+                    self.external_seconds, ('service',))
+
+        seen = set()
+        for name, help_text, value, labels in sorted(gauges, key=lambda gauge: gauge[0]):
+            if name not in seen:
+                seen.add(name)
+                header(name, 'gauge', help_text)
+            lines.append(f'{name}{{{_labels(**labels)}}} {_number(value)}' if labels else f'{name} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class SharedMetrics:
+    """Gabungan metrik semua worker lewat satu file JSON per proses di `folder`.
+
+    Thread latar belakang menulis isi `registry` (dan gauge worker dari
+    `gauge_source`) paling lama tiap FLUSH_INTERVAL detik. File worker yang
+    sudah mati tetap dijumlahkan agar counter tidak turun; hanya gauge-nya
+    yang dibuang (lihat mark_process_dead).
+    """
+
+    def __init__(self, registry, folder, gauge_source=None, interval=FLUSH_INTERVAL):
+        self.registry = registry
+        self.folder = folder
+        self.gauge_source = gauge_source
+        self.interval = interval
+        self._thread_pid = None
+        self._lock = threading.Lock()
+
+    def _path(self, pid):
+        return os.path.join(self.folder, f'worker-{pid}.json')
+
+    def ensure_flusher(self):
+        """Jalankan thread penulis di proses ini (sekali per proses, juga setelah fork)."""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing metrics to {self.folder}: {e}")
+
+    def flush(self):
+        """Tulis metrik proses ini ke filenya (atomik lewat file sementara)."""
+        pid = os.getpid()
+        gauges = self.gauge_source() if self.gauge_source else []
+        data = {'pid': pid, 'alive': True, 'state': self.registry.export_state(), 'gauges': gauges}
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(pid)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """(registry gabungan semua worker, gauge worker hidup berlabel pid)."""
+        self.flush()
+        merged = MetricsRegistry()
+        gauges = []
+        for name in sorted(os.listdir(self.folder)):
+            if not (name.startswith('worker-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.folder, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            merged.merge_state(data['state'])
+            if data['alive']:
+                gauges += [(gauge, help_text, value, {'pid': data['pid']}) for gauge, help_text, value in data['gauges']]
+        return merged, gauges
+
+
+shared = None
+
+
+def init_shared(folder, gauge_source=None):
+    """Aktifkan penggabungan metrik antar-worker di `folder`."""
+    global shared
+    shared = SharedMetrics(registry, folder, gauge_source)
+    return shared
+
+
+def mark_process_dead(folder, pid):
+    """Tandai file metrik worker yang sudah keluar (dipanggil master gunicorn)."""
+    path = os.path.join(folder, f'worker-{pid}.json')
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    data['alive'] = False
+    data['gauges'] = []
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(f'{path}.tmp', path)
+
+
+def clear_folder(folder):
+    """Hapus file metrik worker (worker-*.json) di `folder`; file lain tidak disentuh."""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith('worker-') and (name.endswith('.json') or name.endswith('.json.tmp')):
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass
+
+
+def record_query(sql, duration):
+    request_metrics = _current_request.get()
+    if request_metrics is not None:
+        request_metrics.record_query(sql, duration)
+
+
+@contextmanager
+def track_external(service):
+    """Ukur satu panggilan ke layanan luar, mis. `with track_external('biteship'):`."""
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        duration = time.perf_counter() - started
+        registry.observe_external(service, duration, failed)
+        request_metrics = _current_request.get()
+        if request_metrics is not None:
+            request_metrics.external_time += duration
+
+
+class InstrumentedCursor:
+    """Pembungkus cursor PyMySQL yang mencatat durasi setiap execute/executemany."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(query, args)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, args)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._cursor.__exit__(exc_type, exc, tb)
+
+
+def init_engine_events(engine):
+    """Catat juga query yang lewat SQLAlchemy (ORM/Flask-Migrate) ke request aktif."""
+    if getattr(engine, '_amtsilati_metrics', False):
+        return
+    engine._amtsilati_metrics = True
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        record_query(statement, time.perf_counter() - conn.info['query_started'].pop())
+
+    # Query yang gagal tidak memicu after_cursor_execute; ambil waktu mulainya di sini
+    # agar tumpukan di conn.info tidak terus bertambah
+    @event.listens_for(engine, 'handle_error')
+    def _error(exception_context):
+        conn = exception_context.connection
+        started = conn.info.get('query_started') if conn is not None else None
+        if started:
+            record_query(exception_context.statement, time.perf_counter() - started.pop())
@@ -23,6 +23,12 @@ class Book(db.Model):
     link_tiktok = db.Column(db.String(255))
     image_filename = db.Column(db.String(255))
 
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
 class OfflineBuyer(db.Model):
     __tablename__ = 'offline_buyers'
     id = db.Column(db.Integer, primary_key=True)
@@ -31,6 +37,10 @@ class OfflineBuyer(db.Model):
     dormitory = db.Column(db.String(100))
     sales = db.relationship('OfflineSale', backref='buyer', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_offline_buyers_dormitory_name', 'dormitory', 'name'),
+    )
+
 class OfflineSale(db.Model):
     __tablename__ = 'offline_sales'
     id = db.Column(db.Integer, primary_key=True)
@@ -42,6 +52,11 @@ class OfflineSale(db.Model):
     sale_date = db.Column(db.DateTime, default=datetime.utcnow)
     book = db.relationship('Book')
 
+    __table_args__ = (
+        db.Index('ix_offline_sales_sale_date_payment_status', 'sale_date', 'payment_status'),
+        db.Index('ix_offline_sales_buyer_id', 'buyer_id'),
+    )
+
 class OnlineSale(db.Model):
     __tablename__ = 'online_sales'
     id = db.Column(db.Integer, primary_key=True)
@@ -55,6 +70,10 @@ class OnlineSale(db.Model):
     sale_date = db.Column(db.DateTime, default=datetime.utcnow)
     book = db.relationship('Book')
 
+    __table_args__ = (
+        db.Index('ix_online_sales_transfer_date', 'transfer_date'),
+    )
+
 class CashRecord(db.Model):
     __tablename__ = 'cash_records'
     id = db.Column(db.Integer, primary_key=True)
@@ -63,4 +82,60 @@ class CashRecord(db.Model):
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     category = db.Column(db.String(100))
     record_date = db.Column(db.Date, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_cash_records_record_date_type', 'record_date', 'type'),
+    )
+
+class SalesDailyRollup(db.Model):
+    __tablename__ = 'sales_daily_rollups'
+    sale_day = db.Column(db.Date, primary_key=True)
+    book_id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.Enum('offline', 'online'), primary_key=True)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    shipping = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+class BuyerBalance(db.Model):
+    __tablename__ = 'buyer_balances'
+    buyer_id = db.Column(db.Integer, primary_key=True)
+    outstanding = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+class CashDailyBalance(db.Model):
+    __tablename__ = 'cash_daily_balances'
+    record_date = db.Column(db.Date, primary_key=True)
+    debit = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    kredit = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cum_debit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    cum_kredit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+
+class OnlineBuyer(db.Model):
+    # Direktori pembeli online untuk autocomplete, diisi setiap ada penjualan online
+    __tablename__ = 'online_buyers'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False)
+    address = db.Column(db.Text)
+    last_sale_at = db.Column(db.DateTime)
+
+class Job(db.Model):
+    # Job latar belakang (import/export Excel), lihat jobs.py
+    __tablename__ = 'jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.Enum('queued', 'running', 'finished', 'failed'), nullable=False, default='queued')
+    progress = db.Column(db.Integer)
+    message = db.Column(db.String(255))
+    params = db.Column(db.Text)
+    input_path = db.Column(db.String(500))
+    result = db.Column(db.Text)
+    result_path = db.Column(db.String(500))
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_created_at', 'status', 'created_at'),
+    )
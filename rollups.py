@@ -0,0 +1,109 @@
+# rollups.py
+
+# Rekap harian per kitab per kanal (sales_daily_rollups) dan saldo "Belum Lunas"
+# per pembeli offline (buyer_balances). Setiap perubahan penjualan menerapkan
+# selisihnya ke tabel rekap, sehingga laporan cukup membaca O(hari) baris.
+
+# Tanggal rekap per kanal: offline memakai tanggal transaksi, online memakai
+# tanggal transfer (atau tanggal transaksi bila tanggal transfer kosong)
+CHANNELS = {
+    'offline': {
+        'table': 'offline_sales',
+        'day': 'DATE(sale_date)',
+        'shipping': '0',
+    },
+    'online': {
+        'table': 'online_sales',
+        'day': 'COALESCE(transfer_date, DATE(sale_date))',
+        'shipping': 'COALESCE(shipping_cost, 0)',
+    },
+}
+
+
+def _apply_sales(cursor, channel, where, params, sign):
+    spec = CHANNELS[channel]
+    cursor.execute(f"""
+        INSERT INTO sales_daily_rollups (sale_day, book_id, channel, revenue, quantity, shipping)
+        SELECT {spec['day']}, book_id, %s, %s * SUM(total_price), %s * SUM(quantity), %s * SUM({spec['shipping']})
+        FROM {spec['table']} WHERE {where}
+        GROUP BY {spec['day']}, book_id
+        ON DUPLICATE KEY UPDATE revenue = revenue + VALUES(revenue),
+            quantity = quantity + VALUES(quantity), shipping = shipping + VALUES(shipping)
+    """, [channel, sign, sign, sign] + list(params))
+
+    if channel == 'offline':
+        cursor.execute(f"""
+            INSERT INTO buyer_balances (buyer_id, outstanding)
+            SELECT buyer_id, %s * SUM(total_price)
+            FROM offline_sales WHERE ({where}) AND payment_status = 'Belum Lunas'
+            GROUP BY buyer_id
+            ON DUPLICATE KEY UPDATE outstanding = outstanding + VALUES(outstanding)
+        """, [sign] + list(params))
+
+
+def add_sales(cursor, channel, sale_ids):
+    """Tambahkan penjualan yang baru disimpan ke rekap."""
+    if sale_ids:
+        _apply_sales(cursor, channel, 'id IN %s', [tuple(sale_ids)], 1)
+
+
+def remove_sales(cursor, channel, sale_ids):
+    """Kurangi penjualan dari rekap; panggil SEBELUM baris diubah atau dihapus."""
+    if sale_ids:
+        _apply_sales(cursor, channel, 'id IN %s', [tuple(sale_ids)], -1)
+
+
+def database_now(cursor):
+    """Waktu server MySQL; dipakai sebagai sale_date baris baru agar tanggal rekapnya diketahui tanpa membaca ulang."""
+    cursor.execute('SELECT NOW() AS now')
+    return cursor.fetchone()['now']
+
+
+def add_new_sales(cursor, channel, sales):
+    """Tambahkan penjualan yang baru di-INSERT (executemany) ke rekap.
+
+    Selisih dihitung dari nilai baris yang masih ada di memori, bukan dari id
+    AUTO_INCREMENT: id hasil executemany tidak dijamin berurutan (insert
+    serentak dengan innodb_autoinc_lock_mode=2, auto_increment_increment > 1,
+    atau batch yang dipecah PyMySQL). Tiap item `sales` adalah dict berisi
+    day, book_id, quantity, total_price, shipping, dan untuk kanal offline
+    juga buyer_id serta payment_status.
+    """
+    daily = {}
+    balances = {}
+    for sale in sales:
+        totals = daily.setdefault((sale['day'], int(sale['book_id'])), [0, 0, 0])
+        totals[0] += sale['total_price']
+        totals[1] += int(sale['quantity'])
+        totals[2] += sale['shipping'] or 0
+        if channel == 'offline' and sale['payment_status'] == 'Belum Lunas':
+            balances[sale['buyer_id']] = balances.get(sale['buyer_id'], 0) + sale['total_price']
+
+    if daily:
+        cursor.executemany("""
+            INSERT INTO sales_daily_rollups (sale_day, book_id, channel, revenue, quantity, shipping)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE revenue = revenue + VALUES(revenue),
+                quantity = quantity + VALUES(quantity), shipping = shipping + VALUES(shipping)
+        """, [(day, book_id, channel, revenue, quantity, shipping)
+              for (day, book_id), (revenue, quantity, shipping) in daily.items()])
+    if balances:
+        cursor.executemany("""
+            INSERT INTO buyer_balances (buyer_id, outstanding) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE outstanding = outstanding + VALUES(outstanding)
+        """, list(balances.items()))
+
+
+def clear_channel(cursor, channel):
+    """Kosongkan rekap satu kanal (dipakai saat semua transaksinya dihapus)."""
+    cursor.execute('DELETE FROM sales_daily_rollups WHERE channel = %s', (channel,))
+    if channel == 'offline':
+        cursor.execute('DELETE FROM buyer_balances')
+
+
+def rebuild(cursor):
+    """Hitung ulang seluruh rekap dari tabel penjualan (untuk backfill)."""
+    cursor.execute('DELETE FROM sales_daily_rollups')
+    cursor.execute('DELETE FROM buyer_balances')
+    for channel in CHANNELS:
+        _apply_sales(cursor, channel, '1=1', [], 1)
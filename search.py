@@ -0,0 +1,143 @@
+# search.py
+
+import re
+import threading
+import unicodedata
+
+# Variasi transliterasi Arab-Indonesia yang disamakan sebelum diindeks,
+# mis. "Amtsilati"/"Amtsilaty", "Jurumiyah"/"Jurumiyyah", "Fathul"/"Fatchul".
+# Urutan penting: pola yang lebih panjang diterapkan lebih dulu.
+TRANSLITERATION_RULES = [
+    (re.compile(r"['`‘’ʿʾ-]"), ''),
+    (re.compile(r'kh|ch'), 'h'),
+    (re.compile(r'ts'), 's'),
+    (re.compile(r'th'), 't'),
+    (re.compile(r'sy|sh'), 's'),
+    (re.compile(r'dz|dh|zh'), 'z'),
+    (re.compile(r'gh'), 'g'),
+    (re.compile(r'q'), 'k'),
+    (re.compile(r'ee'), 'i'),
+    (re.compile(r'oo|o'), 'u'),
+    (re.compile(r'e'), 'i'),
+    (re.compile(r'([a-z])\1+'), r'\1'),
+    (re.compile(r'iy'), 'i'),
+    (re.compile(r'y\b'), 'i'),
+    (re.compile(r'(?<=[a-z])h\b'), ''),
+]
+
+
+def normalize_title(text):
+    """Huruf kecil, tanpa diakritik, dan variasi transliterasi disamakan."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    for pattern, replacement in TRANSLITERATION_RULES:
+        text = pattern.sub(replacement, text)
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def trigrams(normalized):
+    """Trigram per kata dengan padding seperti pg_trgm ("  am", " am", ..., "ti ")."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class BookSearchIndex:
+    """Indeks trigram di memori atas nama kitab.
+
+    Posting list tiap trigram disimpan sebagai array numpy, sehingga jumlah
+    trigram yang cocok untuk semua kitab dihitung sekaligus dengan
+    np.bincount. Hanya daftar pendek kandidat teratas yang dinilai ulang
+    di Python (bonus substring / awal kata).
+    """
+
+    # Jumlah kandidat minimum yang dinilai ulang per pencarian
+    SHORTLIST_SIZE = 200
+
+    def __init__(self, books, min_similarity=0.4):
+        # numpy dimuat saat indeks pertama dibuat, bukan saat aplikasi start
+        import numpy as np
+
+        self.min_similarity = min_similarity
+        self._books = list(books)
+        self._names = []
+        postings = {}
+        for doc_index, book in enumerate(self._books):
+            normalized = normalize_title(book['name'])
+            self._names.append(normalized)
+            for gram in trigrams(normalized):
+                postings.setdefault(gram, []).append(doc_index)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._lengths = np.array([len(name) for name in self._names], dtype=np.int64)
+        self._available = np.array([book.get('availability') == 'Tersedia' for book in self._books], dtype=bool)
+
+    def __len__(self):
+        return len(self._books)
+
+    def search(self, query, limit=10, available_only=False):
+        """Kitab yang cocok dengan `query`, diurutkan dari yang paling relevan.
+
+        Mengembalikan list (book, skor). Skor adalah proporsi trigram query
+        yang ada di nama kitab, ditambah bonus bila query muncul utuh
+        (substring) atau sebagai awal kata.
+        """
+        import numpy as np
+
+        normalized = normalize_title(query)
+        query_grams = trigrams(normalized)
+        arrays = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        if not arrays:
+            return []
+
+        counts = np.bincount(np.concatenate(arrays), minlength=len(self._books))
+        needed = max(1, int(self.min_similarity * len(query_grams) + 0.999))
+        mask = counts >= needed
+        if available_only:
+            mask &= self._available
+        matched = np.flatnonzero(mask)
+        if not len(matched):
+            return []
+
+        # Urutan kasar: trigram cocok terbanyak, lalu nama terpendek
+        shortlist_size = max(self.SHORTLIST_SIZE, limit * 4)
+        if len(matched) > shortlist_size:
+            rough = counts[matched] * 1024 - self._lengths[matched]
+            matched = matched[np.argpartition(-rough, shortlist_size)[:shortlist_size]]
+
+        results = []
+        for doc_index in matched.tolist():
+            name = self._names[doc_index]
+            score = counts[doc_index] / len(query_grams)
+            position = name.find(normalized)
+            if position == 0 or (position > 0 and name[position - 1] == ' '):
+                score += 0.5
+            elif position > 0:
+                score += 0.25
+            results.append((-score, len(name), name, doc_index))
+
+        results.sort()
+        return [(self._books[doc_index], round(float(-neg_score), 4))
+                for neg_score, _, _, doc_index in results[:limit]]
+
+
+class CatalogSearch:
+    """Menyimpan BookSearchIndex dan membangunnya ulang saat katalog berubah.
+
+    CatalogCache membuat list kitab baru setiap kali versi katalog berubah,
+    jadi identitas list tersebut cukup dipakai sebagai penanda.
+    """
+
+    def __init__(self, min_similarity=0.4):
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._books = None
+        self._index = None
+
+    def index_for(self, books):
+        with self._lock:
+            if books is not self._books:
+                self._index = BookSearchIndex(books, self.min_similarity)
+                self._books = books
+            return self._index
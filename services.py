@@ -0,0 +1,136 @@
+# services.py
+
+# Objek bersama yang dipakai semua blueprint: koneksi database, decorator
+# login, cache katalog, indeks pencarian, snapshot toko, antrian job, dan
+# klien Biteship.
+# Objek-objek ini dibuat oleh init_app() di dalam create_app(), jadi
+# blueprint memakainya lewat atribut modul (mis. `services.catalog_cache`),
+# bukan `from services import catalog_cache`.
+
+import functools
+import os
+from datetime import datetime, timezone
+
+from flask import redirect, request, session, url_for
+
+import jobs
+from catalog import CatalogCache
+from db_pool import checkout
+from models import db
+from search import CatalogSearch
+from shipping import BiteshipClient
+from snapshot import ShopSnapshot
+
+# Batas maksimum baris per halaman untuk riwayat transaksi
+MAX_PAGE_LIMIT = 500
+
+catalog_cache = None
+catalog_search = None
+shop_snapshot = None
+job_queue = None
+biteship = None
+release_version = None
+release_time = None
+
+
+def init_app(app):
+    """Buat objek bersama dari konfigurasi `app` (dipanggil sekali oleh create_app)."""
+    global catalog_cache, catalog_search, shop_snapshot, job_queue, biteship, release_version, release_time
+
+    # --- Cache Katalog untuk Halaman Publik ---
+    catalog_cache = CatalogCache(get_db_connection, app.config['CATALOG_VERSION_CHECK_INTERVAL'])
+    # Indeks pencarian kitab, dibangun ulang otomatis saat katalog di cache berubah
+    catalog_search = CatalogSearch()
+
+    # --- Antrian Job Latar Belakang (Import/Export) ---
+    job_queue = jobs.JobQueue(app, get_db_connection, app.config['JOBS_FOLDER'], app.config['JOBS_WORKERS'])
+
+    # --- Klien Biteship untuk Ongkir ---
+    biteship = BiteshipClient(
+        app.config['BITESHIP_API_KEY'],
+        app.config['BITESHIP_BASE_URL'],
+        timeout=app.config['BITESHIP_TIMEOUT'],
+        area_cache_size=app.config['AREA_CACHE_SIZE'],
+        area_cache_ttl=app.config['AREA_CACHE_TTL'],
+        area_result_limit=app.config['BITESHIP_AREA_RESULT_LIMIT'],
+        rate_cache_size=app.config['RATE_CACHE_SIZE'],
+        rate_cache_ttl=app.config['RATE_CACHE_TTL'],
+        rate_weight_bucket=app.config['RATE_WEIGHT_BUCKET'],
+        pool_size=app.config['BITESHIP_POOL_SIZE'],
+    )
+
+    release_version, release_time = _release_info(app)
+
+    # --- Snapshot Statis Halaman Toko ---
+    shop_snapshot = ShopSnapshot(app, catalog_cache, app.config['SNAPSHOT_FOLDER'], release_version,
+                                 enabled=app.config['SHOP_SNAPSHOT_ENABLED'])
+
+
+def _release_info(app):
+    """Penanda rilis dan waktunya; berubah setiap kali template/kode di-deploy ulang."""
+    paths = []
+    for folder in (app.root_path, os.path.join(app.root_path, 'blueprints')):
+        paths += [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.py')]
+    for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        paths += [os.path.join(root, name) for name in files]
+    mtime = int(max(os.path.getmtime(path) for path in paths))
+    return app.config['RELEASE_VERSION'] or str(mtime), datetime.fromtimestamp(mtime, timezone.utc)
+
+
+# --- Fungsi Koneksi Database ---
+def get_db_connection():
+    """Meminjam koneksi MySQL dari pool engine SQLAlchemy (db.engine).
+
+    Koneksi yang dikembalikan berperilaku seperti pymysql.connect lama
+    (DictCursor, autocommit), dan close() mengembalikannya ke pool.
+    """
+    return checkout(db.engine)
+
+
+# --- Decorator untuk Mewajibkan Login ---
+def login_required(view):
+    @functools.wraps(view)
+    def wrapped_view(**kwargs):
+        if 'user_id' not in session:
+            return redirect(url_for('admin.login'))
+        return view(**kwargs)
+    return wrapped_view
+
+
+# --- Filter & Paginasi Query ---
+def date_range_filter(column, start_date, end_date):
+    """Membuat filter rentang tanggal setengah-terbuka [start_date, end_date + 1 hari).
+
+    Kolom dibandingkan apa adanya (tanpa DATE()) agar MySQL bisa memakai index.
+    """
+    clause = ""
+    params = []
+    if start_date:
+        clause += f" AND {column} >= %s"
+        params.append(start_date)
+    if end_date:
+        clause += f" AND {column} < DATE_ADD(%s, INTERVAL 1 DAY)"
+        params.append(end_date)
+    return clause, params
+
+
+def get_page_args():
+    """Membaca parameter paginasi keyset (limit, after_id, with_total) dari query string.
+
+    Mengembalikan limit None bila parameter limit tidak dikirim, sehingga
+    endpoint tetap mengembalikan seluruh baris seperti sebelumnya.
+    """
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    after_id = request.args.get('after_id', type=int)
+    with_total = request.args.get('with_total') in ('1', 'true')
+    return limit, after_id, with_total
+
+
+def paginate_rows(rows, limit):
+    """Memotong hasil query (limit + 1 baris) dan menentukan cursor halaman berikutnya."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['id']
+    return rows, None
@@ -0,0 +1,234 @@
+# shipping.py
+
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import track_external
+
+
+class TTLCache:
+    """Cache LRU sederhana dengan masa berlaku (TTL) per entri, aman dipakai antar-thread."""
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SingleFlight:
+    """Menggabungkan panggilan serentak dengan kunci yang sama menjadi satu panggilan.
+
+    Thread pertama menjalankan fungsi; thread lain dengan kunci yang sama
+    menunggu dan menerima hasil (atau exception) yang sama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Mengembalikan (hasil, shared) - shared True bila hasil dipakai bersama."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result'], True
+        try:
+            call['result'] = fn()
+            return call['result'], False
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['event'].set()
+
+
+class ShippingStats:
+    """Penghitung hit/miss cache ongkir untuk monitoring."""
+
+    FIELDS = ('area_hits', 'area_misses', 'rate_hits', 'rate_misses', 'rate_coalesced', 'rate_errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def incr(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def normalize_area_query(query):
+    """Kunci cache pencarian area: huruf kecil dan spasi dirapikan."""
+    return ' '.join(query.lower().split())
+
+
+class BiteshipClient:
+    """Klien Biteship dengan requests.Session bersama (koneksi keep-alive) dan timeout."""
+
+    # Payload tetap untuk cek ongkir dari Amtsilati Store
+    ORIGIN_AREA_ID = "IDNP6IDNC10"
+    COURIERS = "jnt,jne,sicepat"
+
+    def __init__(self, api_key, base_url, timeout=(3.05, 10), area_cache_size=2048,
+                 area_cache_ttl=86400, area_result_limit=50, rate_cache_size=1024,
+                 rate_cache_ttl=1800, rate_weight_bucket=1000, pool_size=16):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.area_result_limit = area_result_limit
+        self.area_cache = TTLCache(area_cache_size, area_cache_ttl)
+        self.rate_cache = TTLCache(rate_cache_size, rate_cache_ttl)
+        self.rate_weight_bucket = rate_weight_bucket
+        self.rate_flight = SingleFlight()
+        self.stats = ShippingStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Authorization'] = f'Bearer {api_key}'
+
+    def _cached_areas(self, key):
+        """Cari hasil di cache, termasuk dari prefix yang hasilnya sudah lengkap.
+
+        Bila "sema" sudah di-cache dan jumlah hasilnya di bawah batas Biteship
+        (artinya daftar itu lengkap), maka "semar" cukup difilter secara lokal.
+        """
+        cached = self.area_cache.get(key)
+        if cached is not None:
+            return cached[0]
+        tokens = key.split()
+        for end in range(len(key) - 1, 2, -1):
+            prefix = key[:end].rstrip()
+            cached = self.area_cache.get(prefix)
+            if cached is None:
+                continue
+            areas, complete = cached
+            if not complete:
+                return None
+            matches = [area for area in areas
+                       if all(token in area.get('name', '').lower() for token in tokens)]
+            self.area_cache.set(key, (matches, True))
+            return matches
+        return None
+
+    def search_areas(self, query):
+        """Area Biteship untuk teks pencarian `query`; mengembalikan (berhasil, daftar area).
+
+        Bila Biteship membalas success=false, hasilnya ([]) tidak di-cache dan
+        berhasil bernilai False, sehingga pemanggil tidak meng-cache-nya juga.
+        """
+        key = normalize_area_query(query)
+        areas = self._cached_areas(key)
+        if areas is not None:
+            self.stats.incr('area_hits')
+            return True, areas
+        self.stats.incr('area_misses')
+
+        with track_external('biteship_areas'):
+            response = self.session.get(
+                f"{self.base_url}/v1/maps/areas",
+                params={'countries': 'ID', 'input': query, 'type': 'single'},
+                timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        if not data.get('success'):
+            return False, []
+        areas = data.get('areas') or []
+        self.area_cache.set(key, (areas, len(areas) < self.area_result_limit))
+        return True, areas
+
+    def bucket_weight(self, weight):
+        """Berat yang ditanyakan ke Biteship: dibulatkan ke atas sesuai pembulatan kurir (default per 1 kg).
+
+        Sekaligus menjadi kunci cache tarif, sehingga tarif tidak bergantung
+        pada berat siapa yang lebih dulu datang. Dengan rate_weight_bucket <= 0
+        berat dikirim apa adanya dan setiap berat punya entri cache sendiri.
+        """
+        bucket = self.rate_weight_bucket
+        if bucket <= 0:
+            return int(weight)
+        return max(bucket, -(-int(weight) // bucket) * bucket)
+
+    def _fetch_rates(self, destination_area_id, weight):
+        payload = {
+            "origin_area_id": self.ORIGIN_AREA_ID,
+            "destination_area_id": destination_area_id,
+            "couriers": self.COURIERS,
+            "items": [{
+                "name": "Paket Kitab",
+                "description": "Pembelian dari Amtsilati Store",
+                "value": 50000,
+                "weight": weight,
+                "height": 5,
+                "width": 15,
+                "length": 20
+            }]
+        }
+        with track_external('biteship_rates'):
+            response = self.session.post(f"{self.base_url}/v1/rates/couriers", json=payload, timeout=self.timeout)
+            result = response.json()
+        if response.status_code == 200 and result.get('success'):
+            pricing = result.get('pricing', [])
+            self.rate_cache.set((destination_area_id, weight), pricing)
+            return True, pricing
+        self.stats.incr('rate_errors')
+        return False, result.get('error', 'Gagal mengambil data ongkir. Periksa kembali input Anda.')
+
+    def get_rates(self, destination_area_id, weight):
+        """Tarif kurir ke `destination_area_id`; mengembalikan (berhasil, pricing atau pesan error).
+
+        Berat dibulatkan ke bucket sebelum dikirim ke Biteship, dan hasil
+        sukses di-cache per (area tujuan, berat bucket); permintaan serentak
+        untuk kunci yang sama hanya memicu satu panggilan ke Biteship.
+        """
+        weight = self.bucket_weight(weight)
+        key = (destination_area_id, weight)
+        pricing = self.rate_cache.get(key)
+        if pricing is not None:
+            self.stats.incr('rate_hits')
+            return True, pricing
+
+        result, shared = self.rate_flight.do(key, lambda: self._fetch_rates(destination_area_id, weight))
+        self.stats.incr('rate_coalesced' if shared else 'rate_misses')
+        return result
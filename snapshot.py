@@ -0,0 +1,281 @@
+# snapshot.py
+
+# Snapshot statis halaman toko publik. Setelah katalog berubah, /toko dan
+# setiap /toko/kitab/<id> dirender sekali ke file HTML, beserta salinan .gz
+# (dan .br bila modul brotli terpasang), di folder per versi:
+#
+#   SNAPSHOT_FOLDER/<versi katalog>-<versi rilis>/toko.html(.gz|.br)
+#   SNAPSHOT_FOLDER/<versi katalog>-<versi rilis>/kitab/<id>.html(.gz|.br)
+#   SNAPSHOT_FOLDER/current -> symlink ke folder versi terbaru
+#
+# Aplikasi hanya mengirim file dari folder yang cocok dengan versi katalog
+# dan rilis yang sedang berjalan; bila belum ada, halaman dirender langsung
+# dan publikasi dijadwalkan di latar belakang. Proxy depan (mis. nginx
+# dengan gzip_static/brotli_static) boleh melayani `current/` langsung,
+# dengan aplikasi sebagai fallback; jalankan `flask publish-shop` setelah
+# deploy agar `current/` memakai template terbaru.
+
+import gzip
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import render_template
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tingkat kompresi salinan .gz/.br; dibuat sekali per publikasi, bukan per request
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Folder sementara sisa publikasi yang gagal/terputus dihapus setelah umur ini (detik)
+STALE_TMP_AGE = 3600
+# File lock publikasi yang lebih tua dari ini dianggap sisa proses yang mati (detik)
+STALE_LOCK_AGE = 600
+# Jeda sebelum publikasi latar belakang versi yang gagal dicoba lagi (detik);
+# berlipat dua setiap kali gagal, paling lama MAX_RETRY_DELAY
+RETRY_DELAY = 60
+MAX_RETRY_DELAY = 3600
+
+SHOP_PAGE = 'toko.html'
+
+
+def book_page(book_id):
+    """Nama file snapshot halaman detail satu kitab."""
+    return f"kitab/{int(book_id)}.html"
+
+
+def render_shop(books):
+    return render_template('shop.html', books=books)
+
+
+def render_book_detail(book, books):
+    return render_template('book_detail.html', book=book, books=books)
+
+
+def encodings():
+    """Pasangan (Content-Encoding, akhiran file) yang dibuat, urut dari yang paling disukai."""
+    return ([('br', '.br')] if brotli is not None else []) + [('gzip', '.gz')]
+
+
+def _write_page(folder, name, html):
+    path = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = html.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    if brotli is not None:
+        with open(f"{path}.br", 'wb') as f:
+            f.write(brotli.compress(data, quality=BROTLI_QUALITY))
+
+
+class ShopSnapshot:
+    """Penerbit dan pencari snapshot halaman toko untuk satu aplikasi.
+
+    Publikasi berjalan di satu thread latar belakang per proses; permintaan
+    publikasi yang datang selagi masih ada yang antri digabung menjadi satu.
+    Antar worker, file `<versi>.lock` (O_EXCL) memastikan satu versi hanya
+    dirender oleh satu proses; worker lain melewatinya. Folder versi ditulis
+    lewat folder sementara lalu di-rename, sehingga request tidak pernah
+    membaca snapshot setengah jadi. Publikasi yang gagal dicatat di
+    `<versi>.failed`, dan publikasi latar belakang versi itu ditunda
+    (RETRY_DELAY, berlipat dua tiap gagal) di semua worker.
+    """
+
+    def __init__(self, app, catalog_cache, folder, release_version, enabled=True):
+        self.app = app
+        self._catalog_cache = catalog_cache
+        self.folder = folder
+        self.release_version = release_version
+        self.enabled = enabled
+        self._executor = None
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def _key(self, version):
+        return f"{version}-{self.release_version}"
+
+    def find(self, version, name):
+        """Path file snapshot `name` untuk versi katalog `version`, atau None bila belum diterbitkan."""
+        if not self.enabled or version is None:
+            return None
+        path = os.path.join(self.folder, self._key(version), name)
+        return path if os.path.exists(path) else None
+
+    def _marker(self, key, suffix):
+        return os.path.join(self.folder, f"{key}{suffix}")
+
+    def retry_delay(self, version):
+        """Sisa jeda (detik) sebelum publikasi versi `version` yang gagal boleh dicoba lagi; 0 bila tidak ditunda."""
+        path = self._marker(self._key(version), '.failed')
+        try:
+            with open(path) as f:
+                failures = int(f.read() or 1)
+            age = time.time() - os.path.getmtime(path)
+        except (OSError, ValueError):
+            return 0
+        return max(0, min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY) - age)
+
+    def _record_failure(self, key):
+        path = self._marker(key, '.failed')
+        try:
+            with open(path) as f:
+                failures = int(f.read() or 0)
+        except (OSError, ValueError):
+            failures = 0
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, 'w') as f:
+            f.write(str(failures + 1))
+        os.replace(tmp, path)
+
+    def _acquire_lock(self, key):
+        """Buat file lock versi `key`; kembalikan path-nya, atau None bila proses lain sedang menerbitkan versi ini."""
+        path = self._marker(key, '.lock')
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) < STALE_LOCK_AGE:
+                        return None
+                    # Sisa proses yang mati di tengah publikasi
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return path
+        return None
+
+    def schedule(self, version=None):
+        """Jadwalkan publikasi di thread latar belakang (dipanggil setelah katalog berubah).
+
+        Bila `version` diberikan dan publikasi versi itu baru saja gagal,
+        tidak ada yang dijadwalkan sampai jedanya lewat.
+        """
+        if not self.enabled:
+            return
+        if version is not None and self.retry_delay(version) > 0:
+            return
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+            # Executor dibuat saat pertama dipakai, setelah worker gunicorn di-fork
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shop-snapshot')
+        self._executor.submit(self._publish_logged)
+
+    def _publish_logged(self):
+        with self._lock:
+            self._pending = False
+        try:
+            self.publish(retry_failed=False)
+        except Exception as e:
+            print(f"Error publishing shop snapshot: {e}")
+
+    def publish(self, retry_failed=True):
+        """Render semua halaman toko untuk versi katalog terkini.
+
+        Mengembalikan (versi, jumlah halaman), atau None bila versi ini sudah
+        diterbitkan, sedang diterbitkan proses lain, atau (dengan
+        retry_failed=False) masih dalam jeda setelah gagal.
+        """
+        with self.app.app_context():
+            # Muat ulang dari database: cache worker ini bisa saja masih versi lama
+            self._catalog_cache.invalidate()
+            version, books = self._catalog_cache.versioned_books()
+            key = self._key(version)
+            target = os.path.join(self.folder, key)
+            if os.path.isdir(target):
+                return None
+            if not retry_failed and self.retry_delay(version) > 0:
+                return None
+
+            os.makedirs(self.folder, exist_ok=True)
+            lock = self._acquire_lock(key)
+            if lock is None:
+                return None
+            try:
+                published = self._publish_version(version, key, books)
+            except Exception:
+                self._record_failure(key)
+                raise
+            finally:
+                os.remove(lock)
+            try:
+                os.remove(self._marker(key, '.failed'))
+            except FileNotFoundError:
+                pass
+            return published
+
+    def _publish_version(self, version, key, books):
+        target = os.path.join(self.folder, key)
+        tmp = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            # url_for di template butuh konteks request; URL yang dihasilkan relatif
+            with self.app.test_request_context('/toko'):
+                _write_page(tmp, SHOP_PAGE, render_shop(books))
+                for book in books:
+                    _write_page(tmp, book_page(book['id']), render_book_detail(book, books))
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # Versi yang sama sudah diterbitkan worker lain lebih dulu
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None
+        previous = self._point_current(version, key)
+        self._prune({key, previous})
+        return version, len(books) + 1
+
+    def _point_current(self, version, key):
+        """Arahkan symlink `current` ke folder `key`; kembalikan folder yang ditunjuk sebelumnya.
+
+        Bila `current` sudah menunjuk versi katalog yang lebih baru dari rilis
+        yang sama (diterbitkan worker lain), symlink dibiarkan.
+        """
+        current = os.path.join(self.folder, 'current')
+        previous = os.readlink(current) if os.path.islink(current) else None
+        if previous:
+            previous_version, _, previous_release = previous.partition('-')
+            if previous_release == str(self.release_version) and previous_version.isdigit() and int(previous_version) > version:
+                return previous
+        tmp_link = f"{current}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.symlink(key, tmp_link)
+        os.replace(tmp_link, current)
+        return previous
+
+    def _prune(self, keep):
+        """Hapus folder versi lama; versi sebelumnya dibiarkan untuk worker yang cache-nya belum diperbarui.
+
+        File lock/penanda gagal milik versi lain ikut dihapus setelah kedaluwarsa.
+        """
+        now = time.time()
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.endswith(('.lock', '.failed')):
+                max_age = STALE_LOCK_AGE if name.endswith('.lock') else MAX_RETRY_DELAY
+                try:
+                    if name.rsplit('.', 1)[0] not in keep and now - os.path.getmtime(path) >= max_age:
+                        os.remove(path)
+                except FileNotFoundError:
+                    # Sudah dihapus worker lain
+                    pass
+                continue
+            if name in keep or name == 'current' or not os.path.isdir(path) or os.path.islink(path):
+                continue
+            if '.tmp-' in name and now - os.path.getmtime(path) < STALE_TMP_AGE:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
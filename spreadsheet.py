@@ -0,0 +1,131 @@
+# spreadsheet.py
+
+# Pembaca file import (xlsx/csv) per potongan baris. Alih-alih memuat seluruh
+# workbook ke DataFrame dengan pd.read_excel, xlsx dibaca dengan openpyxl
+# read_only (baris di-stream dari XML) dan csv dengan pd.read_csv(chunksize),
+# sehingga memori puncak dibatasi oleh ukuran potongan, bukan ukuran file.
+# pandas dan openpyxl baru diimpor saat file pertama dibaca, agar modul ini
+# murah diimpor oleh worker web yang hanya butuh file_format().
+
+# Jumlah baris data per DataFrame yang dihasilkan SheetReader
+READ_CHUNK_ROWS = 5000
+
+SUPPORTED_FORMATS = ('xlsx', 'xls', 'csv')
+
+
+def file_format(filename):
+    """Format file import dari ekstensinya ('xlsx', 'xls' atau 'csv'), None bila tidak didukung."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in SUPPORTED_FORMATS else None
+
+
+def _cell_value(value):
+    # Sama dengan pembaca openpyxl milik pandas: angka bulat float menjadi int
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value == '':
+        return None
+    return value
+
+
+class SheetReader:
+    """Membaca sheet pertama file import sebagai rangkaian DataFrame.
+
+    `columns` sudah tersedia sebelum iterasi (untuk validasi kolom wajib) dan
+    `total_rows` berisi perkiraan jumlah baris data (None untuk csv). Index
+    tiap DataFrame adalah nomor baris data berbasis 0, sehingga `index + 2`
+    tetap menunjuk nomor baris di Excel seperti pada pd.read_excel.
+
+    Dengan `as_text=True` semua sel dibaca sebagai string (setara dtype=str);
+    sel kosong tetap NaN.
+    """
+
+    def __init__(self, source, fmt, chunk_rows=READ_CHUNK_ROWS, as_text=False):
+        self.chunk_rows = chunk_rows
+        self.as_text = as_text
+        self.total_rows = None
+        self._workbook = None
+        if fmt == 'csv':
+            self._chunks = self._read_csv(source)
+        elif fmt == 'xlsx':
+            self._chunks = self._read_xlsx(source)
+        else:
+            # .xls (format lama) tidak bisa di-stream; dibaca utuh lalu dipotong
+            self._chunks = self._read_whole(source)
+        self._first = next(self._chunks, None)
+        self.columns = list(self._first.columns) if self._first is not None else []
+
+    def __iter__(self):
+        try:
+            if self._first is not None and len(self._first):
+                yield self._first
+            self._first = None
+            for chunk in self._chunks:
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def _frame(self, rows, columns, index):
+        import pandas as pd
+
+        nan = float('nan')
+        if self.as_text:
+            rows = [[str(value) if value is not None else nan for value in row] for row in rows]
+            return pd.DataFrame(rows, columns=columns, index=index, dtype=object)
+        rows = [[value if value is not None else nan for value in row] for row in rows]
+        return pd.DataFrame(rows, columns=columns, index=index)
+
+    def _read_xlsx(self, source):
+        from openpyxl import load_workbook
+
+        self._workbook = load_workbook(source, read_only=True, data_only=True)
+        worksheet = self._workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Kolom tanpa judul di ujung kanan diabaikan, seperti pada pd.read_excel
+        while header and header[-1] is None:
+            header = header[:-1]
+        columns = [str(name) if name is not None else f'Unnamed: {i}' for i, name in enumerate(header)]
+        width = len(columns)
+        if worksheet.max_row:
+            self.total_rows = max(worksheet.max_row - 1, 0)
+
+        # Sheet tanpa baris data tetap menghasilkan DataFrame kosong agar kolomnya diketahui
+        yield self._frame([], columns, [])
+        batch, index = [], []
+        for row_number, row in enumerate(rows):
+            values = [_cell_value(value) for value in row[:width]]
+            if all(value is None for value in values):
+                continue
+            values.extend([None] * (width - len(values)))
+            batch.append(values)
+            index.append(row_number)
+            if len(batch) >= self.chunk_rows:
+                yield self._frame(batch, columns, index)
+                batch, index = [], []
+        if batch:
+            yield self._frame(batch, columns, index)
+
+    def _read_csv(self, source):
+        import pandas as pd
+
+        reader = pd.read_csv(source, chunksize=self.chunk_rows, encoding='utf-8-sig',
+                             dtype=str if self.as_text else None, skip_blank_lines=True)
+        with reader:
+            yield from reader
+
+    def _read_whole(self, source):
+        import pandas as pd
+
+        df = pd.read_excel(source, dtype=str if self.as_text else None)
+        yield df.iloc[:0]
+        self.total_rows = len(df)
+        for start in range(0, len(df), self.chunk_rows):
+            yield df.iloc[start:start + self.chunk_rows]
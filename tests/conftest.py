@@ -0,0 +1,30 @@
+# tests/conftest.py
+
+import pytest
+
+from app import create_app
+from config import TestingConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplikasi dengan TestingConfig; folder upload/job/snapshot di direktori sementara."""
+    class Config(TestingConfig):
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        JOBS_FOLDER = str(tmp_path / 'jobs')
+        SNAPSHOT_FOLDER = str(tmp_path / 'snapshots')
+
+    return create_app(Config)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    """Test client yang sudah login sebagai admin."""
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    return client
@@ -0,0 +1,35 @@
+# tests/test_app.py
+
+# Pool MySQL dikosongkan di proses anak setelah fork, lewat satu hook per proses.
+
+import os
+
+import app as app_module
+from config import TestingConfig
+from models import db
+
+
+def test_fork_resets_pool_of_every_app(app, tmp_path):
+    class Config(TestingConfig):
+        UPLOAD_FOLDER = str(tmp_path / 'other-uploads')
+
+    other = app_module.create_app(Config)
+    engines = []
+    for each in (app, other):
+        with each.app_context():
+            engines.append(db.engine)
+    pools = [engine.pool for engine in engines]
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        replaced = all(engine.pool is not pool for engine, pool in zip(engines, pools))
+        os.write(write_end, b'1' if replaced else b'0')
+        os._exit(0)
+    os.close(write_end)
+    result = os.read(read_end, 1)
+    os.close(read_end)
+    os.waitpid(pid, 0)
+
+    assert result == b'1'
+    assert all(engine.pool is pool for engine, pool in zip(engines, pools))
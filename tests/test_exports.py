@@ -0,0 +1,90 @@
+# tests/test_exports.py
+
+# Export Excel/CSV memakai engine bersama (db.engine) dan pool-nya; tidak boleh
+# ada create_engine() atau pymysql.connect() baru per request.
+
+import pandas as pd
+import pymysql
+import pytest
+import sqlalchemy
+import sqlalchemy.engine
+import sqlalchemy.pool
+
+import services
+from models import db
+
+EXPORT_URLS = ['/api/export-offline-sales', '/api/export-online-sales', '/api/export-cash-records']
+
+
+class FakeCursor:
+    description = [('Tanggal',), ('Jenis Transaksi',), ('Keterangan',), ('Kategori',), ('Jumlah',)]
+
+    def __init__(self):
+        self._rows = [('01-01-2025', 'Debit', 'Penjualan', 'Kitab', 1000)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, args=None):
+        pass
+
+    def fetchone(self):
+        return None
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    open = True
+
+    def cursor(self, cursor=None):
+        return FakeCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def engine_usage(app, monkeypatch):
+    """Catat engine yang dipakai export; gagal bila ada engine atau koneksi langsung yang baru."""
+    def forbidden(*args, **kwargs):
+        raise AssertionError('export tidak boleh membuat engine/koneksi baru')
+
+    monkeypatch.setattr(sqlalchemy, 'create_engine', forbidden)
+    monkeypatch.setattr(sqlalchemy.engine, 'create_engine', forbidden)
+    # Tiap engine baru membuat pool baru, termasuk lewat `from sqlalchemy import create_engine`
+    monkeypatch.setattr(sqlalchemy.pool.Pool, '__init__', forbidden)
+    monkeypatch.setattr(pymysql, 'connect', forbidden)
+
+    used = []
+
+    def read_sql_query(query, con, params=None):
+        used.append(con)
+        return pd.DataFrame([{'Tanggal': '01-01-2025', 'Jumlah': 1}])
+
+    def checkout(engine):
+        used.append(engine)
+        return FakeConnection()
+
+    monkeypatch.setattr(pd, 'read_sql_query', read_sql_query)
+    monkeypatch.setattr(services, 'checkout', checkout)
+    return used
+
+
+@pytest.mark.parametrize('mode', ['', 'stream'])
+def test_exports_reuse_shared_engine(app, admin_client, engine_usage, mode):
+    for _ in range(3):
+        for url in EXPORT_URLS:
+            response = admin_client.get(url, query_string={'mode': mode} if mode else {})
+            assert response.status_code == 200, url
+            response.close()
+
+    with app.app_context():
+        engine = db.engine
+    assert engine_usage
+    assert all(used is engine for used in engine_usage)
@@ -0,0 +1,165 @@
+# tests/test_imports.py
+
+# Import dari CSV: setiap potongan penjualan (penjualan + rekap) adalah satu
+# transaksi, nama pembeli yang bentrok menurut collation MySQL tidak
+# membatalkan import, dan import kitab yang gagal tidak meninggalkan perubahan.
+
+import datetime
+import io
+
+import pandas as pd
+import pymysql
+import pytest
+
+import services
+from blueprints.books_api import book_import_rows, run_import_books
+from blueprints.sales_api import run_import_offline_sales, run_import_online_sales
+
+
+class FakeDatabase:
+    """Tabel books/offline_buyers di memori; `fail_on` membuat statement yang memuat teks itu gagal."""
+
+    def __init__(self):
+        self.books = [{'id': 1, 'name': 'Kitab A', 'price': 10000}]
+        # 'Ahmad' dianggap sama dengan 'Ahmád' oleh collation *_ai_ci
+        self.buyers = [{'id': 5, 'name': 'Ahmad'}]
+        self.log = []
+        self.fail_on = None
+
+
+def collation_key(name):
+    return name.casefold().replace('á', 'a')
+
+
+class FakeCursor:
+    def __init__(self, database):
+        self.db = database
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def _check(self, query):
+        if self.db.fail_on and self.db.fail_on in query:
+            raise pymysql.err.OperationalError(1213, 'Deadlock found')
+
+    def execute(self, query, args=None):
+        self.db.log.append(' '.join(query.split())[:40])
+        self._check(query)
+        self._rows = []
+        if 'COUNT(*)' in query:
+            wanted = {collation_key(name) for name in args[0]}
+            self._rows = [{'total': sum(collation_key(row['name']) in wanted for row in self.db.books)}]
+        elif 'NOW()' in query:
+            self._rows = [{'now': datetime.datetime(2025, 1, 2, 10, 0)}]
+        elif 'WHERE name IN' in query:
+            table = self.db.books if 'FROM books' in query else self.db.buyers
+            wanted = {collation_key(name) for name in args[0]}
+            self._rows = [row for row in table if collation_key(row['name']) in wanted]
+        elif 'FROM offline_buyers WHERE name = %s' in query:
+            self._rows = [row for row in self.db.buyers if collation_key(row['name']) == collation_key(args[0])]
+
+    def executemany(self, query, rows):
+        self.db.log.append(' '.join(query.split())[:40])
+        self._check(query)
+        if 'INTO offline_buyers' in query:
+            for name, _ in rows:
+                if any(collation_key(row['name']) == collation_key(name) for row in self.db.buyers):
+                    if 'IGNORE' not in query:
+                        raise pymysql.err.IntegrityError(1062, f"Duplicate entry '{name}'")
+                    continue
+                self.db.buyers.append({'id': len(self.db.buyers) + 10, 'name': name})
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    open = True
+
+    def __init__(self, database):
+        self.db = database
+
+    def cursor(self, cursor=None):
+        return FakeCursor(self.db)
+
+    def begin(self):
+        self.db.log.append('begin')
+
+    def commit(self):
+        self.db.log.append('commit')
+
+    def rollback(self):
+        self.db.log.append('rollback')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def database(app, monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(services, 'checkout', lambda engine: FakeConnection(database))
+    with app.app_context():
+        yield database
+
+
+def csv_source(text):
+    return io.BytesIO(text.encode('utf-8'))
+
+
+def test_offline_chunk_commits_sales_with_rollups(database):
+    payload, status = run_import_offline_sales(csv_source('Nama Pembeli,Nama Kitab,Jumlah\nBudi,Kitab A,2\n'), 'csv')
+
+    assert status == 200
+    assert 'Berhasil: 1' in payload['message']
+    sale = next(i for i, entry in enumerate(database.log) if entry.startswith('INSERT INTO offline_sales'))
+    assert database.log[sale - 1] == 'begin'
+    assert database.log[sale + 1:].count('commit') == 1
+    assert any(entry.startswith('INSERT INTO sales_daily_rollups') for entry in database.log[sale:])
+
+
+@pytest.mark.parametrize('run_import, text', [
+    (run_import_offline_sales, 'Nama Pembeli,Nama Kitab,Jumlah\nBudi,Kitab A,2\n'),
+    (run_import_online_sales, 'Nama Pembeli,Nama Kitab,Jumlah,Tanggal Transfer\nBudi,Kitab A,2,2025-01-02\n'),
+])
+def test_failed_rollup_rolls_back_chunk(database, run_import, text):
+    database.fail_on = 'sales_daily_rollups'
+    payload, status = run_import(csv_source(text), 'csv')
+
+    assert status == 200
+    assert 'Berhasil: 0, Dilewati: 1' in payload['message']
+    assert database.log[-1] == 'rollback'
+    assert 'commit' not in database.log[database.log.index('begin'):]
+
+
+def test_collation_duplicate_buyer_does_not_abort_import(database):
+    text = 'Nama Pembeli,Nama Kitab,Jumlah\nAhmád,Kitab A,1\nBudi,Kitab A,1\n'
+    payload, status = run_import_offline_sales(csv_source(text), 'csv')
+
+    assert status == 200
+    assert 'Berhasil: 2, Dilewati: 0' in payload['message']
+    assert [row['name'] for row in database.buyers] == ['Ahmad', 'Budi']
+
+
+def test_book_import_skips_empty_price():
+    df = pd.DataFrame({'Nama': ['Kitab A', 'Kitab B', 'Kitab C'], 'Harga': ['10000', '', 'gratis']})
+    rows = book_import_rows(df, has_availability=False)
+
+    assert [row[:2] for row in rows] == [('Kitab A', 10000)]
+
+
+def test_failed_book_import_rolls_back(database):
+    database.fail_on = 'INSERT INTO books'
+    payload, status = run_import_books(csv_source('Nama,Harga\nKitab B,15000\n'), 'csv')
+
+    assert status == 500
+    assert database.log[-1] == 'rollback'
+    assert 'commit' not in database.log
+    assert not any(entry.startswith('INSERT INTO cache_versions') for entry in database.log)
@@ -0,0 +1,64 @@
+# tests/test_indexes.py
+
+# Query filter endpoint (daftar/export penjualan, kas) harus benar-benar memakai index.
+# EXPLAIN butuh MySQL yang sudah di-migrate: set TEST_DATABASE_URL untuk menjalankannya.
+
+import os
+
+import pytest
+
+from commands import explain_filter_queries, indexed_filter_queries
+from services import get_db_connection
+
+
+def test_filter_queries_placeholders_match_params():
+    for table, index_name, query, params in indexed_filter_queries():
+        # Sama seperti pymysql: setiap %s diisi satu parameter, %% menjadi %
+        rendered = query % tuple(repr(param) for param in params)
+        assert '%s' not in rendered, index_name
+
+
+class PlanCursor:
+    """Cursor palsu yang menjawab setiap EXPLAIN dengan satu baris plan untuk tabel query itu."""
+
+    def __init__(self, plan_for):
+        self.plan_for = plan_for
+        self._rows = []
+
+    def execute(self, query, params=None):
+        table, index_name = next((table, index_name) for table, index_name, filter_query, _ in indexed_filter_queries()
+                                 if query == "EXPLAIN " + filter_query)
+        self._rows = [dict(self.plan_for(index_name), table=table)]
+
+    def fetchall(self):
+        return self._rows
+
+
+@pytest.mark.parametrize('plan, used', [
+    (lambda index_name: {'type': 'range', 'key': index_name, 'possible_keys': index_name}, True),
+    # Ada di possible_keys tetapi optimizer memilih index lain / full scan
+    (lambda index_name: {'type': 'ref', 'key': 'PRIMARY', 'possible_keys': f"PRIMARY,{index_name}"}, False),
+    (lambda index_name: {'type': 'ALL', 'key': None, 'possible_keys': index_name}, False),
+    (lambda index_name: {'type': 'ALL', 'key': index_name, 'possible_keys': index_name}, False),
+])
+def test_explain_requires_chosen_index(plan, used):
+    results = list(explain_filter_queries(PlanCursor(plan)))
+    assert results
+    assert all(result_used is used for _, _, result_used, _ in results)
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_DATABASE_URL'),
+                    reason='butuh database MySQL yang sudah di-migrate (TEST_DATABASE_URL)')
+def test_filter_queries_use_indexes(app):
+    with app.app_context():
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                results = list(explain_filter_queries(cursor))
+        finally:
+            conn.close()
+
+    assert results
+    unused = [(table, index_name, plan.get('type'), plan.get('key'))
+              for table, index_name, used, plan in results if not used]
+    assert not unused
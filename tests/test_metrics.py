@@ -0,0 +1,37 @@
+# tests/test_metrics.py
+
+# Metrik gabungan antar-worker dan pencatatan durasi query.
+
+import pytest
+import sqlalchemy
+
+import metrics
+
+
+def test_clear_folder_only_removes_worker_files(tmp_path):
+    (tmp_path / 'worker-10.json').write_text('{}')
+    (tmp_path / 'worker-11.json.tmp').write_text('{}')
+    (tmp_path / 'uploads.txt').write_text('milik operator')
+    (tmp_path / 'jobs').mkdir()
+
+    metrics.clear_folder(str(tmp_path))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['jobs', 'uploads.txt']
+    metrics.clear_folder(str(tmp_path / 'tidak-ada'))
+
+
+def test_failed_queries_do_not_leak_start_times():
+    engine = sqlalchemy.create_engine('sqlite://')
+    metrics.init_engine_events(engine)
+    request_metrics = metrics.start_request()
+    try:
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text('SELECT 1'))
+            for _ in range(3):
+                with pytest.raises(sqlalchemy.exc.OperationalError):
+                    conn.execute(sqlalchemy.text('SELECT * FROM tidak_ada'))
+            assert conn.info['query_started'] == []
+    finally:
+        metrics.finish_request()
+
+    assert len(request_metrics.queries) == 4
@@ -0,0 +1,193 @@
+# tests/test_shipping.py
+
+# Klien Biteship dan API ongkir dengan session `requests` tiruan (tanpa jaringan).
+
+import threading
+
+import pytest
+
+import services
+from shipping import BiteshipClient
+
+
+class StubResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Pengganti requests.Session: mencatat panggilan dan membalas dengan payload tetap."""
+
+    def __init__(self, areas=None, success=True, pricing=None):
+        self.areas = areas if areas is not None else [{'id': 'IDNP6IDNC148', 'name': 'Jepara, Jawa Tengah'}]
+        self.success = success
+        self.pricing = pricing if pricing is not None else [{'courier_code': 'jne', 'price': 18000}]
+        self.gets = []
+        self.posts = []
+
+    def get(self, url, params=None, timeout=None):
+        self.gets.append(params)
+        return StubResponse({'success': self.success, 'areas': self.areas})
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(json)
+        return StubResponse({'success': self.success, 'pricing': self.pricing})
+
+
+class BlockingSession(StubSession):
+    """Session yang menahan POST sampai `release` diset, agar request serentak sempat menumpuk."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+
+    def post(self, url, json=None, timeout=None):
+        self.release.wait(5)
+        return super().post(url, json=json, timeout=timeout)
+
+
+def make_client(session, **kwargs):
+    client = BiteshipClient('test-key', 'http://biteship.test', **kwargs)
+    client.session = session
+    return client
+
+
+@pytest.fixture
+def stub_session(app):
+    session = StubSession()
+    services.biteship.session = session
+    return session
+
+
+def test_area_search_is_cached_publicly(client, stub_session):
+    response = client.get('/api/cari-area', query_string={'q': 'jepara'})
+    assert response.status_code == 200
+    assert response.json == stub_session.areas
+    assert response.headers['Cache-Control'] == 'public, max-age=3600'
+
+
+def test_failed_area_search_is_not_cached(client, stub_session):
+    stub_session.success = False
+    response = client.get('/api/cari-area', query_string={'q': 'jepara'})
+    assert response.status_code == 200
+    assert response.json == []
+    assert response.headers['Cache-Control'] == 'no-store'
+
+    # Kegagalan sementara juga tidak disimpan di cache proses
+    stub_session.success = True
+    response = client.get('/api/cari-area', query_string={'q': 'jepara'})
+    assert response.json == stub_session.areas
+    assert len(stub_session.gets) == 2
+
+
+# --- Klien Biteship ---
+def test_area_cache_hit_and_miss():
+    session = StubSession()
+    client = make_client(session)
+
+    assert client.search_areas('Jepara') == (True, session.areas)
+    # Kunci cache dinormalisasi: huruf besar/spasi tidak memicu panggilan baru
+    assert client.search_areas('  jePARA ') == (True, session.areas)
+    assert len(session.gets) == 1
+    assert client.stats.snapshot()['area_misses'] == 1
+    assert client.stats.snapshot()['area_hits'] == 1
+
+
+def test_area_prefix_reuse_for_complete_list():
+    session = StubSession(areas=[{'id': 'A1', 'name': 'Semarang Barat'},
+                                 {'id': 'A2', 'name': 'Sematang Borang'}])
+    client = make_client(session)
+
+    client.search_areas('sema')
+    ok, areas = client.search_areas('semar')
+    assert ok
+    assert [area['id'] for area in areas] == ['A1']
+    assert len(session.gets) == 1
+
+
+def test_area_prefix_not_reused_for_truncated_list():
+    session = StubSession(areas=[{'id': f'A{i}', 'name': f'Sema {i}'} for i in range(3)])
+    client = make_client(session, area_result_limit=3)
+
+    client.search_areas('sema')
+    client.search_areas('semar')
+    # Daftar "sema" terpotong di batas hasil, jadi "semar" harus ditanyakan ke Biteship
+    assert len(session.gets) == 2
+
+
+def test_rates_cached_per_area_and_weight():
+    session = StubSession()
+    client = make_client(session)
+
+    assert client.get_rates('IDNP6IDNC148', 1000) == (True, session.pricing)
+    assert client.get_rates('IDNP6IDNC148', 1000) == (True, session.pricing)
+    assert client.get_rates('IDNP6IDNC149', 1000) == (True, session.pricing)
+    assert len(session.posts) == 2
+    assert client.stats.snapshot()['rate_hits'] == 1
+
+
+def test_rate_errors_are_not_cached():
+    session = StubSession(success=False)
+    client = make_client(session)
+
+    ok, _ = client.get_rates('IDNP6IDNC148', 1000)
+    assert not ok
+    session.success = True
+    assert client.get_rates('IDNP6IDNC148', 1000) == (True, session.pricing)
+    assert len(session.posts) == 2
+
+
+def test_concurrent_rate_requests_single_flight():
+    session = BlockingSession()
+    client = make_client(session)
+    results = []
+    started = threading.Barrier(9)
+
+    def worker():
+        started.wait(5)
+        results.append(client.get_rates('IDNP6IDNC148', 1000))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Biteship baru "membalas" setelah semua thread sempat masuk ke single-flight
+    started.wait(5)
+    threading.Event().wait(0.1)
+    session.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [(True, session.pricing)] * len(threads)
+    assert len(session.posts) == 1
+    stats = client.stats.snapshot()
+    assert stats['rate_misses'] + stats['rate_coalesced'] + stats['rate_hits'] == len(threads)
+
+
+def test_rates_quote_bucket_weight():
+    session = StubSession()
+    client = make_client(session, rate_weight_bucket=1000)
+
+    client.get_rates('IDNP6IDNC148', 1100)
+    # Biteship ditanya dengan berat bucket, jadi tarif tidak bergantung urutan permintaan
+    assert session.posts[0]['items'][0]['weight'] == 2000
+    # Berat lain dalam bucket 1001-2000 g memakai tarif yang sama
+    assert client.get_rates('IDNP6IDNC148', 1900) == (True, session.pricing)
+    assert len(session.posts) == 1
+    client.get_rates('IDNP6IDNC148', 2100)
+    assert session.posts[1]['items'][0]['weight'] == 3000
+
+
+def test_rates_without_bucket_cache_exact_weight():
+    session = StubSession()
+    client = make_client(session, rate_weight_bucket=0)
+
+    client.get_rates('IDNP6IDNC148', 1100)
+    client.get_rates('IDNP6IDNC148', 1900)
+    assert [post['items'][0]['weight'] for post in session.posts] == [1100, 1900]
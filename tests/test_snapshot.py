@@ -0,0 +1,90 @@
+# tests/test_snapshot.py
+
+# Publikasi snapshot toko: satu proses per versi (file lock) dan jeda setelah gagal.
+
+import os
+import time
+
+import pytest
+
+import snapshot
+from snapshot import ShopSnapshot
+
+BOOKS = [{'id': i, 'name': f'Kitab {i}', 'price': 10000 * i, 'availability': 'Tersedia', 'image_filename': None,
+          'link_ig': '', 'link_wa': '', 'link_shopee': '', 'link_tiktok': ''} for i in range(1, 4)]
+
+
+class StubCatalog:
+    version = 7
+
+    def invalidate(self):
+        pass
+
+    def versioned_books(self):
+        return self.version, BOOKS
+
+
+@pytest.fixture
+def shop_snapshot(app, tmp_path):
+    return ShopSnapshot(app, StubCatalog(), str(tmp_path / 'snapshots'), 'r1')
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_publish_once_per_version(shop_snapshot):
+    assert shop_snapshot.publish() == (7, len(BOOKS) + 1)
+    assert shop_snapshot.find(7, snapshot.SHOP_PAGE)
+    assert shop_snapshot.publish() is None
+    assert not os.path.exists(os.path.join(shop_snapshot.folder, '7-r1.lock'))
+
+
+def test_publish_skips_version_locked_by_other_process(shop_snapshot, monkeypatch):
+    os.makedirs(shop_snapshot.folder)
+    lock = os.path.join(shop_snapshot.folder, '7-r1.lock')
+    open(lock, 'w').close()
+    rendered = []
+    monkeypatch.setattr(snapshot, 'render_shop', lambda books: rendered.append(books) or '')
+
+    assert shop_snapshot.publish() is None
+    assert not rendered
+
+    # Lock sisa proses yang mati diambil alih
+    age(lock, snapshot.STALE_LOCK_AGE + 1)
+    assert shop_snapshot.publish() == (7, len(BOOKS) + 1)
+    assert not os.path.exists(lock)
+
+
+def test_failed_publish_backs_off(shop_snapshot, monkeypatch):
+    def broken(books):
+        raise RuntimeError('template rusak')
+
+    monkeypatch.setattr(snapshot, 'render_shop', broken)
+    with pytest.raises(RuntimeError):
+        shop_snapshot.publish()
+
+    failed = os.path.join(shop_snapshot.folder, '7-r1.failed')
+    assert open(failed).read() == '1'
+    assert not os.path.exists(os.path.join(shop_snapshot.folder, '7-r1.lock'))
+    assert not [name for name in os.listdir(shop_snapshot.folder) if '.tmp-' in name]
+    assert shop_snapshot.retry_delay(7) > snapshot.RETRY_DELAY - 5
+
+    # Miss berikutnya tidak menjadwalkan publikasi ulang selama jeda
+    shop_snapshot.schedule(7)
+    assert shop_snapshot._executor is None
+    assert shop_snapshot.publish(retry_failed=False) is None
+
+    # Setelah jeda lewat dicoba lagi; gagal kedua kali menggandakan jeda
+    age(failed, snapshot.RETRY_DELAY + 1)
+    assert shop_snapshot.retry_delay(7) == 0
+    with pytest.raises(RuntimeError):
+        shop_snapshot.publish(retry_failed=False)
+    assert open(failed).read() == '2'
+    assert shop_snapshot.retry_delay(7) > 2 * snapshot.RETRY_DELAY - 5
+
+    # Publikasi manual (`flask publish-shop`) tidak menunggu jeda, dan sukses menghapus penanda gagal
+    monkeypatch.undo()
+    assert shop_snapshot.publish() == (7, len(BOOKS) + 1)
+    assert not os.path.exists(failed)
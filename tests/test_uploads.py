@@ -0,0 +1,139 @@
+# tests/test_uploads.py
+
+# Varian gambar: format ada di URL (.webp/.jpg) sehingga aman di-cache immutable tanpa Vary: Accept.
+# Backfill nama berbasis hash tidak pernah membuat baris kitab menunjuk file yang hilang.
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import images
+import services
+from snapshot import render_shop
+
+
+@pytest.fixture
+def cover(app):
+    """Gambar sampul bernama hash beserta semua variannya di UPLOAD_FOLDER."""
+    upload_folder = app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    buffer = io.BytesIO()
+    Image.new('RGB', (600, 800), (200, 30, 30)).save(buffer, 'PNG')
+    data = buffer.getvalue()
+    filename = images.hashed_filename(data, 'png')
+    with open(os.path.join(upload_folder, filename), 'wb') as f:
+        f.write(data)
+    images.generate_variants(upload_folder, filename)
+    return filename
+
+
+def test_parse_variant_url_name():
+    assert images.parse_variant_url_name('abc.png.webp') == ('abc.png', 'webp')
+    assert images.parse_variant_url_name('abc.png.jpg') == ('abc.png', 'jpg')
+    # URL lama (nama asli saja) dilayani sebagai JPEG
+    assert images.parse_variant_url_name('abc.png') == ('abc.png', 'jpg')
+    assert images.parse_variant_url_name('abc.webp') == ('abc.webp', 'jpg')
+
+
+@pytest.mark.parametrize('fmt, mimetype', [('webp', 'image/webp'), ('jpg', 'image/jpeg')])
+def test_variant_format_comes_from_url(client, cover, fmt, mimetype):
+    url = f'/uploads/card/{images.variant_url_name(cover, fmt)}'
+    for accept in ('image/avif,image/webp,*/*', 'image/jpeg', '*/*'):
+        response = client.get(url, headers={'Accept': accept})
+        assert response.status_code == 200
+        assert response.mimetype == mimetype
+        assert response.cache_control.immutable
+        assert 'Accept' not in response.vary
+        response.close()
+
+
+def test_missing_variant_falls_back_to_original_uncached(app, client, cover):
+    os.remove(images.variant_path(app.config['UPLOAD_FOLDER'], 'thumb', cover, 'webp'))
+    response = client.get(f'/uploads/thumb/{cover}.webp')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.cache_control.max_age == 0
+    assert not response.cache_control.immutable
+    response.close()
+
+
+def test_templates_offer_both_formats(app, cover):
+    with app.test_request_context('/toko'):
+        html = render_shop([{'id': 1, 'name': 'Kitab', 'price': 10000, 'availability': 'Tersedia',
+                             'image_filename': cover, 'link_ig': '', 'link_wa': '', 'link_shopee': '',
+                             'link_tiktok': ''}])
+    assert f'srcset="/uploads/card/{cover}.webp"' in html
+    assert f'src="/uploads/card/{cover}.jpg"' in html
+
+
+class BooksCursor:
+    """Cursor palsu untuk tabel books; UPDATE gagal bila `fail_update`."""
+
+    def __init__(self, books, fail_update):
+        self.books = books
+        self.fail_update = fail_update
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, args=None):
+        self._rows = []
+        if query.startswith('SELECT id, image_filename'):
+            self._rows = [dict(book) for book in self.books]
+        elif query.startswith('UPDATE books'):
+            if self.fail_update:
+                raise RuntimeError('koneksi terputus')
+            for book in self.books:
+                if book['id'] == args[1]:
+                    book['image_filename'] = args[0]
+        elif query.startswith('SELECT COUNT(*)'):
+            self._rows = [{'total': sum(book['image_filename'] == args[0] for book in self.books)}]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+
+class BooksConnection:
+    open = True
+
+    def __init__(self, books, fail_update=False):
+        self.books = books
+        self.fail_update = fail_update
+
+    def cursor(self, cursor=None):
+        return BooksCursor(self.books, self.fail_update)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('fail_update', [False, True])
+def test_backfill_removes_legacy_file_only_after_update(app, monkeypatch, fail_update):
+    upload_folder = app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    legacy = os.path.join(upload_folder, 'sampul lama.png')
+    Image.new('RGB', (60, 80), (20, 30, 200)).save(legacy, 'PNG')
+    books = [{'id': 1, 'image_filename': 'sampul lama.png'}]
+    monkeypatch.setattr(services, 'checkout', lambda engine: BooksConnection(books, fail_update))
+
+    result = app.test_cli_runner().invoke(args=['backfill-image-variants'])
+
+    if fail_update:
+        assert result.exit_code != 0
+        # Baris tetap menunjuk file lama, dan file itu masih ada
+        assert books[0]['image_filename'] == 'sampul lama.png'
+        assert os.path.exists(legacy)
+    else:
+        assert result.exit_code == 0, result.output
+        assert images.is_hashed_filename(books[0]['image_filename'])
+        assert os.path.exists(os.path.join(upload_folder, books[0]['image_filename']))
+        assert not os.path.exists(legacy)
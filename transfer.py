@@ -0,0 +1,218 @@
+# transfer.py
+
+# Helper import/export Excel & CSV yang dipakai blueprint kitab, pembeli,
+# penjualan, dan kas: penulisan batch ke database, export dengan memori
+# konstan, dan handler job latar belakang. pandas dan openpyxl hanya
+# diimpor di dalam fungsi yang membutuhkannya, sehingga worker web tidak
+# memuatnya sampai ada import/export pertama.
+
+import csv
+import io
+import tempfile
+from datetime import datetime
+
+import pymysql.cursors
+from flask import Response, jsonify, request, send_file, session, stream_with_context, url_for
+
+import services
+import spreadsheet
+from services import get_db_connection
+
+# Jumlah baris per batch saat menulis hasil import ke database
+IMPORT_CHUNK_SIZE = 500
+
+# Jumlah baris yang diambil dari server-side cursor per batch
+EXPORT_FETCH_SIZE = 1000
+
+
+# --- Import ---
+def iter_chunks(rows, size=IMPORT_CHUNK_SIZE):
+    """Membagi list baris menjadi batch berukuran `size`."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def count_existing_names(cursor, table, names):
+    """Menghitung berapa nama yang sudah ada di tabel (untuk laporan ditambah vs diupdate)."""
+    cursor.execute(f"SELECT COUNT(*) as total FROM {table} WHERE name IN %s", (tuple(names),))
+    return cursor.fetchone()['total']
+
+
+def fetch_rows_by_name(cursor, table, columns, names):
+    """Mengambil baris berdasarkan daftar nama (per batch) sebagai dict nama (casefold) -> baris.
+
+    Kunci di-casefold karena perbandingan nama di MySQL tidak membedakan huruf besar/kecil.
+    """
+    found = {}
+    unique_names = list(dict.fromkeys(names))
+    for chunk in iter_chunks(unique_names):
+        cursor.execute(f"SELECT {columns} FROM {table} WHERE name IN %s", (tuple(chunk),))
+        for row in cursor.fetchall():
+            found[row['name'].casefold()] = row
+    return found
+
+
+def excel_text_column(df, column, default):
+    """Kolom teks opsional dari Excel sebagai list string; sel kosong diisi `default`."""
+    if column not in df:
+        return [default] * len(df)
+    return df[column].fillna(default).astype(str).str.strip().tolist()
+
+
+def no_progress(done, total=None, message=None):
+    """Pelapor progres kosong untuk import/export yang berjalan di dalam request."""
+
+
+def enqueue_upload_job(kind, file):
+    """Simpan file upload sebagai job latar belakang; jawab 202 beserta id job."""
+    extension = spreadsheet.file_format(file.filename)
+    job_id = services.job_queue.enqueue(kind, upload=file, extension=extension, user_id=session.get('user_id'))
+    return jsonify({'job_id': job_id, 'status_url': url_for('jobs.get_job', job_id=job_id)}), 202
+
+
+def run_upload_import(kind, run_import, file):
+    """Jalankan import dari file upload: sebagai job (mode=job) atau langsung di request ini.
+
+    File dibaca dari stream upload Werkzeug (file sementara untuk upload besar),
+    tidak disalin dulu ke memori.
+    """
+    fmt = spreadsheet.file_format(file.filename)
+    if fmt is None:
+        return jsonify({'error': 'Format file harus Excel (.xlsx/.xls) atau CSV'}), 400
+    if request.args.get('mode') == 'job':
+        return enqueue_upload_job(kind, file)
+    payload, status = run_import(file.stream, fmt)
+    return jsonify(payload), status
+
+
+# --- Export ---
+def iter_export_rows(query, params):
+    """Menjalankan query export dengan server-side cursor (SSCursor).
+
+    Menghasilkan nama kolom terlebih dahulu, lalu baris demi baris, sehingga
+    hasil query tidak pernah dimuat seluruhnya ke memori worker.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(query, params)
+            yield [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        conn.close()
+
+
+def stream_export(rows, sheet_name, widths, filename):
+    """Menulis baris export dengan memori konstan.
+
+    format=csv dikirim sebagai chunked response langsung dari generator.
+    Selain itu dipakai workbook openpyxl write-only yang ditulis ke file
+    sementara lalu dikirim per blok oleh send_file.
+    """
+    if request.args.get('format') == 'csv':
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(row)
+                if buffer.tell() >= 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+
+        return Response(stream_with_context(generate()), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={filename}.csv'})
+
+    output = tempfile.TemporaryFile()
+    write_xlsx_export(rows, sheet_name, widths, output)
+    output.seek(0)
+    return send_file(output, download_name=f'{filename}.xlsx', as_attachment=True)
+
+
+def write_xlsx_export(rows, sheet_name, widths, output):
+    """Menulis baris export (header lebih dulu) ke workbook openpyxl write-only."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    for column, width in widths.items():
+        worksheet.column_dimensions[column].width = width
+
+    header = next(rows)
+    header_cells = []
+    for name in header:
+        cell = WriteOnlyCell(worksheet, value=name)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+    for row in rows:
+        worksheet.append(row)
+    workbook.save(output)
+
+
+def write_export_file(rows, sheet_name, widths, path, file_format):
+    """Menulis baris export ke file (xlsx atau csv) untuk job export latar belakang."""
+    if file_format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            csv.writer(output).writerows(rows)
+    else:
+        write_xlsx_export(rows, sheet_name, widths, path)
+
+
+def dataframe_export(df, sheet_name, widths, filename):
+    """Kirim DataFrame sebagai file xlsx (jalur export lama tanpa mode=stream)."""
+    import pandas as pd
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+        worksheet = writer.sheets[sheet_name]
+        for column, width in widths.items():
+            worksheet.column_dimensions[column].width = width
+    output.seek(0)
+    return send_file(output, download_name=filename, as_attachment=True)
+
+
+def enqueue_export_job(kind):
+    """Jalankan export sebagai job latar belakang dengan filter dari query string; jawab 202."""
+    params = {k: v for k, v in request.args.items() if k != 'mode'}
+    job_id = services.job_queue.enqueue(kind, params, user_id=session.get('user_id'))
+    return jsonify({'job_id': job_id, 'status_url': url_for('jobs.get_job', job_id=job_id)}), 202
+
+
+# --- Handler Job Import/Export ---
+def import_job(run_import):
+    """Handler job untuk fungsi run_import_*: payload hasilnya disimpan sebagai hasil job."""
+    def handler(ctx):
+        payload, status = run_import(ctx.input_path, spreadsheet.file_format(ctx.input_path), ctx.progress)
+        if status != 200:
+            raise RuntimeError(payload['error'])
+        return payload
+    return handler
+
+
+def export_job(build_rows, sheet_name, widths, filename_prefix):
+    """Handler job export: baris dari build_rows(params) ditulis ke file di JOBS_FOLDER."""
+    def handler(ctx):
+        file_format = 'csv' if ctx.params.get('format') == 'csv' else 'xlsx'
+        written = 0
+
+        def counted(rows):
+            nonlocal written
+            for row in rows:
+                yield row
+                written += 1
+                if written % EXPORT_FETCH_SIZE == 0:
+                    ctx.progress(written, message=f'{written} baris')
+
+        write_export_file(counted(build_rows(ctx.params)), sheet_name, widths, ctx.output_path(file_format), file_format)
+        filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+        return {'filename': filename, 'rows': max(written - 1, 0)}
+    return handler